@@ -1,70 +1,205 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, Optional
+import functools
+import hashlib
+import time
 import uuid
 
-from app.core.exceptions import InvalidTokenError, UserNotFoundError
+from app.core.exceptions import (
+    DatabaseConnectionError,
+    DatabaseQueryError,
+    InvalidParameterError,
+    UserNotFoundError
+)
 from app.db.session import get_async_session
 from app.models import User
-from app.core.security import verify_token
+from app.core.security import verify_token, is_token_blacklisted
 from app.crud.user import user_crud
 
-# セキュリティ設定
-security = HTTPBearer()
+# 認証エラーはraiseごとに新しいインスタンスを生成する
+# （共有インスタンスを使い回すと前回の __traceback__ / __context__ が残るため）
+def _invalid_token_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="無効なトークンです",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _token_processing_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="トークンの処理中に予期せぬエラーが発生しました",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _user_not_found_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="ユーザーが見つかりません",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _user_fetch_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="ユーザー情報の取得中にエラーが発生しました"
+    )
+
+
+def _admin_required_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="管理者権限が必要です"
+    )
+
+
+# トークンのsub（ユーザーID文字列）からUUIDへの変換結果のキャッシュ
+# 同じユーザーのリクエストごとに uuid.UUID の文字列解析を繰り返さない
+_parse_user_id = functools.lru_cache(maxsize=4096)(uuid.UUID)
+
+# 署名検証済みトークンのキャッシュ（キー: トークンのBLAKE2bダイジェスト）
+_verified_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
+async def verify_token_cached(token: str, db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """
+    署名検証結果をキャッシュしてトークンを検証する
+
+    キャッシュヒット時はRS256の署名検証を省略し、有効期限とブラックリストのみ再確認する。
+
+    Args:
+        token: 検証するJWTトークン
+        db: ブラックリスト確認に使用するデータベースセッション
+
+    Returns:
+        Optional[Dict[str, Any]]: トークンが有効な場合はペイロード、無効な場合はNone
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _verified_token_cache.get(key)
+
+    if payload is None:
+        payload = await verify_token(token, db)
+        if payload is not None:
+            _verified_token_cache[key] = payload
+        return payload
+
+    if payload.get("exp", 0) <= time.time():
+        _verified_token_cache.pop(key, None)
+        return None
+
+    if await is_token_blacklisted(payload, db):
+        return None
+
+    return payload
+
+
+async def get_token_payload(
+    request: Request,
+    db: AsyncSession = Depends(get_async_session)
+) -> Dict[str, Any]:
+    """トークンを検証してペイロードを取得する依存性（ユーザーのDB取得は行わない）"""
+    # Bearerトークンはrequest_middlewareで抽出済み
+    token = getattr(request.state, "bearer", None)
+    if not token:
+        # 認証情報なしも無効なトークンと同じ401で応答する
+        raise _invalid_token_error()
+    
+    try:
+        payload = await verify_token_cached(token, db)
+    except ValueError:
+        # 公開鍵が設定されていない場合
+        raise _token_processing_error()
+    
+    if payload is None or payload.get("sub") is None:
+        raise _invalid_token_error()
+    
+    return payload
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    # 同一リクエスト内では依存性の結果がキャッシュされるため、
+    # get_admin_user などから重ねて参照されてもトークン検証は1回のみ
+    payload: Dict[str, Any] = Depends(get_token_payload, use_cache=True),
     db: AsyncSession = Depends(get_async_session)
 ) -> User:
-    """現在のユーザーを取得する依存性（ブラックリストチェック付き）"""
-    token = credentials.credentials
+    """現在のユーザーを取得する依存性（ブラックリストチェック付き）
+    
+    ユーザーの全列（パスワードハッシュを含む）を読み込むため、パスワード変更など
+    ORMインスタンスが必要な場合のみ使用し、それ以外は get_current_user_auth を使う。
+    """
+    user_id = payload["sub"]
     
     try:
-        payload = await verify_token(token)
-        if payload is None:
-            raise InvalidTokenError("トークンが無効です")
-        
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise InvalidTokenError("トークンにuser_idが含まれていません")
-    except InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="無効なトークンです",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    except Exception:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="トークンの処理中に予期せぬエラーが発生しました",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        user = await user_crud.get(db, id=_parse_user_id(user_id))
+    except UserNotFoundError:
+        raise _user_not_found_error()
+    except ValueError:
+        # subがUUID形式ではない
+        raise _invalid_token_error()
+    except (DatabaseQueryError, DatabaseConnectionError, InvalidParameterError):
+        raise _user_fetch_error()
     
+    if user is None:
+        raise _user_not_found_error()
+    return user
+
+
+async def get_current_user_auth(
+    payload: Dict[str, Any] = Depends(get_token_payload, use_cache=True),
+    db: AsyncSession = Depends(get_async_session)
+) -> Row:
+    """現在のユーザーの認証情報（id, is_admin, username, full_name）のみを取得する依存性"""
     try:
-        user = await user_crud.get(db, id=uuid.UUID(user_id))
-        if user is None:
-            raise UserNotFoundError(user_id=user_id)
-        return user
+        user = await user_crud.get_auth_fields(db, id=_parse_user_id(payload["sub"]))
     except UserNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="ユーザーが見つかりません",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="ユーザー情報の取得中にエラーが発生しました"
-        )
-
-
-async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
-    """管理者権限チェック"""
+        raise _user_not_found_error()
+    except ValueError:
+        # subがUUID形式ではない
+        raise _invalid_token_error()
+    except (DatabaseQueryError, DatabaseConnectionError, InvalidParameterError):
+        raise _user_fetch_error()
+    
+    if user is None:
+        raise _user_not_found_error()
+    return user
+
+
+async def get_current_user_claims(
+    payload: Dict[str, Any] = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_async_session)
+) -> Dict[str, Any]:
+    """
+    現在のユーザー情報をJWTのクレームから取得する依存性
+    
+    ユーザー情報のクレームを含むトークンではDBを参照しない。
+    そのため内容は最大でアクセストークンの有効期限分古い可能性がある。
+    クレームが不足している古い形式のトークンではDBから取得する。
+    """
+    if "full_name" in payload and "username" in payload and "is_admin" in payload:
+        return {
+            "id": payload["sub"],
+            "username": payload["username"],
+            "full_name": payload["full_name"],
+            "is_admin": payload["is_admin"],
+        }
+    
+    user = await get_current_user_auth(payload=payload, db=db)
+    return {
+        "id": user.id,
+        "username": user.username,
+        "full_name": user.full_name,
+        "is_admin": user.is_admin,
+    }
+
+
+async def get_admin_user(current_user: Row = Depends(get_current_user_auth)) -> Row:
+    """管理者権限チェック（認証情報の列のみを読み込む）"""
     if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="管理者権限が必要です"
-        )
+        raise _admin_required_error()
     return current_user
\ No newline at end of file
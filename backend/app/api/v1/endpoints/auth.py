@@ -1,19 +1,22 @@
+import asyncio
+
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, status, Form, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from typing import Any, Optional
-import uuid
+from typing import Any, Dict, Optional
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_user_claims, get_token_payload
 from app.core.security import (
-    create_access_token, create_refresh_token, verify_refresh_token, verify_password,
-    blacklist_token, revoke_refresh_token
+    create_access_token, create_refresh_token, rotate_refresh_token, averify_password,
+    aget_password_hash, blacklist_token, revoke_refresh_token
 )
 from app.core.config import settings
 from app.core.exceptions import (
     DatabaseConnectionError,
     DatabaseIntegrityError,
+    DatabaseQueryError,
     DuplicateUsernameError,
     InvalidCredentialsError,
     InvalidParameterError,
@@ -29,11 +32,24 @@ from app.schemas import UserCreate, UserRegister, User as UserSchema, TokenRespo
 
 router = APIRouter()
 
+# ログイン失敗回数（キー: (クライアントIP, ユーザー名)）
+_login_failures: TTLCache = TTLCache(maxsize=10_000, ttl=settings.LOGIN_FAILED_WINDOW_SECONDS)
+
+
+def _login_failure_key(request: Request, username: str) -> tuple:
+    client_host = request.client.host if request.client else ""
+    return (client_host, username)
+
+
+def _record_login_failure(key: tuple) -> None:
+    _login_failures[key] = _login_failures.get(key, 0) + 1
+
 async def create_access_token_for_user(
         logger: Any,
         sub: str,
         is_admin: bool,
         username: str,
+        full_name: str,
         expires_delta: timedelta = None
         ) -> str:
     """
@@ -43,8 +59,9 @@ async def create_access_token_for_user(
     try:
         access_token = await create_access_token(
             data={"sub": sub,
-                "is_admin": str(is_admin).lower(),
-                "username": username},
+                "is_admin": is_admin,
+                "username": username,
+                "full_name": full_name},
             expires_delta=expires_delta
         )
     except ValueError as e:
@@ -72,10 +89,21 @@ async def login(
     logger = get_request_logger(request)
     logger.info(f"ログインリクエスト: ユーザー名={form_data.username}")
 
+    # ログイン試行回数の制限
+    failure_key = _login_failure_key(request, form_data.username)
+    if _login_failures.get(failure_key, 0) >= settings.LOGIN_MAX_FAILED_ATTEMPTS:
+        logger.warning(f"ログイン試行回数超過: ユーザー名={form_data.username}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="ログイン試行回数が上限を超えました。しばらくしてから再試行してください",
+            headers={"Retry-After": str(settings.LOGIN_FAILED_WINDOW_SECONDS)},
+        )
+
     # ユーザー認証
     try:
         db_user = await user_crud.get_by_username(async_session, username=form_data.username)
     except UserNotFoundError:
+        _record_login_failure(failure_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="ユーザー名またはパスワードが正しくありません",
@@ -93,12 +121,13 @@ async def login(
             detail="データベースセッションがアクティブではありません",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except Exception as e:
+    except DatabaseQueryError as e:
         logger.error(f"ユーザー認証失敗: {str(e)}")
         raise HTTPException(status_code=500, detail="ユーザー認証失敗")
 
     # パスワード検証
-    if not verify_password(form_data.password, db_user.hashed_password):
+    if not await averify_password(form_data.password, db_user.hashed_password):
+        _record_login_failure(failure_key)
         logger.warning(f"ログイン失敗: ユーザー '{form_data.username}' のパスワードが不正です")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -113,12 +142,15 @@ async def login(
         sub=str(db_user.id),
         is_admin=db_user.is_admin,
         username=db_user.username,
+        full_name=db_user.full_name,
         expires_delta=access_token_expires
         )
 
     # リフレッシュトークン生成
     refresh_token = await create_refresh_token(user_id=str(db_user.id), db=async_session)
 
+    _login_failures.pop(failure_key, None)
+
     logger.info(f"ログイン成功: ユーザーID={db_user.id}, ユーザー名={db_user.username}")
 
     return {
@@ -196,35 +228,48 @@ async def refresh_access_token(
     logger.info("リフレッシュトークンリクエスト")
     
     try:
-        # リフレッシュトークンを検証
-        user_id = await verify_refresh_token(token_data.refresh_token, db)
-        if not user_id:
+        # リフレッシュトークンを検証し、新しいトークンにローテーション
+        # （旧トークンの削除と新トークンの作成はリクエストのトランザクション内で行われ、
+        #   以降の処理が失敗した場合はまとめてロールバックされる）
+        rotated = await rotate_refresh_token(token_data.refresh_token, db)
+        if not rotated:
             logger.warning("無効なリフレッシュトークン")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="無効なリフレッシュトークンです"
             )
+        new_refresh_token, user_id = rotated
         
-        # ユーザー情報を取得
-        user = await user_crud.get(db, id=uuid.UUID(user_id))
-        if not user:
+        # ユーザー情報を取得（トークン生成に必要な列のみ）
+        try:
+            user = await user_crud.get_auth_fields(db, id=user_id)
+        except UserNotFoundError:
             logger.warning(f"ユーザーが見つかりません: user_id={user_id}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="ユーザーが見つかりません"
             )
         
-        # 新しいアクセストークンを作成
+        # 新しいアクセストークンの作成（署名はスレッドプールで実行）と
+        # 古いアクセストークンのブラックリスト登録を並行して行う
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        new_access_token = await create_access_token_for_user(
-            logger=logger,
-            sub=str(user.id),
-            is_admin=user.is_admin,
-            username=user.username,
-            expires_delta=access_token_expires
+        new_access_token, blacklist_result = await asyncio.gather(
+            create_access_token_for_user(
+                logger=logger,
+                sub=str(user.id),
+                is_admin=user.is_admin,
+                username=user.username,
+                full_name=user.full_name,
+                expires_delta=access_token_expires
+            ),
+            blacklist_token(token_data.access_token, db),
+            return_exceptions=True
         )
-        # 古いアクセストークンをブラックリストに追加
-        blacklist_result = await blacklist_token(token_data.access_token)
+        # 両方の完了を待ってから例外を送出する（セッションを使用中のまま抜けないため）
+        if isinstance(new_access_token, BaseException):
+            raise new_access_token
+        if isinstance(blacklist_result, BaseException):
+            raise blacklist_result
         logger.info(f"アクセストークンブラックリスト登録: {blacklist_result}")
         if not blacklist_result:
             logger.warning(f"アクセストークンブラックリスト登録失敗: {token_data.access_token}")
@@ -233,13 +278,6 @@ async def refresh_access_token(
                 detail="古いアクセストークンのブラックリスト登録に失敗しました。トークンを更新できません。"
             )
         
-        # 新しいリフレッシュトークンを作成（トークンローテーション）
-        new_refresh_token = await create_refresh_token(user.id, db)
-        
-        # 古いリフレッシュトークンを削除
-        from app.crud.refresh_token import refresh_token_crud
-        await refresh_token_crud.delete_refresh_token(db, token_data.refresh_token)
-        
         logger.info(f"トークン更新成功: ユーザー名={user.username}")
         return {
             "access_token": new_access_token,
@@ -260,13 +298,13 @@ async def refresh_access_token(
 @router.post("/logout")
 async def logout(
     request: Request,
-    current_user: User = Depends(get_current_user),
+    token_payload: Dict[str, Any] = Depends(get_token_payload),
     db: AsyncSession = Depends(get_async_session),
     token_data: Optional[LogoutRequest] = None
 ):
     """ユーザーをログアウトし、アクセストークンとリフレッシュトークンを無効化"""
     logger = get_request_logger(request)
-    logger.info(f"ログアウトリクエスト: ユーザーID={current_user.id}")
+    logger.info(f"ログアウトリクエスト: ユーザーID={token_payload['sub']}")
     
     try:
         # アクセストークンをブラックリストに追加
@@ -284,7 +322,7 @@ async def logout(
             if not revoke_result:
                 logger.warning(f"リフレッシュトークン削除失敗: {token_data.refresh_token}")
         
-        logger.info(f"ログアウト成功: ユーザー名={current_user.username}")
+        logger.info(f"ログアウト成功: ユーザー名={token_payload.get('username')}")
         return {"message": "ログアウトしました"}
         
     except Exception as e:
@@ -298,11 +336,11 @@ async def logout(
 @router.get("/me", response_model=UserSchema)
 async def get_current_user_info(
     request: Request,
-    current_user: User = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user_claims)
 ):
-    """現在のユーザー情報を取得"""
+    """現在のユーザー情報を取得（トークンのクレームから返し、DBは参照しない）"""
     logger = get_request_logger(request)
-    logger.info(f"ユーザー情報取得リクエスト: ユーザーID={current_user.id}")
+    logger.info(f"ユーザー情報取得リクエスト: ユーザーID={current_user['id']}")
     
     return current_user
 
@@ -320,7 +358,7 @@ async def update_password(
     
     try:
         # 現在のパスワードを検証
-        if not verify_password(password_data.old_password, current_user.hashed_password):
+        if not await averify_password(password_data.old_password, current_user.hashed_password):
             logger.warning(f"パスワード更新失敗: ユーザー '{current_user.username}' の現在のパスワードが不正です")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -328,15 +366,14 @@ async def update_password(
             )
         
         # 新しいパスワードと現在のパスワードが同じかチェック
-        if verify_password(password_data.new_password, current_user.hashed_password):
+        if await averify_password(password_data.new_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="新しいパスワードは現在のパスワードと異なる必要があります"
             )
         
         # パスワードを更新
-        from app.core.security import get_password_hash
-        hashed_new_password = get_password_hash(password_data.new_password)
+        hashed_new_password = await aget_password_hash(password_data.new_password)
         
         await user_crud.update_password(
             db=db, 
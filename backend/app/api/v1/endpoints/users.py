@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 import uuid
 
 from app.api.deps import get_current_user, get_admin_user
@@ -11,7 +11,7 @@ from app.core.exceptions import (
     UserNotFoundError
 )
 from app.core.logging import get_request_logger
-from app.crud.user import user_crud
+from app.crud.user import decode_cursor, encode_cursor, user_crud
 from app.db.session import get_async_session
 from app.models import User
 from app.schemas import User as UserSchema, UserWithKnowledge
@@ -22,18 +22,39 @@ router = APIRouter()
 @router.get("/", response_model=List[UserSchema])
 async def read_users(
     request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     db: AsyncSession = Depends(get_async_session)
 ):
-    """ユーザー一覧を取得"""
+    """
+    ユーザー一覧を取得
+    
+    afterを指定した場合はキーセット方式で、そのカーソルの次から取得する（skipとは併用できない）。
+    キーセット方式で辿れる場合（afterの指定時、またはskipなしの先頭ページ）に限り、
+    次のページがありうる場合はX-Next-Cursorヘッダーに次のafterの値（不透明なカーソル）を返す。
+    """
     logger = get_request_logger(request)
-    logger.info(f"ユーザー一覧取得リクエスト: skip={skip}, limit={limit}")
+    logger.info(f"ユーザー一覧取得リクエスト: skip={skip}, limit={limit}, after={after}")
     
     try:
-        users = await user_crud.get_multi(db, skip=skip, limit=limit)
+        if after is not None:
+            if skip > 0:
+                raise InvalidParameterError("skip", skip, "afterとskipは同時に指定できません")
+            users = await user_crud.get_multi_after(db, after=decode_cursor(after), limit=limit)
+        else:
+            users = await user_crud.get_multi(db, skip=skip, limit=limit)
+        
+        # OFFSET方式の途中のページではカーソルを返さない（辿るとキーセット方式へ切り替わるため）
+        if (after is not None or skip == 0) and users and len(users) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(users[-1])
+        
         logger.info(f"ユーザー一覧取得成功: {len(users)}件")
         return users
+    except InvalidParameterError:
+        # 不正なカーソル・パラメータは400として返す
+        raise
     except Exception as e:
         logger.error(f"ユーザー一覧取得中にエラー: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -53,7 +74,7 @@ async def read_user(
     logger.info(f"ユーザー詳細取得リクエスト: user_id={user_id}")
     
     try:
-        db_user = await user_crud.get(db, id=user_id)
+        db_user = await user_crud.get_with_knowledge(db, id=user_id)
         return db_user
     except InvalidParameterError:
         raise
@@ -1,3 +1,4 @@
+from functools import lru_cache
 import os
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
@@ -20,16 +21,29 @@ class Settings(BaseSettings):
 
     # データベース設定
     DATABASE_URL: str = "sqlite+aiosqlite:///./knowledge.db"
-    SQLALCHEMY_ECHO: bool = True
+    SQLALCHEMY_ECHO: bool = False  # DEBUG有効時のみ反映される
+    DB_POOL_MIN: int = 10  # 常時保持するコネクション数
+    DB_POOL_MAX: int = 50  # オーバーフローを含めた最大コネクション数
+    DB_POOL_TIMEOUT: int = 30  # コネクション取得待ちのタイムアウト（秒）
+    DB_POOL_RECYCLE: int = 300  # コネクションを再作成するまでの秒数
+    DB_STATEMENT_CACHE_SIZE: int = 1024  # asyncpgのプリペアドステートメントキャッシュ
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 256  # SQLAlchemy（asyncpgダイアレクト）側のプリペアドステートメントキャッシュ
     TZ: str = "Asia/Tokyo"
 
     # セキュリティ設定
-    ALGORITHM: str = "RS256"
+    ALGORITHM: str = "RS256"  # RS256（RSA鍵） または EdDSA（Ed25519鍵）
     PRIVATE_KEY_PATH: str = "keys/private.pem"  # 秘密鍵のパス
     PUBLIC_KEY_PATH: str = "keys/public.pem"   # 公開鍵のパス
+    # 署名方式の移行期間中のみ設定する（旧方式で発行済みのトークンを検証するため）
+    PREVIOUS_ALGORITHM: Optional[str] = None
+    PREVIOUS_PUBLIC_KEY_PATH: Optional[str] = None
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     TOKEN_BLACKLIST_ENABLED: bool = True
+    TOKEN_BLACKLIST_CACHE_TTL_SECONDS: int = 30  # 未失効と判定したJTIをキャッシュする秒数（0で無効）
+    BCRYPT_ROUNDS: int = 12  # bcryptのコストファクター
+    LOGIN_MAX_FAILED_ATTEMPTS: int = 10  # 期間内に許容するログイン失敗回数
+    LOGIN_FAILED_WINDOW_SECONDS: int = 300  # ログイン失敗回数を数える期間（秒）
 
     # CORS設定
     CORS_ORIGINS: list[str] = ["*"]
@@ -41,6 +55,11 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 100
     MAX_PAGE_SIZE: int = 1000
 
+    # キャッシュ設定
+    KNOWLEDGE_ARTICLE_CACHE_SIZE: int = 256  # 記事別ナレッジ一覧をキャッシュする件数
+    KNOWLEDGE_ARTICLE_CACHE_TTL_SECONDS: int = 5  # 記事別ナレッジ一覧の先頭ページをキャッシュする秒数（0で無効）
+    KNOWLEDGE_COUNT_CACHE_TTL_SECONDS: int = 30  # ナレッジ件数をキャッシュする秒数（0で無効）
+
     @property
     def PRIVATE_KEY(self) -> str:
         """秘密鍵の内容を読み込む"""
@@ -60,6 +79,17 @@ class Settings(BaseSettings):
         except FileNotFoundError:
             return os.environ.get("PUBLIC_KEY", "")
     
+    @property
+    def PREVIOUS_PUBLIC_KEY(self) -> str:
+        """移行前の公開鍵の内容を読み込む"""
+        if not self.PREVIOUS_PUBLIC_KEY_PATH:
+            return ""
+        try:
+            with open(self.PREVIOUS_PUBLIC_KEY_PATH, "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+    
     
     model_config = ConfigDict(
         env_file=".env",
@@ -68,4 +98,10 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """アプリケーション設定のシングルトンを返す（.envの読み込みは初回のみ）"""
+    return Settings()
+
+
+settings = get_settings()
\ No newline at end of file
@@ -1,272 +1,462 @@
-from typing import Any, Dict, Optional
+from enum import StrEnum
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+
+class ErrorCode(StrEnum):
+    """アプリケーションのエラーコード（値はAPIレスポンスの error_code としてそのまま返す）"""
+
+    USER_NOT_FOUND = "USER_NOT_FOUND"
+    ARTICLE_NOT_FOUND = "ARTICLE_NOT_FOUND"
+    KNOWLEDGE_NOT_FOUND = "KNOWLEDGE_NOT_FOUND"
+    DUPLICATE_USERNAME = "DUPLICATE_USERNAME"
+    DUPLICATE_ARTICLE = "DUPLICATE_ARTICLE"
+    INVALID_CREDENTIALS = "INVALID_CREDENTIALS"
+    INVALID_TOKEN = "INVALID_TOKEN"
+    INSUFFICIENT_PERMISSIONS = "INSUFFICIENT_PERMISSIONS"
+    FILE_PROCESSING_ERROR = "FILE_PROCESSING_ERROR"
+    INVALID_KNOWLEDGE_STATUS = "INVALID_KNOWLEDGE_STATUS"
+    DATABASE_QUERY_ERROR = "DATABASE_QUERY_ERROR"
+    DATABASE_CONNECTION_ERROR = "DATABASE_CONNECTION_ERROR"
+    DATABASE_INTEGRITY_ERROR = "DATABASE_INTEGRITY_ERROR"
+    TOKEN_NOT_FOUND = "TOKEN_NOT_FOUND"
+    EXPIRED_TOKEN = "EXPIRED_TOKEN"
+    INVALID_PARAMETER = "INVALID_PARAMETER"
+    CSV_PROCESSING_ERROR = "CSV_PROCESSING_ERROR"
+    RESOURCE_LOCK_ERROR = "RESOURCE_LOCK_ERROR"
+    PERMISSION_DENIED = "PERMISSION_DENIED"
+    INVALID_STATUS_TRANSITION = "INVALID_STATUS_TRANSITION"
+    REFRESH_TOKEN_NOT_FOUND = "REFRESH_TOKEN_NOT_FOUND"
+    TOKEN_BLACKLIST_NOT_FOUND = "TOKEN_BLACKLIST_NOT_FOUND"
 
 
 class KnowledgeBaseException(Exception):
-    """ナレッジベースアプリケーションの基底例外クラス"""
-    
+    """ナレッジベースアプリケーションの基底例外クラス
+
+    エラーコードはサブクラスのクラス属性 ``ERROR_CODE`` で定義する。
+    属性は ``__slots__`` に保持する（``BaseException`` 由来の ``__dict__`` は残る）。
+    ``details`` は参照されるまで辞書を生成しない。
+    メッセージは ``details`` のキー構成に対応するテンプレート（``_TEMPLATES``）から
+    ``message`` / ``str()`` の初回参照時に組み立てる。
+    """
+
+    __slots__ = ("_message", "_details", "error_code")
+
+    ERROR_CODE: Optional[ErrorCode] = None
+    _TEMPLATES: Dict[Tuple[str, ...], str] = {}
+
     def __init__(
         self,
-        message: str,
+        message: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None,
         error_code: Optional[str] = None
     ):
-        self.message = message
-        self.details = details or {}
-        self.error_code = error_code
-        super().__init__(self.message)
+        Exception.__init__(self)
+        self._message = message
+        self._details = details or None
+        self.error_code = error_code or self.ERROR_CODE
+
+    def _format_message(self) -> str:
+        details = self._details or {}
+        template = self._TEMPLATES.get(tuple(details))
+        if template is None:
+            return ""
+        return template.format(**details)
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self._format_message()
+        return self._message
+
+    @property
+    def details(self) -> Dict[str, Any]:
+        if self._details is None:
+            self._details = {}
+        return self._details
+
+    @details.setter
+    def details(self, value: Optional[Dict[str, Any]]) -> None:
+        self._details = value or None
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.message!r})"
+
+    def __reduce__(self):
+        # args が空でスロットの値も既定の pickle では保存されないため、
+        # サブクラスの __init__ を経由せずにメッセージ・詳細・エラーコードを復元する
+        return (
+            _restore_exception,
+            (type(self), self._message, self._details, self.error_code),
+            self.__dict__ or None,
+        )
+
+
+def _restore_exception(
+    cls: Type[KnowledgeBaseException],
+    message: Optional[str],
+    details: Optional[Dict[str, Any]],
+    error_code: Optional[str]
+) -> KnowledgeBaseException:
+    """pickle から例外を復元する（サブクラスごとに異なる __init__ の引数を経由しない）"""
+    exc = cls.__new__(cls)
+    KnowledgeBaseException.__init__(exc, message=message, details=details, error_code=error_code)
+    return exc
+
+
+_E = TypeVar("_E", bound=Type[KnowledgeBaseException])
+
+
+def exception_class(
+    code: ErrorCode,
+    templates: Optional[Dict[Tuple[str, ...], str]] = None
+) -> Callable[[_E], _E]:
+    """
+    例外クラスにエラーコードとメッセージテンプレートを宣言するデコレータ
+
+    Args:
+        code: エラーコード（Enumメンバーのため比較は同一性チェックで済む）
+        templates: details のキー構成（挿入順のタプル）からメッセージテンプレートへの対応。
+            details が空の場合のメッセージは ``()`` をキーに指定する
+
+    Returns:
+        Callable: クラスに ERROR_CODE と _TEMPLATES を設定するデコレータ
+    """
+    def decorator(cls: _E) -> _E:
+        cls.ERROR_CODE = code
+        if templates is not None:
+            cls._TEMPLATES = templates
+        return cls
+    return decorator
 
 
 class ValidationError(KnowledgeBaseException):
     """バリデーションエラー"""
-    pass
+    __slots__ = ()
 
 
 class NotFoundError(KnowledgeBaseException):
     """リソースが見つからないエラー"""
-    pass
+    __slots__ = ()
 
 
 class DuplicateError(KnowledgeBaseException):
     """重複エラー"""
-    pass
+    __slots__ = ()
 
 
 class AuthenticationError(KnowledgeBaseException):
     """認証エラー"""
-    pass
+    __slots__ = ()
 
 
 class AuthorizationError(KnowledgeBaseException):
     """認可エラー"""
-    pass
+    __slots__ = ()
 
 
 class DatabaseError(KnowledgeBaseException):
     """データベースエラー"""
-    pass
+    __slots__ = ()
 
 
 class ExternalServiceError(KnowledgeBaseException):
     """外部サービスエラー"""
-    pass
+    __slots__ = ()
 
 
 # 具体的な例外クラス
+@exception_class(ErrorCode.USER_NOT_FOUND, {
+    ("user_id",): "ユーザーID '{user_id}' が見つかりません",
+    ("username",): "ユーザー名 '{username}' が見つかりません",
+    (): "ユーザーが見つかりません",
+})
 class UserNotFoundError(NotFoundError):
     """ユーザーが見つからないエラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, user_id: Optional[str] = None, username: Optional[str] = None):
         if user_id:
-            message = f"ユーザーID '{user_id}' が見つかりません"
             details = {"user_id": user_id}
         elif username:
-            message = f"ユーザー名 '{username}' が見つかりません"
             details = {"username": username}
         else:
-            message = "ユーザーが見つかりません"
-            details = {}
-        
-        super().__init__(message=message, details=details, error_code="USER_NOT_FOUND")
+            details = None
+
+        super().__init__(details=details)
 
 
+@exception_class(ErrorCode.ARTICLE_NOT_FOUND, {
+    ("article_number",): "記事番号 '{article_number}' が見つかりません",
+    ("article_uuid",): "記事UUID '{article_uuid}' が見つかりません",
+    (): "記事が見つかりません",
+})
 class ArticleNotFoundError(NotFoundError):
     """記事が見つからないエラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, article_number: Optional[str] = None, article_uuid: Optional[str] = None):
         if article_number:
-            message = f"記事番号 '{article_number}' が見つかりません"
             details = {"article_number": article_number}
         elif article_uuid:
-            message = f"記事UUID '{article_uuid}' が見つかりません"
             details = {"article_uuid": article_uuid}
         else:
-            message = "記事が見つかりません"
-            details = {}
-        
-        super().__init__(message=message, details=details, error_code="ARTICLE_NOT_FOUND")
+            details = None
 
+        super().__init__(details=details)
 
+
+@exception_class(ErrorCode.KNOWLEDGE_NOT_FOUND, {
+    ("knowledge_id",): "ナレッジID '{knowledge_id}' が見つかりません",
+    (): "ナレッジが見つかりません",
+})
 class KnowledgeNotFoundError(NotFoundError):
     """ナレッジが見つからないエラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, knowledge_id: Optional[int] = None):
-        if knowledge_id:
-            message = f"ナレッジID '{knowledge_id}' が見つかりません"
-            details = {"knowledge_id": knowledge_id}
-        else:
-            message = "ナレッジが見つかりません"
-            details = {}
-        
-        super().__init__(message=message, details=details, error_code="KNOWLEDGE_NOT_FOUND")
+        details = {"knowledge_id": knowledge_id} if knowledge_id else None
+        super().__init__(details=details)
 
 
+@exception_class(ErrorCode.DUPLICATE_USERNAME, {
+    ("username",): "ユーザー名 '{username}' は既に使用されています",
+})
 class DuplicateUsernameError(DuplicateError):
     """ユーザー名重複エラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, username: str):
-        message = f"ユーザー名 '{username}' は既に使用されています"
-        details = {"username": username}
-        super().__init__(message=message, details=details, error_code="DUPLICATE_USERNAME")
+        super().__init__(details={"username": username})
 
 
+@exception_class(ErrorCode.DUPLICATE_ARTICLE, {
+    ("article_number",): "記事番号 '{article_number}' は既に存在します",
+})
 class DuplicateArticleError(DuplicateError):
     """記事重複エラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, article_number: str):
-        message = f"記事番号 '{article_number}' は既に存在します"
-        details = {"article_number": article_number}
-        super().__init__(message=message, details=details, error_code="DUPLICATE_ARTICLE")
+        super().__init__(details={"article_number": article_number})
 
 
+@exception_class(ErrorCode.INVALID_CREDENTIALS, {
+    (): "ユーザー名またはパスワードが正しくありません",
+})
 class InvalidCredentialsError(AuthenticationError):
     """認証情報が無効なエラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self):
-        message = "ユーザー名またはパスワードが正しくありません"
-        super().__init__(message=message, error_code="INVALID_CREDENTIALS")
+        super().__init__()
 
 
+@exception_class(ErrorCode.INVALID_TOKEN, {
+    ("token_type",): "無効な{token_type}トークンです",
+})
 class InvalidTokenError(AuthenticationError):
     """無効なトークンエラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, token_type: str = "access"):
-        message = f"無効な{token_type}トークンです"
-        details = {"token_type": token_type}
-        super().__init__(message=message, details=details, error_code="INVALID_TOKEN")
+        super().__init__(details={"token_type": token_type})
 
 
+@exception_class(ErrorCode.INSUFFICIENT_PERMISSIONS, {
+    ("required_permission",): "'{required_permission}' 権限が必要です",
+    (): "権限が不足しています",
+})
 class InsufficientPermissionsError(AuthorizationError):
     """権限不足エラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, required_permission: Optional[str] = None):
-        if required_permission:
-            message = f"'{required_permission}' 権限が必要です"
-            details = {"required_permission": required_permission}
-        else:
-            message = "権限が不足しています"
-            details = {}
-        
-        super().__init__(message=message, details=details, error_code="INSUFFICIENT_PERMISSIONS")
+        details = {"required_permission": required_permission} if required_permission else None
+        super().__init__(details=details)
 
 
+@exception_class(ErrorCode.FILE_PROCESSING_ERROR, {
+    ("filename", "reason"): "ファイル '{filename}' の処理中にエラーが発生しました: {reason}",
+})
 class FileProcessingError(KnowledgeBaseException):
     """ファイル処理エラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, filename: str, reason: str):
-        message = f"ファイル '{filename}' の処理中にエラーが発生しました: {reason}"
-        details = {"filename": filename, "reason": reason}
-        super().__init__(message=message, details=details, error_code="FILE_PROCESSING_ERROR")
+        super().__init__(details={"filename": filename, "reason": reason})
 
 
+@exception_class(ErrorCode.INVALID_KNOWLEDGE_STATUS, {
+    ("knowledge_id", "current_status", "required_status"): "ナレッジID '{knowledge_id}' のステータスが '{current_status}' です。'{required_status}' である必要があります",
+})
 class InvalidKnowledgeStatusError(ValidationError):
     """ナレッジのステータスが無効なエラー"""
-    
+
+    __slots__ = ()
+
     def __init__(self, knowledge_id: int, current_status: str, required_status: str):
-        message = f"ナレッジID '{knowledge_id}' のステータスが '{current_status}' です。'{required_status}' である必要があります"
         details = {
             "knowledge_id": knowledge_id,
             "current_status": current_status,
             "required_status": required_status
         }
-        super().__init__(message=message, details=details, error_code="INVALID_KNOWLEDGE_STATUS")
+        super().__init__(details=details)
 
+
+@exception_class(ErrorCode.DATABASE_QUERY_ERROR)
 class DatabaseQueryError(DatabaseError):
     """データベースクエリ実行エラー"""
+
+    __slots__ = ()
+
     def __init__(self, message: str = "Database query execution error", details: Optional[Dict[str, Any]] = None):
-        super().__init__(message=message, details=details, error_code="DATABASE_QUERY_ERROR")
+        super().__init__(message=message, details=details)
 
 
+@exception_class(ErrorCode.DATABASE_CONNECTION_ERROR)
 class DatabaseConnectionError(DatabaseError):
     """データベース接続エラー"""
+
+    __slots__ = ()
+
     def __init__(self, message: str = "Database connection error"):
-        super().__init__(message=message, error_code="DATABASE_CONNECTION_ERROR")
+        super().__init__(message=message)
 
 
+@exception_class(ErrorCode.DATABASE_INTEGRITY_ERROR)
 class DatabaseIntegrityError(DatabaseError):
     """データベース整合性エラー"""
+
+    __slots__ = ()
+
     def __init__(self, message: str, constraint: Optional[str] = None):
-        details = {"constraint": constraint} if constraint else {}
-        super().__init__(message=message, details=details, error_code="DATABASE_INTEGRITY_ERROR")
+        details = {"constraint": constraint} if constraint else None
+        super().__init__(message=message, details=details)
 
 
+@exception_class(ErrorCode.TOKEN_NOT_FOUND, {
+    ("token_type",): "{token_type}が見つかりません",
+})
 class TokenNotFoundError(NotFoundError):
     """トークンが見つからないエラー"""
+
+    __slots__ = ()
+
     def __init__(self, token_type: str = "token"):
-        message = f"{token_type}が見つかりません"
-        details = {"token_type": token_type}
-        super().__init__(message=message, details=details, error_code="TOKEN_NOT_FOUND")
+        super().__init__(details={"token_type": token_type})
 
 
+@exception_class(ErrorCode.EXPIRED_TOKEN, {
+    ("token_type",): "{token_type}の有効期限が切れています",
+})
 class ExpiredTokenError(AuthenticationError):
     """期限切れトークンエラー"""
+
+    __slots__ = ()
+
     def __init__(self, token_type: str = "token"):
-        message = f"{token_type}の有効期限が切れています"
-        details = {"token_type": token_type}
-        super().__init__(message=message, details=details, error_code="EXPIRED_TOKEN")
+        super().__init__(details={"token_type": token_type})
 
 
+@exception_class(ErrorCode.INVALID_PARAMETER, {
+    ("parameter", "value", "reason"): "パラメータ '{parameter}' の値 '{value}' が無効です: {reason}",
+})
 class InvalidParameterError(ValidationError):
     """無効なパラメータエラー"""
+
+    __slots__ = ()
+
     def __init__(self, parameter: str, value: Any, reason: str):
-        message = f"パラメータ '{parameter}' の値 '{value}' が無効です: {reason}"
-        details = {"parameter": parameter, "value": value, "reason": reason}
-        super().__init__(message=message, details=details, error_code="INVALID_PARAMETER")
+        super().__init__(details={"parameter": parameter, "value": value, "reason": reason})
 
 
+@exception_class(ErrorCode.CSV_PROCESSING_ERROR, {
+    ("row_number", "reason"): "CSV行 {row_number} の処理中にエラーが発生しました: {reason}",
+    ("reason",): "CSV処理中にエラーが発生しました: {reason}",
+})
 class CsvProcessingError(KnowledgeBaseException):
     """CSV処理エラー"""
+
+    __slots__ = ()
+
     def __init__(self, row_number: Optional[int] = None, reason: str = "CSV processing failed"):
         if row_number:
-            message = f"CSV行 {row_number} の処理中にエラーが発生しました: {reason}"
             details = {"row_number": row_number, "reason": reason}
         else:
-            message = f"CSV処理中にエラーが発生しました: {reason}"
             details = {"reason": reason}
-        super().__init__(message=message, details=details, error_code="CSV_PROCESSING_ERROR")
+        super().__init__(details=details)
 
 
+@exception_class(ErrorCode.RESOURCE_LOCK_ERROR, {
+    ("resource_type", "resource_id"): "{resource_type} '{resource_id}' は他のプロセスによってロックされています",
+})
 class ResourceLockError(KnowledgeBaseException):
     """リソースロックエラー"""
+
+    __slots__ = ()
+
     def __init__(self, resource_type: str, resource_id: str):
-        message = f"{resource_type} '{resource_id}' は他のプロセスによってロックされています"
-        details = {"resource_type": resource_type, "resource_id": resource_id}
-        super().__init__(message=message, details=details, error_code="RESOURCE_LOCK_ERROR")
+        super().__init__(details={"resource_type": resource_type, "resource_id": resource_id})
 
 
 # テストで使用する追加の例外クラス
+@exception_class(ErrorCode.PERMISSION_DENIED)
 class PermissionDeniedError(AuthorizationError):
     """権限拒否エラー"""
+
+    __slots__ = ()
+
     def __init__(self, message: str = "権限が拒否されました"):
-        super().__init__(message=message, error_code="PERMISSION_DENIED")
+        super().__init__(message=message)
 
 
+@exception_class(ErrorCode.INVALID_STATUS_TRANSITION, {
+    ("current_status", "target_status"): "ステータス '{current_status}' から '{target_status}' への遷移は無効です",
+})
 class InvalidStatusTransitionError(ValidationError):
     """無効なステータス遷移エラー"""
+
+    __slots__ = ()
+
     def __init__(self, current_status: str, target_status: str):
-        message = f"ステータス '{current_status}' から '{target_status}' への遷移は無効です"
-        details = {"current_status": current_status, "target_status": target_status}
-        super().__init__(message=message, details=details, error_code="INVALID_STATUS_TRANSITION")
+        super().__init__(details={"current_status": current_status, "target_status": target_status})
 
 
+@exception_class(ErrorCode.REFRESH_TOKEN_NOT_FOUND, {
+    ("token",): "リフレッシュトークン '{token}' が見つかりません",
+    (): "リフレッシュトークンが見つかりません",
+})
 class RefreshTokenNotFoundError(NotFoundError):
     """リフレッシュトークンが見つからないエラー"""
+
+    __slots__ = ()
+
     def __init__(self, token: Optional[str] = None):
-        if token:
-            message = f"リフレッシュトークン '{token}' が見つかりません"
-            details = {"token": token}
-        else:
-            message = "リフレッシュトークンが見つかりません"
-            details = {}
-        super().__init__(message=message, details=details, error_code="REFRESH_TOKEN_NOT_FOUND")
+        details = {"token": token} if token else None
+        super().__init__(details=details)
 
 
+@exception_class(ErrorCode.TOKEN_BLACKLIST_NOT_FOUND, {
+    ("jti",): "JTI '{jti}' のブラックリストエントリが見つかりません",
+    (): "ブラックリストエントリが見つかりません",
+})
 class TokenBlacklistNotFoundError(NotFoundError):
     """トークンブラックリストエントリが見つからないエラー"""
+
+    __slots__ = ()
+
     def __init__(self, jti: Optional[str] = None):
-        if jti:
-            message = f"JTI '{jti}' のブラックリストエントリが見つかりません"
-            details = {"jti": jti}
-        else:
-            message = "ブラックリストエントリが見つかりません"
-            details = {}
-        super().__init__(message=message, details=details, error_code="TOKEN_BLACKLIST_NOT_FOUND")
+        details = {"jti": jti} if jti else None
+        super().__init__(details=details)
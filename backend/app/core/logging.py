@@ -1,10 +1,10 @@
 import logging
 import sys
-import json
 from datetime import datetime
 from typing import Dict, Any, Optional
 from logging.handlers import RotatingFileHandler
 from fastapi import Request
+import orjson
 
 from app.core.config import settings
 
@@ -37,7 +37,8 @@ class CustomJsonFormatter(logging.Formatter):
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
             
-        return json.dumps(log_record, ensure_ascii=False)
+        # orjsonはUUID・datetimeをそのまま直列化し、非ASCII文字もエスケープしない
+        return orjson.dumps(log_record, default=str).decode("utf-8")
 
 
 def get_logger(name: str) -> logging.Logger:
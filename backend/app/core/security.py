@@ -1,26 +1,102 @@
+import asyncio
 from datetime import datetime, timedelta, UTC
-import json
+import hashlib
+import math
 import secrets
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
 import uuid
 
-from passlib.context import CryptContext
-from jose import jwt, JWTError
+import bcrypt
+from cachetools import TLRUCache, TTLCache
+from cryptography.hazmat.primitives import serialization
+import jwt
+from jwt import PyJWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.exceptions import DatabaseError, ExpiredTokenError, InvalidParameterError, ValidationError
 from app.core.logging import app_logger
-from app.db.session import get_async_session
+from app.crud.refresh_token import refresh_token_crud
+from app.crud.token_blacklist import token_blacklist_crud
+from app.db.session import session_scope
 from app.schemas.token import RefreshTokenCreate
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _load_private_key():
+    """秘密鍵をパースして返す（未設定・不正な場合はNone）"""
+    pem = settings.PRIVATE_KEY
+    if not pem:
+        return None
+    try:
+        return serialization.load_pem_private_key(pem.encode(), password=None)
+    except ValueError as e:
+        app_logger.error(f"秘密鍵の読み込みに失敗しました: {str(e)}")
+        return None
+
+
+def _load_public_key(pem: str):
+    """公開鍵をパースして返す（未設定・不正な場合はNone）"""
+    if not pem:
+        return None
+    try:
+        return serialization.load_pem_public_key(pem.encode())
+    except ValueError as e:
+        app_logger.error(f"公開鍵の読み込みに失敗しました: {str(e)}")
+        return None
+
+
+# 呼び出しごとに設定オブジェクトを参照しないよう、インポート時に値を束縛する
+_ALGORITHM: str = settings.ALGORITHM
+_BLACKLIST_ENABLED: bool = bool(settings.TOKEN_BLACKLIST_ENABLED)
+_ACCESS_TOKEN_EXPIRE_SECONDS: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_TOKEN_EXPIRE_DELTA: timedelta = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+# DB参照時に想定するエラー（CRUD層がSQLAlchemyのエラーをDatabaseErrorに変換する）
+# これ以外の例外はプログラムの誤りとしてそのまま送出する
+_DB_LOOKUP_ERRORS = (DatabaseError, InvalidParameterError, TimeoutError)
+
+# 鍵はインポート時に一度だけ読み込み、パース済みのオブジェクトを使い回す
+_PRIVATE_KEY = _load_private_key()
+_PUBLIC_KEY = _load_public_key(settings.PUBLIC_KEY)
+
+# 検証に使用する鍵（アルゴリズム -> 公開鍵）
+# 移行期間中は旧アルゴリズムの鍵も登録し、どちらで署名されたトークンも受け付ける
+_VERIFY_KEYS = {_ALGORITHM: _PUBLIC_KEY}
+if settings.PREVIOUS_ALGORITHM and settings.PREVIOUS_ALGORITHM != _ALGORITHM:
+    _previous_public_key = _load_public_key(settings.PREVIOUS_PUBLIC_KEY)
+    if _previous_public_key is not None:
+        _VERIFY_KEYS[settings.PREVIOUS_ALGORITHM] = _previous_public_key
+
+
+def _decode_token(token: str) -> Dict[str, Any]:
+    """署名を検証してJWTをデコードする（移行期間中はヘッダーのalgで検証鍵を選択）"""
+    if len(_VERIFY_KEYS) == 1:
+        return jwt.decode(token, _PUBLIC_KEY, algorithms=[_ALGORITHM])
+    
+    alg = jwt.get_unverified_header(token).get("alg")
+    key = _VERIFY_KEYS.get(alg)
+    if key is None:
+        raise jwt.InvalidAlgorithmError(f"許可されていないアルゴリズムです: {alg}")
+    return jwt.decode(token, key, algorithms=[alg])
+
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(settings.BCRYPT_ROUNDS)).decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    # bcrypt形式（$2a$/$2b$/$2y$）以外のハッシュは検証不可（passlibで作成済みのハッシュはそのまま検証できる）
+    if not hashed_password or not hashed_password.startswith("$2"):
+        return False
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+async def aget_password_hash(password: str) -> str:
+    """パスワードのハッシュ化をスレッドプールで実行する（イベントループをブロックしない）"""
+    return await asyncio.to_thread(get_password_hash, password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """パスワードの検証をスレッドプールで実行する（イベントループをブロックしない）"""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
 
 async def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -34,45 +110,254 @@ async def create_access_token(data: Dict[str, Any], expires_delta: Optional[time
         str: 生成されたJWTトークン
     """
     to_encode = data.copy()
-    jti = str(uuid.uuid4())
-    to_encode.update({"jti": jti})
+    # ハイフン整形を省いた32桁の16進文字列をJTIとする
+    to_encode.update({"jti": uuid.uuid4().hex})
     
+    # expはNumericDate（UNIX秒）のため、datetimeを経由せず整数で算出する
     if expires_delta:
-        expire = datetime.now(UTC) + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + _ACCESS_TOKEN_EXPIRE_SECONDS
     
     to_encode.update({"exp": expire})
     
     # 秘密鍵の存在を確認
-    if not settings.PRIVATE_KEY:
+    if _PRIVATE_KEY is None:
         app_logger.error("秘密鍵が設定されていません")
         raise ValueError("秘密鍵が設定されていません")
     
-    # 秘密鍵を使用してトークンを署名
-    encoded_jwt = jwt.encode(
+    # 秘密鍵を使用してトークンを署名（署名処理はスレッドプールで実行しイベントループを空ける）
+    encoded_jwt = await asyncio.to_thread(
+        jwt.encode,
         to_encode, 
-        settings.PRIVATE_KEY, 
-        algorithm=settings.ALGORITHM
+        _PRIVATE_KEY, 
+        algorithm=_ALGORITHM
     )
     
     return encoded_jwt
 
+# 失効済みJTIのプロセス内キャッシュ（値はトークンのexp、exp到達で自動的に破棄される）
+_revoked_jti_cache: TLRUCache = TLRUCache(
+    maxsize=100_000,
+    ttu=lambda _key, exp, _now: exp,
+    timer=time.time
+)
+
+# ブラックリストに登録されていないことを確認済みのJTI
+# （他プロセスで失効させたトークンはTOKEN_BLACKLIST_CACHE_TTL_SECONDS経過後に反映される）
+_not_revoked_jti_cache: TTLCache = TTLCache(
+    maxsize=100_000,
+    ttl=settings.TOKEN_BLACKLIST_CACHE_TTL_SECONDS
+)
+
+class _JtiBloomFilter:
+    """
+    失効済みJTIのブルームフィルタ
+
+    偽陰性は発生しないため、フィルタに含まれないJTIは失効していないと判定できる。
+    含まれる場合（偽陽性を含む）のみDBで確認する。
+    """
+
+    __slots__ = ("_bits", "_size", "_hash_count")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self._size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self._hash_count = max(int(round(self._size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def _indexes(self, jti: str):
+        # BLAKE2bの128bitダイジェストから2つのハッシュを取り出し、二重ハッシュ法でk個の位置を得る
+        digest = hashlib.blake2b(jti.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self._hash_count):
+            yield (h1 + i * h2) % self._size
+
+    def add(self, jti: str) -> None:
+        for index in self._indexes(jti):
+            self._bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, jti: str) -> bool:
+        return all(self._bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(jti))
+
+
+# 失効済みJTIのブルームフィルタ（未構築・無効時はNoneで、常にDBで確認する）
+# アプリケーション起動時に構築し、他プロセスでの失効を反映するため
+# TOKEN_BLACKLIST_CACHE_TTL_SECONDS ごとにバックグラウンドタスクで再構築する（リクエスト処理中には構築しない）
+_BLACKLIST_BLOOM_MIN_CAPACITY = 10_000
+_blacklist_bloom: Optional[_JtiBloomFilter] = None
+_blacklist_bloom_task: Optional[asyncio.Task] = None
+
+
+async def _build_blacklist_bloom(db: AsyncSession) -> _JtiBloomFilter:
+    """有効な失効済みJTIからブルームフィルタを構築する"""
+    jtis = await token_blacklist_crud.get_active_jtis(db)
+    bloom = _JtiBloomFilter(max(_BLACKLIST_BLOOM_MIN_CAPACITY, len(jtis) * 2))
+    for jti in jtis:
+        bloom.add(jti)
+    # 構築中にこのプロセスで失効させた（まだ書き込まれていない可能性のある）JTIも含める
+    for jti in list(_revoked_jti_cache.keys()):
+        bloom.add(jti)
+    return bloom
+
+
+async def _refresh_blacklist_bloom(interval: int) -> None:
+    """一定間隔でブルームフィルタを再構築し続ける"""
+    global _blacklist_bloom
+    
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_scope() as db:
+                _blacklist_bloom = await _build_blacklist_bloom(db)
+        except Exception as e:
+            # 古いフィルタでは他プロセスでの失効を見逃すため、再構築できるまでDBで確認する
+            _blacklist_bloom = None
+            app_logger.error(f"ブラックリストのブルームフィルタ再構築中にエラーが発生しました: {str(e)}")
+
+
+async def start_blacklist_bloom() -> None:
+    """ブルームフィルタを構築し、定期再構築タスクを起動する（アプリケーション起動時に呼び出す）
+    
+    TOKEN_BLACKLIST_CACHE_TTL_SECONDS が0の場合はフィルタを使わない。
+    """
+    global _blacklist_bloom, _blacklist_bloom_task
+    
+    interval = settings.TOKEN_BLACKLIST_CACHE_TTL_SECONDS
+    if _blacklist_bloom_task is not None or not _BLACKLIST_ENABLED or interval <= 0:
+        return
+    try:
+        async with session_scope() as db:
+            _blacklist_bloom = await _build_blacklist_bloom(db)
+    except Exception as e:
+        # 構築できなかった場合は次回の再構築までDBで確認する
+        app_logger.error(f"ブラックリストのブルームフィルタ構築中にエラーが発生しました: {str(e)}")
+    _blacklist_bloom_task = asyncio.create_task(_refresh_blacklist_bloom(interval))
+
+
+async def stop_blacklist_bloom() -> None:
+    """ブルームフィルタの再構築タスクを停止する"""
+    global _blacklist_bloom, _blacklist_bloom_task
+    
+    if _blacklist_bloom_task is None:
+        return
+    task = _blacklist_bloom_task
+    _blacklist_bloom_task = None
+    _blacklist_bloom = None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+# ブラックリスト書き込みキュー（書き込みタスクの起動中のみ使用）
+# ログアウトごとにINSERT・コミットせず、書き込みタスクがまとめて一括INSERTする
+_BLACKLIST_BATCH_SIZE = 500
+_BLACKLIST_RETRY_DELAY_SECONDS = 1.0  # 書き込みに失敗したエントリを再試行するまでの待ち時間（回数ごとに倍増）
+_BLACKLIST_RETRY_MAX_DELAY_SECONDS = 60.0
+_BLACKLIST_STOP_TIMEOUT_SECONDS = 30.0  # 停止時に未書き込みエントリの書き込みを待つ最大時間
+_blacklist_queue: Optional[asyncio.Queue] = None
+_blacklist_writer_task: Optional[asyncio.Task] = None
+
+
+async def _write_blacklist_entries_individually(batch: list) -> list:
+    """一括登録に失敗したエントリを1件ずつ登録し、登録できなかったエントリを返す"""
+    failed = []
+    for jti, expires_at in batch:
+        try:
+            async with session_scope() as db:
+                await token_blacklist_crud.create_blacklist_entry(db=db, jti=jti, expires_at=expires_at)
+        except ValidationError:
+            # 登録済み、または既に有効期限切れのため書き込む必要はない
+            continue
+        except Exception as e:
+            app_logger.error(f"ブラックリストの登録中にエラーが発生しました（JTI {jti[:8]}...）: {str(e)}")
+            failed.append((jti, expires_at))
+    return failed
+
+
+async def _drain_blacklist_queue(queue: asyncio.Queue) -> None:
+    """キューに溜まったブラックリストエントリをバッチ単位でDBに書き込み続ける
+    
+    一括登録に失敗したバッチは1件ずつの登録にフォールバックし、それでも書き込めなかった
+    エントリは待ち時間を置いてキューに戻して再試行する（有効期限切れのエントリは破棄する）。
+    """
+    failures = 0
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < _BLACKLIST_BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            try:
+                async with session_scope() as db:
+                    await token_blacklist_crud.bulk_create_blacklist_entries(db, batch)
+                failed = []
+            except Exception as e:
+                app_logger.error(f"ブラックリストの一括登録中にエラーが発生しました（1件ずつ再登録します）: {str(e)}")
+                failed = await _write_blacklist_entries_individually(batch)
+            
+            now = datetime.now(UTC)
+            failed = [(jti, expires_at) for jti, expires_at in failed if expires_at > now]
+            if not failed:
+                failures = 0
+                continue
+            
+            failures += 1
+            delay = min(_BLACKLIST_RETRY_DELAY_SECONDS * 2 ** (failures - 1), _BLACKLIST_RETRY_MAX_DELAY_SECONDS)
+            app_logger.warning(f"ブラックリストの登録に失敗した{len(failed)}件を{delay:.0f}秒後に再試行します")
+            await asyncio.sleep(delay)
+            for entry in failed:
+                queue.put_nowait(entry)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+def start_blacklist_writer() -> None:
+    """ブラックリスト書き込みタスクを起動する（アプリケーション起動時に呼び出す）"""
+    global _blacklist_queue, _blacklist_writer_task
+    
+    if _blacklist_writer_task is not None or not _BLACKLIST_ENABLED:
+        return
+    _blacklist_queue = asyncio.Queue()
+    _blacklist_writer_task = asyncio.create_task(_drain_blacklist_queue(_blacklist_queue))
+
+
+async def stop_blacklist_writer() -> None:
+    """キューに残ったエントリを書き込んでから書き込みタスクを停止する"""
+    global _blacklist_queue, _blacklist_writer_task
+    
+    if _blacklist_writer_task is None:
+        return
+    queue, task = _blacklist_queue, _blacklist_writer_task
+    # 以降の登録は呼び出し元のセッションで直接書き込む
+    _blacklist_queue = None
+    try:
+        # DB障害で再試行が続く場合でも停止を無期限には待たない
+        await asyncio.wait_for(queue.join(), timeout=_BLACKLIST_STOP_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        app_logger.error("ブラックリストの未書き込みエントリを残したまま停止します")
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    _blacklist_writer_task = None
+
 # ブラックリストに追加する関数
 async def blacklist_token(token: str, db: AsyncSession) -> bool:
     """トークンをブラックリストに追加する"""
     # ブラックリスト機能が無効の場合は常にTrue（成功）を返す
-    if not settings.TOKEN_BLACKLIST_ENABLED:
+    if not _BLACKLIST_ENABLED:
         return True
         
     try:
         # ここではブラックリストチェックを除外したトークン検証が必要
         # そうしないと無限ループになるので、直接JWTデコードする
         try:
-            payload = jwt.decode(token,
-                               settings.PUBLIC_KEY,
-                               algorithms=[settings.ALGORITHM])
-        except JWTError:
+            payload = _decode_token(token)
+        except PyJWTError:
             return False
             
         if not payload:
@@ -84,75 +369,116 @@ async def blacklist_token(token: str, db: AsyncSession) -> bool:
             
         exp = payload.get("exp")
         
+        # 登録済みであればDBへの書き込みは不要
+        if jti in _revoked_jti_cache:
+            return True
+        
         # 有効期限をdatetimeオブジェクトに変換
         expires_at = datetime.fromtimestamp(exp, tz=UTC)
         
-        # SQLiteに保存
-        from app.crud.token_blacklist import token_blacklist_crud
-        await token_blacklist_crud.create_blacklist_entry(
-            db=db,
-            jti=jti,
-            expires_at=expires_at
-        )
+        # SQLiteに保存（書き込みタスクの起動中はキューに積み、一括で書き込ませる）
+        if _blacklist_queue is not None:
+            _blacklist_queue.put_nowait((jti, expires_at))
+        else:
+            await token_blacklist_crud.create_blacklist_entry(
+                db=db,
+                jti=jti,
+                expires_at=expires_at
+            )
+        _revoked_jti_cache[jti] = exp
+        _not_revoked_jti_cache.pop(jti, None)
+        if _blacklist_bloom is not None:
+            _blacklist_bloom.add(jti)
         return True
-    except Exception as e:
-        app_logger.error(f"トークンのブラックリスト登録中にエラーが発生しました: {str(e)}", exc_info=True)
+    except (ValidationError, DatabaseError) as e:
+        # 重複登録・DBエラーなど想定内の失敗はトレースバックを出力しない
+        app_logger.warning(f"トークンのブラックリスト登録に失敗しました: {e.message}")
+        return False
+    except Exception:
+        app_logger.exception("トークンのブラックリスト登録中に予期しないエラーが発生しました")
         return False
 
 # ブラックリストチェック関数
 async def is_token_blacklisted(payload: Dict[str, Any], db: AsyncSession) -> bool:
     """トークンがブラックリストに登録されているか確認"""
     # ブラックリスト機能が無効の場合は常にFalse（ブラックリストされていない）を返す
-    if not settings.TOKEN_BLACKLIST_ENABLED:
+    if not _BLACKLIST_ENABLED:
         return False
         
     jti = payload.get("jti")
     if not jti:
         return False  # jtiがない場合は古いトークン形式なのでブラックリスト非対象
+    
+    # 判定済みのトークンはDBを参照せずに判定
+    if jti in _revoked_jti_cache:
+        return True
+    if jti in _not_revoked_jti_cache:
+        return False
         
     # SQLiteでチェック
     try:
-        from app.crud.token_blacklist import token_blacklist_crud
-        return await token_blacklist_crud.is_blacklisted(db, jti)
-    except Exception as e:
+        # ブルームフィルタに含まれないJTIは失効していないためDB参照を省略
+        bloom = _blacklist_bloom
+        if bloom is not None and jti not in bloom:
+            _not_revoked_jti_cache[jti] = True
+            return False
+        
+        is_blacklisted = await token_blacklist_crud.is_blacklisted(db, jti)
+        if is_blacklisted:
+            exp = payload.get("exp")
+            if exp:
+                _revoked_jti_cache[jti] = exp
+        else:
+            _not_revoked_jti_cache[jti] = True
+        return is_blacklisted
+    except _DB_LOOKUP_ERRORS as e:
         app_logger.error(f"ブラックリストチェック中にエラーが発生しました: {str(e)}")
         return False
 
-async def verify_token(token: str) -> Optional[Dict[str, Any]]:
+async def verify_token(token: str, db: Optional[AsyncSession] = None) -> Optional[Dict[str, Any]]:
     """
     JWTトークンを検証し、ペイロードを返す関数
     
     Args:
         token: 検証するJWTトークン
+        db: ブラックリストチェックに使用するデータベースセッション
+            （省略時はチェック用のセッションを新たに作成する）
         
     Returns:
         Optional[Dict[str, Any]]: トークンが有効な場合はペイロード、無効な場合はNone
     """
     try:
         # 公開鍵を使用してトークンを検証
-        if not settings.PUBLIC_KEY:
+        if _PUBLIC_KEY is None:
             app_logger.error("公開鍵が設定されていません")
             raise ValueError("公開鍵が設定されていません")
-        payload = jwt.decode(token,
-                             settings.PUBLIC_KEY,
-                             algorithms=[settings.ALGORITHM]
-                             )
+        payload = _decode_token(token)
         
         # ブラックリストチェック（ブラックリスト機能が有効な場合のみ）
-        if settings.TOKEN_BLACKLIST_ENABLED:
+        if _BLACKLIST_ENABLED:
+            # 呼び出し元のセッションがあればそれを使ってブラックリストチェック
+            if db is not None:
+                if await is_token_blacklisted(payload, db):
+                    return None
+                return payload
+            
             # データベースセッションを取得してブラックリストチェック
-            async for db in get_async_session():
-                try:
-                    if await is_token_blacklisted(payload, db):
-                        return None
-                finally:
-                    await db.close()
-                break
+            async with session_scope() as db:
+                if await is_token_blacklisted(payload, db):
+                    return None
         
         return payload
-    except JWTError:
+    except PyJWTError:
         return None
 
+def _hash_refresh_token(token: str) -> str:
+    """
+    リフレッシュトークンをDB保存・検索用のBLAKE2b-128ダイジェスト（16進32文字）に変換する
+
+    平文のトークンはクライアントにのみ返し、DBにはダイジェストのみを保存する。
+    """
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
 async def create_refresh_token(user_id: uuid.UUID, db: AsyncSession) -> str:
     """
     リフレッシュトークンを作成し、SQLiteに保存する関数
@@ -168,18 +494,17 @@ async def create_refresh_token(user_id: uuid.UUID, db: AsyncSession) -> str:
     token = secrets.token_urlsafe(32)
     
     # 有効期限を計算
-    expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expires_at = datetime.utcnow() + _REFRESH_TOKEN_EXPIRE_DELTA
     
-    # token_dataを作成
+    # token_dataを作成（DBにはダイジェストを保存）
     token_data = RefreshTokenCreate(
-        token=token,
+        token=_hash_refresh_token(token),
         user_id=user_id,
         expires_at=expires_at
         )
 
     # SQLiteに保存
     try:
-        from app.crud.refresh_token import refresh_token_crud
         await refresh_token_crud.create(db=db, token_data=token_data)
         
         return token
@@ -187,6 +512,32 @@ async def create_refresh_token(user_id: uuid.UUID, db: AsyncSession) -> str:
         app_logger.error(f"リフレッシュトークン作成中にエラーが発生しました: {str(e)}")
         raise
 
+async def rotate_refresh_token(token: str, db: AsyncSession) -> Optional[Tuple[str, uuid.UUID]]:
+    """
+    リフレッシュトークンをローテーションする関数
+    
+    Args:
+        token: 現在のリフレッシュトークン
+        db: データベースセッション
+        
+    Returns:
+        Optional[Tuple[str, uuid.UUID]]: 成功した場合は（新しいリフレッシュトークン, ユーザーID）、
+        トークンが無効または期限切れの場合はNone
+    """
+    new_token = secrets.token_urlsafe(32)
+    expires_at = datetime.utcnow() + _REFRESH_TOKEN_EXPIRE_DELTA
+    
+    user_id = await refresh_token_crud.rotate_refresh_token(
+        db=db,
+        old_token=_hash_refresh_token(token),
+        new_token=_hash_refresh_token(new_token),
+        expires_at=expires_at
+    )
+    if user_id is None:
+        return None
+    
+    return new_token, user_id
+
 async def verify_refresh_token(token: str, db: AsyncSession) -> Optional[str]:
     """
     リフレッシュトークンを検証し、関連するユーザーIDを返す関数
@@ -199,12 +550,11 @@ async def verify_refresh_token(token: str, db: AsyncSession) -> Optional[str]:
         Optional[str]: トークンが有効な場合はユーザーID、無効な場合はNone
         
     Raises:
-        JWTError: トークンの有効期限が切れている場合
+        PyJWTError: トークンの有効期限が切れている場合
     """
     try:
         # SQLiteからトークンを取得
-        from app.crud.refresh_token import refresh_token_crud
-        refresh_token = await refresh_token_crud.get_by_token(db, token)
+        refresh_token = await refresh_token_crud.get_by_token(db, _hash_refresh_token(token))
         
         if not refresh_token:
             return None
@@ -212,13 +562,12 @@ async def verify_refresh_token(token: str, db: AsyncSession) -> Optional[str]:
         # ユーザーIDを文字列として返す
         return str(refresh_token.user_id)
     
-    except Exception as e:
-        if "ExpiredTokenError" in str(type(e).__name__):
-            app_logger.warning(f"リフレッシュトークンの有効期限切れ")
-            # 期限切れのトークンを削除
-            await revoke_refresh_token(token, db)
-            raise jwt.JWTError("リフレッシュトークンの有効期限が切れています")
-        
+    except ExpiredTokenError:
+        app_logger.warning("リフレッシュトークンの有効期限切れ")
+        # 期限切れのトークンを削除
+        await revoke_refresh_token(token, db)
+        raise PyJWTError("リフレッシュトークンの有効期限が切れています")
+    except _DB_LOOKUP_ERRORS as e:
         app_logger.error(f"リフレッシュトークン検証中にエラーが発生しました: {str(e)}")
         return None
 
@@ -235,8 +584,7 @@ async def revoke_refresh_token(token: str, db: AsyncSession) -> bool:
     """
     try:
         # SQLiteから削除
-        from app.crud.refresh_token import refresh_token_crud
-        return await refresh_token_crud.delete_refresh_token(db, token)
+        return await refresh_token_crud.delete_refresh_token(db, _hash_refresh_token(token))
     except Exception as e:
         app_logger.error(f"リフレッシュトークン削除中にエラーが発生しました: {str(e)}")
         return False
@@ -1,11 +1,43 @@
 # CRUD操作のインポート
-from app.crud.user import user_crud
-from app.crud.article import article_crud
-from app.crud.knowledge import knowledge_crud
+# app.core.security がCRUDモジュールを直接インポートするため、
+# パッケージ初期化時に user_crud（→ security）を読み込まないよう遅延インポートする（PEP 562）
+# 各CRUDモジュールは初回アクセス時にのみ読み込まれ、以降はモジュール属性として保持される
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from app.crud.article import article_crud
+    from app.crud.knowledge import knowledge_crud
+    from app.crud.refresh_token import refresh_token_crud
+    from app.crud.token_blacklist import token_blacklist_crud
+    from app.crud.user import user_crud
+
+_LAZY_EXPORTS = {
+    "user_crud": "app.crud.user",
+    "article_crud": "app.crud.article",
+    "knowledge_crud": "app.crud.knowledge",
+    "refresh_token_crud": "app.crud.refresh_token",
+    "token_blacklist_crud": "app.crud.token_blacklist",
+}
 
 # すべてのCRUDをエクスポート
 __all__ = [
     "user_crud",
     "article_crud", 
-    "knowledge_crud"
-]
\ No newline at end of file
+    "knowledge_crud",
+    "refresh_token_crud",
+    "token_blacklist_crud"
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
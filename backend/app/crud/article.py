@@ -1,10 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import List, Optional
+from sqlalchemy import insert, lambda_stmt, select, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, PendingRollbackError, SQLAlchemyError
+from sqlalchemy.orm import raiseload
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
 import csv
 import io
-from uuid import UUID
+import re
+import unicodedata
+from uuid import UUID, uuid4
 
 from app.core.exceptions import (
     ArticleNotFoundError, 
@@ -20,11 +25,49 @@ from app.core.logging import get_logger
 from app.models import Article
 from app.schemas import ArticleCreate
 
+# 正規表現はモジュール読み込み時に一度だけコンパイルする
+# 記事URLのテンプレート（%s に記事UUIDを埋め込む）
+_ARTICLE_URL_TEMPLATE = (
+    "http://sv-vw-ejap:5555/SupportCenter/main.aspx"
+    "?etc=127&extraqs=%%3fetc%%3d127%%26id%%3d%%257b%s%%257d&newWindow=true&pagetype=entityrecord"
+)
+# 記事URL（generate_article_url の形式）に含まれる記事UUID
+_UUID_IN_URL_RE = re.compile(r'%257b([^%]+)%257d')
+# URLの妥当性チェック
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+# タイトルからのURLスラッグ生成
+_SLUG_INVALID_CHARS_RE = re.compile(r'[^\w\s-]')
+_SLUG_SEPARATORS_RE = re.compile(r'[-\s]+')
+# ASCII範囲で _SLUG_INVALID_CHARS_RE に該当する文字を削除する変換テーブル（正規表現を通さず除去する）
+_SLUG_ASCII_DELETE_TABLE = str.maketrans(
+    '', '', ''.join(c for c in map(chr, range(128)) if _SLUG_INVALID_CHARS_RE.match(c))
+)
+
+# CSVの必須ヘッダー（一括作成）・必須フィールド（インポート）
+_BULK_CSV_REQUIRED_HEADERS = frozenset(('title', 'content', 'url'))
+_IMPORT_CSV_REQUIRED_FIELDS = frozenset(('article_uuid', 'article_number', 'title'))
+
+# 記事のSELECTには raiseload("*") を付与し、意図しない遅延ロード（N+1）をその場でエラーにする
+# リレーションが必要な場合は selectinload を明示的に指定すること
+
 
 class ArticleCRUD:
     """記事関連のCRUD操作"""
     logger = get_logger(__name__)
     
+    # IN句に渡す値の最大件数
+    _IN_CHUNK_SIZE = 500
+    # 一括INSERT 1文あたりの最大行数（文のサイズ・メモリ・ロック時間を抑える）
+    _INSERT_CHUNK_SIZE = 1000
+    # ストリーミング取得時に1回でフェッチする行数
+    _STREAM_YIELD_PER = 500
+    
     async def get(self, db: AsyncSession, id: UUID) -> Optional[Article]:
         """IDで記事を取得"""
         if not id:
@@ -32,29 +75,22 @@ class ArticleCRUD:
             raise InvalidParameterError("id", id, "記事IDが必要です")
         
         try:
-            self.logger.info(f"Retrieving article by id: {id}")
+            self.logger.debug("Retrieving article by id: %s", id)
             
-            # データベース接続チェック
-            if not db.is_active:
-                self.logger.error("Database session is not active")
-                raise DatabaseConnectionError("データベースセッションがアクティブではありません")
+            # 主キー検索はアイデンティティマップを優先し、セッション内に読み込み済みならSQLを発行しない
+            article = await db.get(Article, id, options=[raiseload("*")])
             
-            result = await db.execute(select(Article).filter(Article.id == id))
-            article = result.scalar_one_or_none()
-            
-            if article:
-                self.logger.info(f"Found article with id: {id}")
-                return article
-            else:
-                self.logger.info(f"Article with id {id} not found")
+            if not article:
+                self.logger.debug("Article with id %s not found", id)
                 raise ArticleNotFoundError(f"記事ID {id} が見つかりません")
+            return article
                 
-        except InvalidParameterError:
-            raise
-        except DatabaseConnectionError:
-            raise
-        except ArticleNotFoundError:
+        except (InvalidParameterError, ArticleNotFoundError):
             raise
+        except PendingRollbackError as e:
+            # セッションのトランザクションが無効な場合はSQLAlchemyが送出する例外を変換する
+            self.logger.error("Database session is not active")
+            raise DatabaseConnectionError("データベースセッションがアクティブではありません") from e
         except SQLAlchemyError as e:
             self.logger.error(f"Database error retrieving article by id {id}: {str(e)}")
             raise DatabaseQueryError(f"記事ID取得中にデータベースエラーが発生しました: {str(e)}") from e
@@ -62,6 +98,13 @@ class ArticleCRUD:
             self.logger.error(f"Unexpected error retrieving article by id {id}: {str(e)}")
             raise DatabaseQueryError(f"記事ID取得中に予期しないエラーが発生しました: {str(e)}") from e
     
+    async def _get_by(self, db: AsyncSession, column, value) -> Optional[Article]:
+        """指定カラムの値で記事を1件取得（一意カラムの検索で同じ形のステートメントを再利用する）"""
+        result = await db.execute(
+            lambda_stmt(lambda: select(Article).options(raiseload("*")).where(column == value))
+        )
+        return result.scalar_one_or_none()
+    
     async def get_by_uuid(self, db: AsyncSession, article_uuid: UUID) -> Optional[Article]:
         """UUIDで記事を取得"""
         try:
@@ -70,27 +113,21 @@ class ArticleCRUD:
                 self.logger.error("Article UUID is required")
                 raise InvalidParameterError("article_uuid", article_uuid, "記事UUIDが必要です")
             
-            self.logger.info(f"Retrieving article by uuid: {article_uuid}")
-            
-            # データベース接続チェック
-            if not db.is_active:
-                self.logger.error("Database session is not active")
-                raise DatabaseConnectionError("データベースセッションがアクティブではありません")
+            self.logger.debug("Retrieving article by uuid: %s", article_uuid)
             
-            result = await db.execute(select(Article).filter(Article.article_uuid == article_uuid))
-            article = result.scalar_one_or_none()
+            article = await self._get_by(db, Article.article_uuid, article_uuid)
             
-            if article:
-                self.logger.info(f"Found article with uuid: {article_uuid}")
-            else:
-                self.logger.info(f"Article with uuid {article_uuid} not found")
+            if not article:
+                self.logger.debug("Article with uuid %s not found", article_uuid)
             
             return article
             
         except InvalidParameterError:
             raise
-        except DatabaseConnectionError:
-            raise
+        except PendingRollbackError as e:
+            # セッションのトランザクションが無効な場合はSQLAlchemyが送出する例外を変換する
+            self.logger.error("Database session is not active")
+            raise DatabaseConnectionError("データベースセッションがアクティブではありません") from e
         except SQLAlchemyError as e:
             self.logger.error(f"Database error retrieving article by uuid {article_uuid}: {str(e)}")
             raise DatabaseQueryError(f"記事UUID取得中にデータベースエラーが発生しました: {str(e)}") from e
@@ -106,29 +143,21 @@ class ArticleCRUD:
                 self.logger.error("Article number is required and cannot be empty")
                 raise InvalidParameterError("article_number", article_number, "記事番号が必要です")
             
-            self.logger.info(f"Retrieving article by article number: {article_number}")
+            self.logger.debug("Retrieving article by article number: %s", article_number)
             
-            # データベース接続チェック
-            if not db.is_active:
-                self.logger.error("Database session is not active")
-                raise DatabaseConnectionError("データベースセッションがアクティブではありません")
+            article = await self._get_by(db, Article.article_number, article_number)
             
-            result = await db.execute(
-                select(Article).where(Article.article_number == article_number)
-            )
-            article = result.scalar_one_or_none()
-            
-            if article:
-                self.logger.info(f"Found article with article number: {article_number}")
-            else:
-                self.logger.info(f"Article with article number {article_number} not found")
+            if not article:
+                self.logger.debug("Article with article number %s not found", article_number)
             
             return article
             
         except InvalidParameterError:
             raise
-        except DatabaseConnectionError:
-            raise
+        except PendingRollbackError as e:
+            # セッションのトランザクションが無効な場合はSQLAlchemyが送出する例外を変換する
+            self.logger.error("Database session is not active")
+            raise DatabaseConnectionError("データベースセッションがアクティブではありません") from e
         except SQLAlchemyError as e:
             self.logger.error(f"Database error retrieving article by number {article_number}: {str(e)}")
             raise DatabaseQueryError(f"記事番号取得中にデータベースエラーが発生しました: {str(e)}") from e
@@ -149,13 +178,11 @@ class ArticleCRUD:
         if limit <= 0 or limit > 1000:
             raise InvalidParameterError("limit", limit, "limitは1以上1000以下である必要があります")
         
-        self.logger.info(f"Retrieving all articles")
+        self.logger.debug("Retrieving articles: skip=%s, limit=%s", skip, limit)
         try:
             result = await db.execute(
-                select(Article)
-                .where(Article.is_active == True)
-                .offset(skip)
-                .limit(limit)
+                lambda_stmt(lambda: select(Article).options(raiseload("*")).where(Article.is_active == True))
+                + (lambda s: s.offset(skip).limit(limit))
             )
             return result.scalars().all()
         except Exception as e:
@@ -172,16 +199,16 @@ class ArticleCRUD:
     ) -> List[Article]:
         """記事番号またはタイトルで記事を検索"""
         result = await db.execute(
-            select(Article)
-            .where(
-                Article.is_active == True,
-                or_(
-                    Article.article_number.contains(query),
-                    Article.title.contains(query)
+            lambda_stmt(
+                lambda: select(Article).options(raiseload("*")).where(
+                    Article.is_active == True,
+                    or_(
+                        Article.article_number.contains(query),
+                        Article.title.contains(query)
+                    )
                 )
             )
-            .offset(skip)
-            .limit(limit)
+            + (lambda s: s.offset(skip).limit(limit))
         )
         return result.scalars().all()
     
@@ -192,10 +219,11 @@ class ArticleCRUD:
         
         try:
             result = await db.execute(
-                select(Article)
-                .where(
-                    Article.is_active == True,
-                    Article.title.contains(query)
+                lambda_stmt(
+                    lambda: select(Article).options(raiseload("*")).where(
+                        Article.is_active == True,
+                        Article.title.contains(query)
+                    )
                 )
             )
             return result.scalars().all()
@@ -209,18 +237,37 @@ class ArticleCRUD:
             raise InvalidParameterError("query", query, "検索クエリが必要です")
         
         try:
-            result = await db.execute(
-                select(Article)
-                .where(
-                    Article.is_active == True,
-                    Article.content.contains(query)
-                )
-            )
+            result = await db.execute(self._content_search_stmt(query))
             return result.scalars().all()
         except Exception as e:
             self.logger.error(f"Error searching articles by content: {str(e)}")
             raise DatabaseQueryError(f"コンテンツ検索中にエラーが発生しました: {str(e)}") from e
     
+    async def stream_by_content(self, db: AsyncSession, query: str) -> AsyncIterator[Article]:
+        """コンテンツで記事を検索し、結果を一括でリスト化せず逐次返す（件数上限のない検索用）"""
+        if not query or not query.strip():
+            raise InvalidParameterError("query", query, "検索クエリが必要です")
+        
+        try:
+            result = await db.stream_scalars(
+                self._content_search_stmt(query),
+                execution_options={"yield_per": self._STREAM_YIELD_PER}
+            )
+            async for article in result:
+                yield article
+        except Exception as e:
+            self.logger.error(f"Error streaming articles by content: {str(e)}")
+            raise DatabaseQueryError(f"コンテンツ検索中にエラーが発生しました: {str(e)}") from e
+    
+    def _content_search_stmt(self, query: str):
+        """コンテンツ検索用のステートメント"""
+        return lambda_stmt(
+            lambda: select(Article).options(raiseload("*")).where(
+                Article.is_active == True,
+                Article.content.contains(query)
+            )
+        )
+    
     async def get_by_url(self, db: AsyncSession, url: str) -> Optional[Article]:
         """URLで記事を取得（記事UUIDから生成されたURLで検索）"""
         if not url or not url.strip():
@@ -228,16 +275,12 @@ class ArticleCRUD:
         
         try:
             # URLから記事UUIDを抽出
-            import re
-            uuid_match = re.search(r'%257b([^%]+)%257d', url)
+            uuid_match = _UUID_IN_URL_RE.search(url)
             if not uuid_match:
                 raise ArticleNotFoundError(f"URL {url} から記事UUIDを抽出できません")
             
             article_uuid = uuid_match.group(1)
-            result = await db.execute(
-                select(Article).where(Article.article_uuid == article_uuid)
-            )
-            article = result.scalar_one_or_none()
+            article = await self._get_by(db, Article.article_uuid, article_uuid)
             
             if not article:
                 raise ArticleNotFoundError(f"URL {url} の記事が見つかりません")
@@ -249,21 +292,46 @@ class ArticleCRUD:
             self.logger.error(f"Error retrieving article by URL: {str(e)}")
             raise DatabaseQueryError(f"URL検索中にエラーが発生しました: {str(e)}") from e
     
-    async def create(self, db: AsyncSession, obj_in: ArticleCreate) -> Article:
-        """新しい記事を作成"""
-        # バリデーション
-        if not obj_in.title or not obj_in.title.strip():
+    def _validate_create(self, obj_in: ArticleCreate) -> None:
+        """記事作成データのバリデーション"""
+        self._validate_row(obj_in.article_number, obj_in.title, getattr(obj_in, 'content', None))
+    
+    def _validate_row(self, article_number: Optional[str], title: Optional[str], content: Optional[str]) -> None:
+        """記事作成データ（各値）のバリデーション"""
+        if not title or not title.strip():
             raise ValidationError("タイトルが必要です")
-        if not obj_in.article_number or not obj_in.article_number.strip():
+        if not article_number or not article_number.strip():
             raise ValidationError("記事番号が必要です")
-        if hasattr(obj_in, 'content') and obj_in.content is not None and not obj_in.content.strip():
+        if content is not None and not content.strip():
             raise ValidationError("コンテンツが必要です")
+    
+    async def _get_existing_values(self, db: AsyncSession, column, values: Iterable[str]) -> Set[str]:
+        """指定カラムについて、既に登録されている値をIN句でまとめて取得"""
+        values = list(dict.fromkeys(values))
+        existing = set()
+        # バインド変数の上限を超えないよう分割して問い合わせる
+        for start in range(0, len(values), self._IN_CHUNK_SIZE):
+            result = await db.execute(
+                select(column).where(column.in_(values[start:start + self._IN_CHUNK_SIZE]))
+            )
+            existing.update(result.scalars().all())
+        return existing
+    
+    async def _bulk_insert(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Article]:
+        """記事をチャンク単位のINSERT（executemany）で一括作成し、作成した記事を入力順で返す"""
+        articles: List[Article] = []
+        stmt = insert(Article).returning(Article, sort_by_parameter_order=True)
+        for start in range(0, len(rows), self._INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + self._INSERT_CHUNK_SIZE]
+            articles.extend((await db.scalars(stmt, chunk)).all())
+        return articles
+    
+    async def create(self, db: AsyncSession, obj_in: ArticleCreate) -> Article:
+        """新しい記事を作成"""
+        # バリデーション
+        self._validate_create(obj_in)
         
         self.logger.info(f"Creating new article: {obj_in.article_number}")
-        # 記事番号の重複チェック
-        existing_article = await self.get_by_number(db, obj_in.article_number)
-        if existing_article:
-            raise DuplicateArticleError(obj_in.article_number)
         
         db_obj = Article(
             article_uuid=obj_in.article_uuid,
@@ -271,42 +339,46 @@ class ArticleCRUD:
             title=obj_in.title,
             content=getattr(obj_in, 'content', None)
         )
-        db.add(db_obj)
-        await db.flush()
+        try:
+            # 記事番号・UUIDの重複はDBの一意制約で検出する（事前のSELECTは行わない）
+            # セーブポイント内でflushし、失敗時もセッションをロールバック待ちにしない
+            async with db.begin_nested():
+                db.add(db_obj)
+        except IntegrityError as e:
+            if "article_number" in str(e.orig):
+                self.logger.error(f"Article number {obj_in.article_number} already exists")
+                raise DuplicateArticleError(obj_in.article_number) from e
+            self.logger.error(f"Integrity error creating article {obj_in.article_number}: {str(e)}")
+            raise DatabaseIntegrityError(f"記事作成中にデータベース整合性エラーが発生しました: {str(e)}") from e
         # commitはsessionのfinallyで行う
         return db_obj
     
     def _is_valid_url(self, url: str) -> bool:
         """URLの妥当性をチェック"""
-        import re
-        url_pattern = re.compile(
-            r'^https?://'  # http:// or https://
-            r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-            r'localhost|'  # localhost...
-            r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-            r'(?::\d+)?'  # optional port
-            r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-        return url_pattern.match(url) is not None
+        return _URL_RE.match(url) is not None
     
     async def bulk_create_from_csv(self, db: AsyncSession, csv_file) -> List[Article]:
         """CSVファイルから記事を一括作成"""
         if not csv_file:
             raise ValidationError("CSVファイルが必要です")
         
+        text_file = csv_file
         try:
-            # CSVファイルの内容を読み取り
-            csv_content = csv_file.read()
-            if not csv_content.strip():
-                raise ValidationError("CSVファイルが空です")
+            # バイナリストリーム（UploadFile.file 等）は逐次デコードする
+            if not isinstance(csv_file, io.TextIOBase):
+                text_file = io.TextIOWrapper(csv_file, encoding='utf-8-sig', newline='')
             
-            csv_reader = csv.DictReader(io.StringIO(csv_content))
+            # ファイル全体を読み込まず、1行ずつ解析する
+            csv_reader = csv.DictReader(text_file)
+            if csv_reader.fieldnames is None:
+                raise ValidationError("CSVファイルが空です")
             
             # ヘッダーの検証
-            required_headers = ['title', 'content', 'url']
-            if not all(header in csv_reader.fieldnames for header in required_headers):
-                raise ValidationError(f"必須ヘッダーが不足しています: {required_headers}")
+            missing_headers = _BULK_CSV_REQUIRED_HEADERS.difference(csv_reader.fieldnames)
+            if missing_headers:
+                raise ValidationError(f"必須ヘッダーが不足しています: {sorted(missing_headers)}")
             
-            articles = []
+            rows = []
             urls_in_csv = set()
             
             for row_num, row in enumerate(csv_reader, start=2):
@@ -315,30 +387,38 @@ class ArticleCRUD:
                     raise ValidationError(f"CSV内でURLが重複しています: {row['url']}")
                 urls_in_csv.add(row['url'])
                 
-                # UUIDと記事番号を生成
-                import uuid
-                article_uuid = str(uuid.uuid4())
+                # 記事作成データの準備（UUIDと記事番号を生成）
+                # CSVの値は文字列のため、スキーマを経由せず直接INSERT用の辞書を組み立てる
                 article_number = f"CSV-{row_num:05d}"
-                
-                # 記事作成データの準備
-                article_data = ArticleCreate(
-                    article_uuid=article_uuid,
-                    article_number=article_number,
-                    title=row['title'],
-                    content=row['content']
-                )
-                
-                # 記事作成
-                article = await self.create(db, article_data)
-                articles.append(article)
+                self._validate_row(article_number, row['title'], row['content'])
+                rows.append({
+                    'article_uuid': str(uuid4()),
+                    'article_number': article_number,
+                    'title': row['title'],
+                    'content': row['content'],
+                })
             
-            return articles
+            # 記事番号の重複チェック（1回のクエリでまとめて確認）
+            existing_numbers = await self._get_existing_values(
+                db, Article.article_number, (row['article_number'] for row in rows)
+            )
+            for row in rows:
+                if row['article_number'] in existing_numbers:
+                    raise DuplicateArticleError(row['article_number'])
+            
+            # 記事作成（チャンク単位の一括INSERT）
+            self.logger.info(f"Bulk creating {len(rows)} articles from CSV")
+            return await self._bulk_insert(db, rows)
             
         except ValidationError:
             raise
         except Exception as e:
             self.logger.error(f"Error in bulk create from CSV: {str(e)}")
             raise ValidationError(f"CSV処理中にエラーが発生しました: {str(e)}") from e
+        finally:
+            # 呼び出し元のファイルを閉じないようラッパーを切り離す
+            if text_file is not csv_file:
+                text_file.detach()
     
     async def import_from_csv(self, db: AsyncSession, csv_content: str) -> dict:
         """CSVから記事を一括インポート"""
@@ -346,33 +426,68 @@ class ArticleCRUD:
         
         try:
             csv_reader = csv.DictReader(io.StringIO(csv_content))
+            candidates = []
             
             for row_num, row in enumerate(csv_reader, start=2):  # ヘッダー行を考慮して2から開始
                 try:
                     # 必須フィールドのチェック
-                    if not all(key in row for key in ['article_uuid', 'article_number', 'title']):
-                        result["errors"].append(f"行 {row_num}: 必須フィールドが不足しています")
-                        continue
-                    
-                    # 重複チェック
-                    existing_article = await self.get_by_number(db, row['article_number'])
-                    if existing_article:
-                        result["duplicates"].append(f"行 {row_num}: 記事番号 {row['article_number']} は既に存在します")
+                    missing_fields = _IMPORT_CSV_REQUIRED_FIELDS - row.keys()
+                    if missing_fields:
+                        result["errors"].append(f"行 {row_num}: 必須フィールドが不足しています: {sorted(missing_fields)}")
                         continue
                     
-                    # 記事作成
                     article_data = ArticleCreate(
                         article_uuid=row['article_uuid'],
                         article_number=row['article_number'],
                         title=row['title'],
                         content=row.get('content', '')
                     )
-                    
-                    await self.create(db, article_data)
-                    result["success"] += 1
+                    self._validate_create(article_data)
+                    candidates.append((row_num, article_data))
                     
                 except Exception as e:
                     result["errors"].append(f"行 {row_num}: {str(e)}")
+            
+            # CSV内の重複チェック（先に出現した行を優先）
+            rows = []
+            row_nums = []
+            csv_numbers = set()
+            csv_uuids = set()
+            for row_num, data in candidates:
+                if data.article_number in csv_numbers:
+                    result["duplicates"].append(f"行 {row_num}: 記事番号 {data.article_number} は既に存在します")
+                    continue
+                if data.article_uuid in csv_uuids:
+                    result["errors"].append(f"行 {row_num}: 記事UUID {data.article_uuid} は既に存在します")
+                    continue
+                csv_numbers.add(data.article_number)
+                csv_uuids.add(data.article_uuid)
+                rows.append(data.model_dump())
+                row_nums.append(row_num)
+            
+            if not rows:
+                return result
+            
+            # 記事作成（既存記事との重複は ON CONFLICT DO NOTHING で除外し、作成できた記事番号を返す）
+            dialect_name = db.get_bind().dialect.name
+            if dialect_name == "postgresql":
+                stmt = postgresql_insert(Article).on_conflict_do_nothing()
+            elif dialect_name == "sqlite":
+                stmt = sqlite_insert(Article).on_conflict_do_nothing()
+            else:
+                stmt = insert(Article)
+            stmt = stmt.returning(Article.article_number)
+            inserted_numbers = set()
+            for start in range(0, len(rows), self._INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + self._INSERT_CHUNK_SIZE]
+                inserted_numbers.update((await db.scalars(stmt, chunk)).all())
+            
+            for row_num, row in zip(row_nums, rows):
+                if row['article_number'] not in inserted_numbers:
+                    result["duplicates"].append(
+                        f"行 {row_num}: 記事番号 {row['article_number']} または記事UUID {row['article_uuid']} は既に存在します"
+                    )
+            result["success"] = len(inserted_numbers)
                     
         except Exception as e:
             result["errors"].append(f"CSV解析エラー: {str(e)}")
@@ -384,15 +499,15 @@ class ArticleCRUD:
         if not title or not title.strip():
             raise InvalidParameterError("title", title, "タイトルが必要です")
         
-        import re
-        import unicodedata
-        
         # Unicode正規化
         normalized = unicodedata.normalize('NFKD', title)
         
         # 特殊文字を除去し、スペースをハイフンに変換
-        cleaned = re.sub(r'[^\w\s-]', '', normalized)
-        cleaned = re.sub(r'[-\s]+', '-', cleaned)
+        # ASCIIの記号は変換テーブルで除去し、非ASCII文字が残る場合のみ正規表現を適用する
+        cleaned = normalized.translate(_SLUG_ASCII_DELETE_TABLE)
+        if not cleaned.isascii():
+            cleaned = _SLUG_INVALID_CHARS_RE.sub('', cleaned)
+        cleaned = _SLUG_SEPARATORS_RE.sub('-', cleaned)
         
         # 先頭と末尾のハイフンを除去
         cleaned = cleaned.strip('-')
@@ -408,9 +523,12 @@ class ArticleCRUD:
     
     def generate_article_url(self, article_uuid: str) -> str:
         """記事のURLを生成"""
-        base_url = "http://sv-vw-ejap:5555/SupportCenter/main.aspx"
-        params = f"?etc=127&extraqs=%3fetc%3d127%26id%3d%257b{article_uuid}%257d&newWindow=true&pagetype=entityrecord"
-        return base_url + params
+        return _ARTICLE_URL_TEMPLATE % article_uuid
+    
+    def generate_article_urls(self, article_uuids: Iterable[str]) -> List[str]:
+        """複数記事のURLをまとめて生成（一覧レスポンス用）"""
+        template = _ARTICLE_URL_TEMPLATE
+        return [template % article_uuid for article_uuid in article_uuids]
 
 
 # シングルトンインスタンス
@@ -1,11 +1,20 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import delete, event, func, insert, inspect, lambda_stmt, or_, select, update, desc, and_, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from datetime import datetime
 from uuid import UUID
+from collections import Counter
+import base64
+import binascii
+import logging
+import pickle
 import time
 
+from cachetools import TTLCache
+
+from app.core.config import settings
 from app.core.exceptions import (
     KnowledgeNotFoundError, 
     ArticleNotFoundError, 
@@ -18,120 +27,430 @@ from app.models import Knowledge, StatusEnum, ChangeTypeEnum, User
 from app.schemas import KnowledgeCreate, KnowledgeUpdate
 
 
+logger = get_logger(__name__)
+
+# キーセットページネーションのカーソル（最後に取得したナレッジの作成日時とID）
+KnowledgeCursor = Tuple[datetime, UUID]
+
+
+def encode_cursor(knowledge: Knowledge) -> str:
+    """ナレッジから次ページ取得用の不透明なカーソル文字列を生成"""
+    raw = f"{knowledge.created_at.isoformat()}|{knowledge.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> KnowledgeCursor:
+    """カーソル文字列を (作成日時, ID) に復元"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, _, knowledge_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), UUID(knowledge_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValidationError("カーソルの形式が正しくありません") from e
+
+
+# 記事別ナレッジ一覧の先頭ページのキャッシュ（(記事番号, limit) -> 一覧のpickle）
+# ORMオブジェクトはセッションをまたいで共有せず、取得のたびに呼び出し元のセッションへ
+# merge(load=False) で複製する。コミット済みのデータのみを保持し、他プロセスでの更新はTTL経過後に反映される
+_article_list_cache: TTLCache = TTLCache(
+    maxsize=settings.KNOWLEDGE_ARTICLE_CACHE_SIZE,
+    ttl=settings.KNOWLEDGE_ARTICLE_CACHE_TTL_SECONDS
+)
+
+
+def _invalidate_article_cache(article_number: str) -> None:
+    """記事番号に対応するナレッジ一覧のキャッシュを破棄"""
+    for key in [key for key in list(_article_list_cache.keys()) if key[0] == article_number]:
+        _article_list_cache.pop(key, None)
+
+
+# セッションごとの書き込み状況（Session.info のキー）
+# 書き込みのあるトランザクションではキャッシュを読み書きせず（未コミットの行を他のセッションへ返さない）、
+# キャッシュの破棄はコミット後に行う（コミット前に破棄すると古い値が再格納されうる）
+_SESSION_HAS_WRITES = "knowledge_cache_has_writes"
+_SESSION_PENDING_ARTICLES = "knowledge_cache_pending_articles"
+_SESSION_PENDING_COUNTS = "knowledge_cache_pending_counts"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_writes(session: Session, flush_context) -> None:
+    """ORMのflushで書き込みが発生したトランザクションを記録"""
+    session.info[_SESSION_HAS_WRITES] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_caches(session: Session) -> None:
+    """コミットされた書き込みに対応するキャッシュを破棄"""
+    for article_number in session.info.pop(_SESSION_PENDING_ARTICLES, ()):
+        _invalidate_article_cache(article_number)
+    if session.info.pop(_SESSION_PENDING_COUNTS, False):
+        _count_cache.clear()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_session_writes(session: Session, transaction) -> None:
+    """最上位のトランザクション終了時（コミット・ロールバック・クローズ）に書き込み状況を破棄"""
+    if transaction.parent is None:
+        session.info.pop(_SESSION_HAS_WRITES, None)
+        session.info.pop(_SESSION_PENDING_ARTICLES, None)
+        session.info.pop(_SESSION_PENDING_COUNTS, None)
+
+
+def _session_has_writes(db: AsyncSession) -> bool:
+    """未コミットの書き込み（flush済み・未flush）を持つセッションかを判定"""
+    return bool(db.info.get(_SESSION_HAS_WRITES) or db.new or db.dirty or db.deleted)
+
+
+def _invalidate_article_cache_on_commit(db: AsyncSession, article_number: str) -> None:
+    """記事番号に対応するナレッジ一覧のキャッシュをコミット後に破棄するよう登録
+    
+    INSERT/UPDATE/DELETE文の実行は after_flush では検出できないため、書き込みもここで記録する。
+    """
+    db.info[_SESSION_HAS_WRITES] = True
+    db.info.setdefault(_SESSION_PENDING_ARTICLES, set()).add(article_number)
+
+
+def _invalidate_count_cache_on_commit(db: AsyncSession) -> None:
+    """ナレッジ件数のキャッシュをコミット後に破棄するよう登録"""
+    db.info[_SESSION_HAS_WRITES] = True
+    db.info[_SESSION_PENDING_COUNTS] = True
+
+
+# ナレッジ件数のキャッシュ（(種別, 絞り込み値) -> 件数）
+# コミット済みの件数のみを保持し、作成・ステータス更新・削除のコミット後に破棄する。
+# 他プロセスでの更新はTTL経過後に反映される
+_count_cache: TTLCache = TTLCache(maxsize=512, ttl=settings.KNOWLEDGE_COUNT_CACHE_TTL_SECONDS)
+
+
+# 作成者・承認者の列を結合して取得するためのエイリアス（ORMを経由しない一覧取得用）
+_Author = aliased(User, name="author")
+_Approver = aliased(User, name="approver")
+
+# 一覧の並び順（新しい順）
+_LIST_ORDER_BY = (desc(Knowledge.created_at), desc(Knowledge.id))
+
+
+def _join_id_page(stmt, criteria: tuple, skip: int, limit: int):
+    """OFFSET/LIMIT をIDのみのサブクエリで適用し、そのIDで本体を結合する（遅延結合）"""
+    id_subq = (
+        select(Knowledge.id)
+        .where(*criteria)
+        .order_by(*_LIST_ORDER_BY)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    return stmt.join(id_subq, Knowledge.id == id_subq.c.id)
+
+
+# 作成者自身に許可するステータス遷移（管理者は全ての遷移が可能）
+_AUTHOR_STATUS_TRANSITIONS = frozenset({
+    (StatusEnum.draft, StatusEnum.submitted),
+    (StatusEnum.submitted, StatusEnum.draft),
+})
+
+# 遷移先ステータスごとに設定する日時カラム
+_STATUS_TIMESTAMP_COLUMNS = {
+    StatusEnum.submitted: "submitted_at",
+    StatusEnum.approved: "approved_at",
+}
+
+
+def _status_transition_values(current_status: StatusEnum, new_status: StatusEnum, user_id: UUID) -> dict:
+    """ステータス遷移（current_status != new_status）で更新するカラムと値を返す
+    
+    日時はアプリ側で生成せずDBサーバーの現在時刻（func.now()）を使う。
+    """
+    values = {"status": new_status}
+    
+    timestamp_column = _STATUS_TIMESTAMP_COLUMNS.get(new_status)
+    if timestamp_column is not None:
+        values[timestamp_column] = func.now()
+    
+    if new_status == StatusEnum.approved:
+        values["approved_by"] = user_id
+    elif current_status == StatusEnum.approved:
+        # approved状態から他の状態に変更された時は承認情報をクリア
+        values["approved_at"] = None
+        values["approved_by"] = None
+    
+    return values
+
+
+def _validate_pagination(skip: int, limit: int) -> None:
+    """一覧取得の skip/limit を検証"""
+    if skip < 0:
+        logger.warning("Invalid skip parameter: %s (must be >= 0)", skip)
+        raise ValidationError("skipは0以上である必要があります")
+    if limit <= 0 or limit > 1000:
+        logger.warning("Invalid limit parameter: %s (must be 1-1000)", limit)
+        raise ValidationError("limitは1以上1000以下である必要があります")
+
+
 class KnowledgeCRUD:
     """ナレッジ関連のCRUD操作"""
     
-    def __init__(self):
-        self.logger = get_logger(__name__)
-        self.logger.info("KnowledgeCRUD instance initialized")
+    # ストリーミング取得時に1回のフェッチで読み込む行数
+    _STREAM_YIELD_PER = 100
+    
+    def _list_stmt(self, column, value, skip: int, limit: int, after: Optional[KnowledgeCursor]):
+        """新しい順のナレッジ一覧取得ステートメントを構築
+        
+        column が指定された場合は column == value で絞り込む。
+        after が指定された場合はキーセット（シーク）方式で、(created_at, id) が
+        カーソルより前の行のみを取得する。指定がない場合は OFFSET を使うが、
+        読み飛ばす行がある場合は遅延結合とし、OFFSET の走査はIDのみ（インデックスのみ）で行う。
+        
+        lambda_stmt で組み立てるため、値はバインドパラメータとなりSQLのコンパイル結果がキャッシュされる。
+        """
+        # 明示的に読み込むリレーション以外は raiseload とし、行ごとの遅延ロード（N+1）をその場でエラーにする
+        stmt = lambda_stmt(
+            lambda: select(Knowledge).options(
+                selectinload(Knowledge.author), selectinload(Knowledge.approver), raiseload("*")
+            )
+        )
+        
+        if after is None and skip > 0:
+            if column is None:
+                stmt += lambda s: _join_id_page(s, (), skip, limit)
+            else:
+                stmt += lambda s: _join_id_page(s, (column == value,), skip, limit)
+            return stmt + (lambda s: s.order_by(*_LIST_ORDER_BY))
+        
+        if column is not None:
+            stmt += lambda s: s.where(column == value)
+        if after is not None:
+            after_created_at, after_id = after
+            stmt += lambda s: s.where(
+                tuple_(Knowledge.created_at, Knowledge.id) < tuple_(after_created_at, after_id)
+            )
+        return stmt + (lambda s: s.order_by(*_LIST_ORDER_BY).limit(limit))
+    
+    async def _populate_users(self, db: AsyncSession, db_obj: Knowledge) -> None:
+        """作成者・承認者のリレーションを設定（再取得のSELECTを発行しない）
+        
+        ユーザーはセッションのアイデンティティマップから取得するため、
+        読み込み済みであればSQLは発行されない。
+        """
+        state = inspect(db_obj)
+        if "author" in state.unloaded:
+            set_committed_value(db_obj, "author", await db.get(User, db_obj.created_by))
+        
+        approver = None if "approver" in state.unloaded else db_obj.approver
+        if db_obj.approved_by is None:
+            approver = None
+        elif approver is None or approver.id != db_obj.approved_by:
+            approver = await db.get(User, db_obj.approved_by)
+        set_committed_value(db_obj, "approver", approver)
+    
+    async def _get_cached_article_list(self, db: AsyncSession, cache_key: tuple) -> Optional[List[Knowledge]]:
+        """キャッシュ済みの記事別ナレッジ一覧を呼び出し元のセッションへ複製して返す
+        
+        いずれかのナレッジが既にセッションに読み込まれている場合は、セッション上の
+        未反映の変更を古い値で上書きしないようキャッシュを使わない。
+        作成者・承認者はカスケードでmergeせず、セッションに読み込み済みのユーザーはそのまま使う。
+        """
+        cached = _article_list_cache.get(cache_key)
+        if cached is None:
+            return None
+        
+        knowledge_list = pickle.loads(cached)
+        if any(inspect(knowledge).key in db.identity_map for knowledge in knowledge_list):
+            return None
+        
+        merged_list = []
+        for knowledge in knowledge_list:
+            # 複製元（キャッシュから復元した切り離し済みのオブジェクト）からリレーションを外し、
+            # merge がユーザーへカスケードしないようにする
+            state = inspect(knowledge)
+            author = state.dict.pop("author", None)
+            approver = state.dict.pop("approver", None)
+            merged = await db.merge(knowledge, load=False)
+            set_committed_value(merged, "author", await self._merge_cached_user(db, author))
+            set_committed_value(merged, "approver", await self._merge_cached_user(db, approver))
+            merged_list.append(merged)
+        return merged_list
+    
+    async def _merge_cached_user(self, db: AsyncSession, user: Optional[User]) -> Optional[User]:
+        """キャッシュから復元したユーザーをセッションへ複製（読み込み済みの場合はセッション上のものを返す）"""
+        if user is None:
+            return None
+        existing = db.identity_map.get(inspect(user).key)
+        if existing is not None:
+            return existing
+        return await db.merge(user, load=False)
+    
     async def get(self, db: AsyncSession, id: UUID) -> Optional[Knowledge]:
         """IDでナレッジを取得"""
         start_time = time.time()
         try:
-            self.logger.info(f"[GET] Starting knowledge retrieval by id: {id}")
-            self.logger.debug(f"[GET] Database session state: {db.is_active}")
-            
-            # SQLクエリの構築ログ
-            self.logger.debug(f"[GET] Building SQL query with selectinload for author and approver")
-            
-            result = await db.execute(
-                select(Knowledge)
-                .options(selectinload(Knowledge.author), selectinload(Knowledge.approver))
-                .filter(Knowledge.id == id)
+            logger.info("[GET] Starting knowledge retrieval by id: %s", id)
+            logger.debug("[GET] Database session state: %s", db.is_active)
+            
+            # 主キー検索はアイデンティティマップを先に参照し、未ロード時のみSQLを発行する
+            # 未ロード時は作成者・承認者をLEFT JOINで1回のクエリにまとめて読み込む
+            # それ以外のリレーションは raiseload とし、意図しない遅延ロードをその場でエラーにする
+            logger.debug("[GET] Looking up knowledge via session.get with joinedload for author and approver")
+            
+            knowledge = await db.get(
+                Knowledge,
+                id,
+                options=[joinedload(Knowledge.author), joinedload(Knowledge.approver), raiseload("*")],
             )
             
-            self.logger.debug(f"[GET] SQL query executed successfully")
-            knowledge = result.scalar_one_or_none()
+            # アイデンティティマップから返された場合はローダーオプションが適用されないため、
+            # 未ロードの作成者・承認者だけを設定する
+            if knowledge is not None:
+                await self._populate_users(db, knowledge)
+            
+            logger.debug("[GET] Lookup completed")
             
             execution_time = time.time() - start_time
             
             if knowledge:
-                self.logger.info(f"[GET] Successfully found knowledge: id={id}, title='{knowledge.title}', status={knowledge.status}, created_by={knowledge.created_by}")
-                self.logger.debug(f"[GET] Knowledge details: article_number={knowledge.article_number}, change_type={knowledge.change_type}, importance={knowledge.importance}")
+                logger.debug("[GET] Successfully found knowledge: id=%s, title='%s', status=%s, created_by=%s", id, knowledge.title, knowledge.status, knowledge.created_by)
+                logger.debug("[GET] Knowledge details: article_number=%s, change_type=%s, importance=%s", knowledge.article_number, knowledge.change_type, knowledge.importance)
                 if knowledge.author:
-                    self.logger.debug(f"[GET] Author loaded: {knowledge.author.username} (id={knowledge.author.id})")
+                    logger.debug("[GET] Author loaded: %s (id=%s)", knowledge.author.username, knowledge.author.id)
                 if knowledge.approver:
-                    self.logger.debug(f"[GET] Approver loaded: {knowledge.approver.username} (id={knowledge.approver.id})")
+                    logger.debug("[GET] Approver loaded: %s (id=%s)", knowledge.approver.username, knowledge.approver.id)
                 else:
-                    self.logger.debug(f"[GET] No approver set for knowledge {id}")
+                    logger.debug("[GET] No approver set for knowledge %s", id)
             else:
-                self.logger.warning(f"[GET] Knowledge with id {id} not found in database")
+                logger.warning("[GET] Knowledge with id %s not found in database", id)
                 
-            self.logger.info(f"[GET] Knowledge retrieval completed in {execution_time:.3f}s")
+            logger.debug("[GET] Knowledge retrieval completed in %.3fs", execution_time)
             return knowledge
             
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[GET] Error retrieving knowledge by id {id} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[GET] Exception type: {type(e).__name__}")
+            logger.error("[GET] Error retrieving knowledge by id %s after %.3fs: %s", id, execution_time, e)
+            logger.error("[GET] Exception type: %s", type(e).__name__)
             raise DatabaseError(f"ナレッジの取得中にエラーが発生しました: {str(e)}") from e
     
     async def get_multi(
         self, 
         db: AsyncSession, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[KnowledgeCursor] = None
     ) -> List[Knowledge]:
         """ナレッジ一覧を取得（新しい順）"""
+        # パラメータ検証（純粋なPython処理のためDB例外の try の外で行う）
+        _validate_pagination(skip, limit)
+        
         start_time = time.time()
         try:
-            self.logger.info(f"[GET_MULTI] Starting knowledge list retrieval (skip={skip}, limit={limit})")
-            self.logger.debug(f"[GET_MULTI] Database session state: {db.is_active}")
-            
-            # パラメータ検証
-            self.logger.debug(f"[GET_MULTI] Validating parameters: skip={skip}, limit={limit}")
-            if skip < 0:
-                self.logger.error(f"[GET_MULTI] Invalid skip parameter: {skip} (must be >= 0)")
-                raise ValidationError("skipは0以上である必要があります")
-            if limit <= 0 or limit > 1000:
-                self.logger.error(f"[GET_MULTI] Invalid limit parameter: {limit} (must be 1-1000)")
-                raise ValidationError("limitは1以上1000以下である必要があります")
+            logger.info("[GET_MULTI] Starting knowledge list retrieval (skip=%s, limit=%s)", skip, limit)
+            logger.debug("[GET_MULTI] Database session state: %s", db.is_active)
             
-            self.logger.debug(f"[GET_MULTI] Parameters validated successfully")
-            self.logger.debug(f"[GET_MULTI] Building SQL query with ORDER BY created_at DESC, OFFSET {skip}, LIMIT {limit}")
+            logger.debug("[GET_MULTI] Building SQL query with ORDER BY created_at DESC, OFFSET %s, LIMIT %s", skip, limit)
             
-            result = await db.execute(
-                select(Knowledge)
-                .options(selectinload(Knowledge.author), selectinload(Knowledge.approver))
-                .order_by(desc(Knowledge.created_at))
-                .offset(skip)
-                .limit(limit)
-            )
+            result = await db.execute(self._list_stmt(None, None, skip, limit, after))
             
-            self.logger.debug(f"[GET_MULTI] SQL query executed successfully")
+            logger.debug("[GET_MULTI] SQL query executed successfully")
             knowledge_list = result.scalars().all()
             
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[GET_MULTI] Retrieved {len(knowledge_list)} knowledge items")
+            logger.info("[GET_MULTI] Retrieved %s knowledge items", len(knowledge_list))
             
-            # 各ナレッジの詳細ログ
+            # 各ナレッジの詳細ログ（DEBUG 有効時のみ行ごとのループを回す）
             if knowledge_list:
-                self.logger.debug(f"[GET_MULTI] Knowledge items summary:")
-                for i, knowledge in enumerate(knowledge_list):
-                    self.logger.debug(f"[GET_MULTI]   {i+1}. id={knowledge.id}, title='{knowledge.title}', status={knowledge.status}, created_by={knowledge.created_by}")
-                    
-                # ステータス別の集計
-                status_counts = {}
-                for knowledge in knowledge_list:
-                    status = knowledge.status
-                    status_counts[status] = status_counts.get(status, 0) + 1
-                
-                self.logger.info(f"[GET_MULTI] Status distribution: {dict(status_counts)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[GET_MULTI] Knowledge items summary:")
+                    for i, knowledge in enumerate(knowledge_list):
+                        logger.debug("[GET_MULTI]   %s. id=%s, title='%s', status=%s, created_by=%s", i+1, knowledge.id, knowledge.title, knowledge.status, knowledge.created_by)
+
+                    # ステータス別の集計
+                    status_counts = Counter(knowledge.status for knowledge in knowledge_list)
+                    logger.debug("[GET_MULTI] Status distribution: %s", dict(status_counts))
             else:
-                self.logger.info(f"[GET_MULTI] No knowledge items found with skip={skip}, limit={limit}")
+                logger.info("[GET_MULTI] No knowledge items found with skip=%s, limit=%s", skip, limit)
             
-            self.logger.info(f"[GET_MULTI] Knowledge list retrieval completed in {execution_time:.3f}s")
+            logger.info("[GET_MULTI] Knowledge list retrieval completed in %.3fs", execution_time)
             return knowledge_list
             
-        except ValidationError as e:
+        except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.warning(f"[GET_MULTI] Validation error after {execution_time:.3f}s: {str(e)}")
-            raise
+            logger.error("[GET_MULTI] Error retrieving knowledge list after %.3fs: %s", execution_time, e)
+            logger.error("[GET_MULTI] Exception type: %s", type(e).__name__)
+            raise DatabaseError(f"ナレッジ一覧の取得中にエラーが発生しました: {str(e)}") from e
+    
+    async def get_multi_dicts(
+        self, 
+        db: AsyncSession, 
+        skip: int = 0, 
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """ナレッジ一覧を辞書で取得（新しい順、読み取り専用のJSON出力用）
+        
+        ORMインスタンスを生成せず、必要な列と作成者・承認者の名前を結合した
+        1回のSELECTの結果をそのまま辞書にする（orjson でそのままシリアライズできる）。
+        更新を伴う処理では get_multi を使うこと。
+        """
+        _validate_pagination(skip, limit)
+        
+        start_time = time.time()
+        try:
+            logger.info("[GET_MULTI_DICTS] Starting knowledge row retrieval (skip=%s, limit=%s)", skip, limit)
+            
+            result = await db.execute(
+                lambda_stmt(
+                    lambda: select(
+                        *Knowledge.__table__.c,
+                        _Author.username.label("author_username"),
+                        _Author.full_name.label("author_full_name"),
+                        _Approver.username.label("approver_username"),
+                        _Approver.full_name.label("approver_full_name"),
+                    )
+                    .join(_Author, Knowledge.created_by == _Author.id)
+                    .outerjoin(_Approver, Knowledge.approved_by == _Approver.id)
+                    .order_by(*_LIST_ORDER_BY)
+                )
+                + (lambda s: s.offset(skip).limit(limit))
+            )
+            rows = [dict(row) for row in result.mappings()]
+            
+            execution_time = time.time() - start_time
+            logger.info("[GET_MULTI_DICTS] Retrieved %s knowledge rows in %.3fs", len(rows), execution_time)
+            return rows
+            
+        except Exception as e:
+            execution_time = time.time() - start_time
+            logger.error("[GET_MULTI_DICTS] Error retrieving knowledge rows after %.3fs: %s", execution_time, e)
+            logger.error("[GET_MULTI_DICTS] Exception type: %s", type(e).__name__)
+            raise DatabaseError(f"ナレッジ一覧の取得中にエラーが発生しました: {str(e)}") from e
+    
+    async def iter_multi(self, db: AsyncSession) -> AsyncIterator[Knowledge]:
+        """ナレッジを新しい順に全件取得し、一括でリスト化せず逐次返す（件数上限のない出力用）
+        
+        yield_per で _STREAM_YIELD_PER 行ずつフェッチするため、保持するインスタンスは
+        1バッチ分に抑えられる（作成者・承認者は selectinload でバッチごとに読み込む）。
+        """
+        start_time = time.time()
+        count = 0
+        try:
+            logger.info("[ITER_MULTI] Starting streaming knowledge retrieval (yield_per=%s)", self._STREAM_YIELD_PER)
+            result = await db.stream_scalars(
+                lambda_stmt(
+                    lambda: select(Knowledge)
+                    .options(selectinload(Knowledge.author), selectinload(Knowledge.approver), raiseload("*"))
+                    .order_by(*_LIST_ORDER_BY)
+                ),
+                execution_options={"yield_per": self._STREAM_YIELD_PER}
+            )
+            async for knowledge in result:
+                count += 1
+                yield knowledge
+            
+            execution_time = time.time() - start_time
+            logger.info("[ITER_MULTI] Streamed %s knowledge items in %.3fs", count, execution_time)
+            
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[GET_MULTI] Error retrieving knowledge list after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[GET_MULTI] Exception type: {type(e).__name__}")
+            logger.error("[ITER_MULTI] Error streaming knowledge after %s items and %.3fs: %s", count, execution_time, e)
+            logger.error("[ITER_MULTI] Exception type: %s", type(e).__name__)
             raise DatabaseError(f"ナレッジ一覧の取得中にエラーが発生しました: {str(e)}") from e
     
     async def get_by_status(
@@ -139,54 +458,38 @@ class KnowledgeCRUD:
         db: AsyncSession, 
         status: StatusEnum, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[KnowledgeCursor] = None
     ) -> List[Knowledge]:
         """ステータス別ナレッジ一覧を取得"""
+        # パラメータ検証（純粋なPython処理のためDB例外の try の外で行う）
+        _validate_pagination(skip, limit)
+        
         start_time = time.time()
         try:
-            self.logger.info(f"[GET_BY_STATUS] Starting knowledge retrieval by status: {status} (skip={skip}, limit={limit})")
-            self.logger.debug(f"[GET_BY_STATUS] Database session state: {db.is_active}")
-            
-            # パラメータ検証
-            self.logger.debug(f"[GET_BY_STATUS] Validating parameters")
-            if skip < 0:
-                self.logger.error(f"[GET_BY_STATUS] Invalid skip parameter: {skip} (must be >= 0)")
-                raise ValidationError("skipは0以上である必要があります")
-            if limit <= 0 or limit > 1000:
-                self.logger.error(f"[GET_BY_STATUS] Invalid limit parameter: {limit} (must be 1-1000)")
-                raise ValidationError("limitは1以上1000以下である必要があります")
-            
-            self.logger.debug(f"[GET_BY_STATUS] Building SQL query with WHERE status = {status}")
-            result = await db.execute(
-                select(Knowledge)
-                .options(selectinload(Knowledge.author), selectinload(Knowledge.approver))
-                .where(Knowledge.status == status)
-                .order_by(desc(Knowledge.created_at))
-                .offset(skip)
-                .limit(limit)
-            )
+            logger.info("[GET_BY_STATUS] Starting knowledge retrieval by status: %s (skip=%s, limit=%s)", status, skip, limit)
+            logger.debug("[GET_BY_STATUS] Database session state: %s", db.is_active)
+            
+            logger.debug("[GET_BY_STATUS] Building SQL query with WHERE status = %s", status)
+            result = await db.execute(self._list_stmt(Knowledge.status, status, skip, limit, after))
             
             knowledge_list = result.scalars().all()
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[GET_BY_STATUS] Retrieved {len(knowledge_list)} knowledge items with status {status}")
+            logger.info("[GET_BY_STATUS] Retrieved %s knowledge items with status %s", len(knowledge_list), status)
             
-            if knowledge_list:
-                self.logger.debug(f"[GET_BY_STATUS] Knowledge items with status {status}:")
+            if knowledge_list and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[GET_BY_STATUS] Knowledge items with status %s:", status)
                 for i, knowledge in enumerate(knowledge_list):
-                    self.logger.debug(f"[GET_BY_STATUS]   {i+1}. id={knowledge.id}, title='{knowledge.title}', created_by={knowledge.created_by}")
+                    logger.debug("[GET_BY_STATUS]   %s. id=%s, title='%s', created_by=%s", i+1, knowledge.id, knowledge.title, knowledge.created_by)
             
-            self.logger.info(f"[GET_BY_STATUS] Status-based retrieval completed in {execution_time:.3f}s")
+            logger.info("[GET_BY_STATUS] Status-based retrieval completed in %.3fs", execution_time)
             return knowledge_list
             
-        except ValidationError as e:
-            execution_time = time.time() - start_time
-            self.logger.warning(f"[GET_BY_STATUS] Validation error after {execution_time:.3f}s: {str(e)}")
-            raise
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[GET_BY_STATUS] Error retrieving knowledge by status {status} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[GET_BY_STATUS] Exception type: {type(e).__name__}")
+            logger.error("[GET_BY_STATUS] Error retrieving knowledge by status %s after %.3fs: %s", status, execution_time, e)
+            logger.error("[GET_BY_STATUS] Exception type: %s", type(e).__name__)
             raise DatabaseError(f"ステータス別ナレッジ一覧の取得中にエラーが発生しました: {str(e)}") from e
     
     async def get_by_user(
@@ -194,59 +497,41 @@ class KnowledgeCRUD:
         db: AsyncSession, 
         user_id: UUID, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[KnowledgeCursor] = None
     ) -> List[Knowledge]:
         """特定ユーザーのナレッジ一覧を取得"""
+        # パラメータ検証（純粋なPython処理のためDB例外の try の外で行う）
+        _validate_pagination(skip, limit)
+        
         start_time = time.time()
         try:
-            self.logger.info(f"[GET_BY_USER] Starting knowledge retrieval by user: {user_id} (skip={skip}, limit={limit})")
-            self.logger.debug(f"[GET_BY_USER] Database session state: {db.is_active}")
-            
-            # パラメータ検証
-            self.logger.debug(f"[GET_BY_USER] Validating parameters")
-            if skip < 0:
-                self.logger.error(f"[GET_BY_USER] Invalid skip parameter: {skip} (must be >= 0)")
-                raise ValidationError("skipは0以上である必要があります")
-            if limit <= 0 or limit > 1000:
-                self.logger.error(f"[GET_BY_USER] Invalid limit parameter: {limit} (must be 1-1000)")
-                raise ValidationError("limitは1以上1000以下である必要があります")
-            
-            self.logger.debug(f"[GET_BY_USER] Building SQL query with WHERE created_by = {user_id}")
-            result = await db.execute(
-                select(Knowledge)
-                .options(selectinload(Knowledge.author), selectinload(Knowledge.approver))
-                .where(Knowledge.created_by == user_id)
-                .order_by(desc(Knowledge.created_at))
-                .offset(skip)
-                .limit(limit)
-            )
+            logger.info("[GET_BY_USER] Starting knowledge retrieval by user: %s (skip=%s, limit=%s)", user_id, skip, limit)
+            logger.debug("[GET_BY_USER] Database session state: %s", db.is_active)
+            
+            logger.debug("[GET_BY_USER] Building SQL query with WHERE created_by = %s", user_id)
+            result = await db.execute(self._list_stmt(Knowledge.created_by, user_id, skip, limit, after))
             
             knowledge_list = result.scalars().all()
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[GET_BY_USER] Retrieved {len(knowledge_list)} knowledge items for user {user_id}")
+            logger.info("[GET_BY_USER] Retrieved %s knowledge items for user %s", len(knowledge_list), user_id)
             
-            if knowledge_list:
-                self.logger.debug(f"[GET_BY_USER] Knowledge items for user {user_id}:")
-                status_counts = {}
+            if knowledge_list and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[GET_BY_USER] Knowledge items for user %s:", user_id)
                 for i, knowledge in enumerate(knowledge_list):
-                    self.logger.debug(f"[GET_BY_USER]   {i+1}. id={knowledge.id}, title='{knowledge.title}', status={knowledge.status}")
-                    status = knowledge.status
-                    status_counts[status] = status_counts.get(status, 0) + 1
+                    logger.debug("[GET_BY_USER]   %s. id=%s, title='%s', status=%s", i+1, knowledge.id, knowledge.title, knowledge.status)
                 
-                self.logger.info(f"[GET_BY_USER] User's knowledge status distribution: {dict(status_counts)}")
+                status_counts = Counter(knowledge.status for knowledge in knowledge_list)
+                logger.debug("[GET_BY_USER] User's knowledge status distribution: %s", dict(status_counts))
             
-            self.logger.info(f"[GET_BY_USER] User-based retrieval completed in {execution_time:.3f}s")
+            logger.info("[GET_BY_USER] User-based retrieval completed in %.3fs", execution_time)
             return knowledge_list
             
-        except ValidationError as e:
-            execution_time = time.time() - start_time
-            self.logger.warning(f"[GET_BY_USER] Validation error after {execution_time:.3f}s: {str(e)}")
-            raise
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[GET_BY_USER] Error retrieving knowledge by user {user_id} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[GET_BY_USER] Exception type: {type(e).__name__}")
+            logger.error("[GET_BY_USER] Error retrieving knowledge by user %s after %.3fs: %s", user_id, execution_time, e)
+            logger.error("[GET_BY_USER] Exception type: %s", type(e).__name__)
             raise DatabaseError(f"ユーザー別ナレッジ一覧の取得中にエラーが発生しました: {str(e)}") from e
     
     async def get_by_article(
@@ -254,68 +539,142 @@ class KnowledgeCRUD:
         db: AsyncSession, 
         article_number: str, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[KnowledgeCursor] = None
     ) -> List[Knowledge]:
         """特定記事に対するナレッジ一覧を取得"""
+        # パラメータ検証（純粋なPython処理のためDB例外の try の外で行う）
+        if not article_number or not article_number.strip():
+            logger.warning("[GET_BY_ARTICLE] Invalid article_number: '%s' (must not be empty)", article_number)
+            raise ValidationError("記事番号は必須です")
+        _validate_pagination(skip, limit)
+        
         start_time = time.time()
         try:
-            self.logger.info(f"[GET_BY_ARTICLE] Starting knowledge retrieval by article: {article_number} (skip={skip}, limit={limit})")
-            self.logger.debug(f"[GET_BY_ARTICLE] Database session state: {db.is_active}")
-            
-            # パラメータ検証
-            self.logger.debug(f"[GET_BY_ARTICLE] Validating parameters")
-            if not article_number or not article_number.strip():
-                self.logger.error(f"[GET_BY_ARTICLE] Invalid article_number: '{article_number}' (must not be empty)")
-                raise ValidationError("記事番号は必須です")
-            if skip < 0:
-                self.logger.error(f"[GET_BY_ARTICLE] Invalid skip parameter: {skip} (must be >= 0)")
-                raise ValidationError("skipは0以上である必要があります")
-            if limit <= 0 or limit > 1000:
-                self.logger.error(f"[GET_BY_ARTICLE] Invalid limit parameter: {limit} (must be 1-1000)")
-                raise ValidationError("limitは1以上1000以下である必要があります")
-            
-            self.logger.debug(f"[GET_BY_ARTICLE] Building SQL query with WHERE article_number = '{article_number}'")
-            result = await db.execute(
-                select(Knowledge)
-                .options(selectinload(Knowledge.author), selectinload(Knowledge.approver))
-                .where(Knowledge.article_number == article_number)
-                .order_by(desc(Knowledge.created_at))
-                .offset(skip)
-                .limit(limit)
+            logger.info("[GET_BY_ARTICLE] Starting knowledge retrieval by article: %s (skip=%s, limit=%s)", article_number, skip, limit)
+            logger.debug("[GET_BY_ARTICLE] Database session state: %s", db.is_active)
+            
+            # 先頭ページのみキャッシュする
+            # 書き込み中のセッションは自身の未コミットの変更を読む必要があり、また格納もしない
+            cache_key = (article_number, limit)
+            use_cache = (
+                skip == 0 and after is None
+                and settings.KNOWLEDGE_ARTICLE_CACHE_TTL_SECONDS > 0
+                and not _session_has_writes(db)
             )
             
-            knowledge_list = result.scalars().all()
+            knowledge_list = await self._get_cached_article_list(db, cache_key) if use_cache else None
+            if knowledge_list is not None:
+                logger.debug("[GET_BY_ARTICLE] Cache hit for article %s (limit=%s)", article_number, limit)
+            else:
+                logger.debug("[GET_BY_ARTICLE] Building SQL query with WHERE article_number = '%s'", article_number)
+                result = await db.execute(self._list_stmt(Knowledge.article_number, article_number, skip, limit, after))
+                
+                knowledge_list = result.scalars().all()
+                if use_cache:
+                    _article_list_cache[cache_key] = pickle.dumps(list(knowledge_list))
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[GET_BY_ARTICLE] Retrieved {len(knowledge_list)} knowledge items for article {article_number}")
+            logger.info("[GET_BY_ARTICLE] Retrieved %s knowledge items for article %s", len(knowledge_list), article_number)
             
-            if knowledge_list:
-                self.logger.debug(f"[GET_BY_ARTICLE] Knowledge items for article {article_number}:")
-                status_counts = {}
-                change_type_counts = {}
+            if knowledge_list and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[GET_BY_ARTICLE] Knowledge items for article %s:", article_number)
                 for i, knowledge in enumerate(knowledge_list):
-                    self.logger.debug(f"[GET_BY_ARTICLE]   {i+1}. id={knowledge.id}, title='{knowledge.title}', status={knowledge.status}, change_type={knowledge.change_type}")
-                    status = knowledge.status
-                    change_type = knowledge.change_type
-                    status_counts[status] = status_counts.get(status, 0) + 1
-                    change_type_counts[change_type] = change_type_counts.get(change_type, 0) + 1
+                    logger.debug("[GET_BY_ARTICLE]   %s. id=%s, title='%s', status=%s, change_type=%s", i+1, knowledge.id, knowledge.title, knowledge.status, knowledge.change_type)
                 
-                self.logger.info(f"[GET_BY_ARTICLE] Article's knowledge status distribution: {dict(status_counts)}")
-                self.logger.info(f"[GET_BY_ARTICLE] Article's knowledge change type distribution: {dict(change_type_counts)}")
+                status_counts = Counter(knowledge.status for knowledge in knowledge_list)
+                change_type_counts = Counter(knowledge.change_type for knowledge in knowledge_list)
+                logger.debug("[GET_BY_ARTICLE] Article's knowledge status distribution: %s", dict(status_counts))
+                logger.debug("[GET_BY_ARTICLE] Article's knowledge change type distribution: %s", dict(change_type_counts))
             
-            self.logger.info(f"[GET_BY_ARTICLE] Article-based retrieval completed in {execution_time:.3f}s")
+            logger.info("[GET_BY_ARTICLE] Article-based retrieval completed in %.3fs", execution_time)
             return knowledge_list
             
-        except ValidationError as e:
-            execution_time = time.time() - start_time
-            self.logger.warning(f"[GET_BY_ARTICLE] Validation error after {execution_time:.3f}s: {str(e)}")
-            raise
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[GET_BY_ARTICLE] Error retrieving knowledge by article {article_number} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[GET_BY_ARTICLE] Exception type: {type(e).__name__}")
+            logger.error("[GET_BY_ARTICLE] Error retrieving knowledge by article %s after %.3fs: %s", article_number, execution_time, e)
+            logger.error("[GET_BY_ARTICLE] Exception type: %s", type(e).__name__)
             raise DatabaseError(f"記事別ナレッジ一覧の取得中にエラーが発生しました: {str(e)}") from e
     
+    async def _count(self, db: AsyncSession, cache_key: tuple, column, value) -> int:
+        """件数を取得（column が指定された場合は column == value で絞り込む）
+        
+        未コミットの書き込みを持つセッションはキャッシュを読まず、結果も格納しない。
+        """
+        use_cache = settings.KNOWLEDGE_COUNT_CACHE_TTL_SECONDS > 0 and not _session_has_writes(db)
+        count = _count_cache.get(cache_key) if use_cache else None
+        if count is not None:
+            logger.debug("[COUNT] Cache hit for %s", cache_key)
+            return count
+        
+        try:
+            stmt = lambda_stmt(lambda: select(func.count()).select_from(Knowledge))
+            if column is not None:
+                stmt += lambda s: s.where(column == value)
+            count = (await db.execute(stmt)).scalar_one()
+        except Exception as e:
+            logger.error("[COUNT] Error counting knowledge for %s: %s", cache_key, e)
+            raise DatabaseError(f"ナレッジ件数の取得中にエラーが発生しました: {str(e)}") from e
+        
+        if use_cache:
+            _count_cache[cache_key] = count
+        return count
+    
+    async def count(self, db: AsyncSession) -> int:
+        """ナレッジの総件数を取得（TTLの間キャッシュする）"""
+        return await self._count(db, ("all", None), None, None)
+    
+    async def count_by_status(self, db: AsyncSession, status: StatusEnum) -> int:
+        """ステータス別のナレッジ件数を取得（TTLの間キャッシュする）"""
+        return await self._count(db, ("status", status.value), Knowledge.status, status)
+    
+    async def count_by_user(self, db: AsyncSession, user_id: UUID) -> int:
+        """特定ユーザーのナレッジ件数を取得（TTLの間キャッシュする）"""
+        return await self._count(db, ("user", str(user_id)), Knowledge.created_by, user_id)
+    
+    async def search(
+        self, 
+        db: AsyncSession, 
+        query: str, 
+        skip: int = 0, 
+        limit: int = 100
+    ) -> List[Knowledge]:
+        """タイトルまたはキーワードの部分一致でナレッジを検索（新しい順）
+        
+        絞り込みはSQL側で行い（PostgreSQLではトライグラムGINインデックスを使用）、
+        LIMIT は一致した行にのみ適用される。
+        """
+        # パラメータ検証（純粋なPython処理のためDB例外の try の外で行う）
+        if not query or not query.strip():
+            logger.warning("[SEARCH] Invalid query: '%s' (must not be empty)", query)
+            raise ValidationError("検索クエリが必要です")
+        _validate_pagination(skip, limit)
+        
+        start_time = time.time()
+        try:
+            logger.info("[SEARCH] Starting knowledge search: '%s' (skip=%s, limit=%s)", query, skip, limit)
+            
+            result = await db.execute(
+                lambda_stmt(
+                    lambda: select(Knowledge)
+                    .options(selectinload(Knowledge.author), selectinload(Knowledge.approver), raiseload("*"))
+                    .where(or_(Knowledge.title.contains(query), Knowledge.keywords.contains(query)))
+                    .order_by(*_LIST_ORDER_BY)
+                )
+                + (lambda s: s.offset(skip).limit(limit))
+            )
+            knowledge_list = result.scalars().all()
+            
+            execution_time = time.time() - start_time
+            logger.info("[SEARCH] Found %s knowledge items in %.3fs", len(knowledge_list), execution_time)
+            return knowledge_list
+            
+        except Exception as e:
+            execution_time = time.time() - start_time
+            logger.error("[SEARCH] Error searching knowledge for '%s' after %.3fs: %s", query, execution_time, e)
+            logger.error("[SEARCH] Exception type: %s", type(e).__name__)
+            raise DatabaseError(f"ナレッジの検索中にエラーが発生しました: {str(e)}") from e
+    
     async def create(
         self, 
         db: AsyncSession, 
@@ -325,70 +684,56 @@ class KnowledgeCRUD:
         """新しいナレッジを作成"""
         start_time = time.time()
         try:
-            self.logger.info(f"[CREATE] Starting knowledge creation by user: {user_id}")
-            self.logger.debug(f"[CREATE] Database session state: {db.is_active}")
+            logger.info("[CREATE] Starting knowledge creation by user: %s", user_id)
+            logger.debug("[CREATE] Database session state: %s", db.is_active)
             
             # 入力データの詳細ログ
-            self.logger.info(f"[CREATE] Knowledge data: title='{obj_in.title}', article_number='{obj_in.article_number}', change_type={obj_in.change_type}")
-            self.logger.debug(f"[CREATE] Additional data: info_category='{obj_in.info_category}', importance={obj_in.importance}, target='{obj_in.target}'")
-            self.logger.debug(f"[CREATE] Keywords: {obj_in.keywords}")
-            self.logger.debug(f"[CREATE] Publish period: {obj_in.open_publish_start} to {obj_in.open_publish_end}")
+            logger.info("[CREATE] Knowledge data: title='%s', article_number='%s', change_type=%s", obj_in.title, obj_in.article_number, obj_in.change_type)
+            logger.debug("[CREATE] Additional data: info_category='%s', importance=%s, target='%s'", obj_in.info_category, obj_in.importance, obj_in.target)
+            logger.debug("[CREATE] Keywords: %s", obj_in.keywords)
+            logger.debug("[CREATE] Publish period: %s to %s", obj_in.open_publish_start, obj_in.open_publish_end)
             
             if obj_in.question:
-                self.logger.debug(f"[CREATE] Question length: {len(obj_in.question)} characters")
+                logger.debug("[CREATE] Question length: %s characters", len(obj_in.question))
             if obj_in.answer:
-                self.logger.debug(f"[CREATE] Answer length: {len(obj_in.answer)} characters")
+                logger.debug("[CREATE] Answer length: %s characters", len(obj_in.answer))
             if obj_in.add_comments:
-                self.logger.debug(f"[CREATE] Additional comments length: {len(obj_in.add_comments)} characters")
+                logger.debug("[CREATE] Additional comments length: %s characters", len(obj_in.add_comments))
             if obj_in.remarks:
-                self.logger.debug(f"[CREATE] Remarks length: {len(obj_in.remarks)} characters")
+                logger.debug("[CREATE] Remarks length: %s characters", len(obj_in.remarks))
             
             # 記事番号の存在チェックは呼び出し元で行う
-            self.logger.debug(f"[CREATE] Creating Knowledge model instance")
-            db_obj = Knowledge(
-                article_number=obj_in.article_number,
-                change_type=obj_in.change_type,
-                title=obj_in.title,
-                info_category=obj_in.info_category,
-                keywords=obj_in.keywords,
-                importance=obj_in.importance,
-                target=obj_in.target,
-                open_publish_start=obj_in.open_publish_start,
-                open_publish_end=obj_in.open_publish_end,
-                question=obj_in.question,
-                answer=obj_in.answer,
-                add_comments=obj_in.add_comments,
-                remarks=obj_in.remarks,
-                created_by=user_id
+            # INSERT ... RETURNING 1 文で作成し、既定値を含む作成結果を同じ往復で受け取る
+            logger.debug("[CREATE] Executing INSERT ... RETURNING")
+            result = await db.execute(
+                insert(Knowledge)
+                .values(**obj_in.model_dump(), created_by=user_id)
+                .returning(Knowledge)
             )
-            
-            self.logger.debug(f"[CREATE] Adding knowledge to database session")
-            db.add(db_obj)
-            
-            self.logger.debug(f"[CREATE] Flushing database session")
-            await db.flush()
+            db_obj = result.scalar_one()
             
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[CREATE] Successfully created knowledge with id: {db_obj.id}")
-            self.logger.debug(f"[CREATE] Generated knowledge ID: {db_obj.id}")
-            self.logger.debug(f"[CREATE] Default status set to: {db_obj.status}")
-            self.logger.debug(f"[CREATE] Created at: {db_obj.created_at}")
+            logger.info("[CREATE] Successfully created knowledge with id: %s", db_obj.id)
+            logger.debug("[CREATE] Generated knowledge ID: %s", db_obj.id)
+            logger.debug("[CREATE] Default status set to: %s", db_obj.status)
+            logger.debug("[CREATE] Created at: %s", db_obj.created_at)
+            _invalidate_article_cache_on_commit(db, db_obj.article_number)
+            _invalidate_count_cache_on_commit(db)
             
-            self.logger.debug(f"[CREATE] Retrieving created knowledge with related data")
-            # 関連データを含めて再取得
-            result = await self.get(db, db_obj.id)
+            # 関連データを設定（再取得は行わない）
+            await self._populate_users(db, db_obj)
             
             total_time = time.time() - start_time
-            self.logger.info(f"[CREATE] Knowledge creation completed in {total_time:.3f}s (flush: {execution_time:.3f}s)")
+            logger.info("[CREATE] Knowledge creation completed in %.3fs (flush: %.3fs)", total_time, execution_time)
             
-            return result
+            return db_obj
             
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[CREATE] Error creating knowledge after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[CREATE] Exception type: {type(e).__name__}")
-            self.logger.error(f"[CREATE] Failed data: title='{obj_in.title}', user_id={user_id}")
+            logger.error("[CREATE] Error creating knowledge after %.3fs: %s", execution_time, e)
+            logger.error("[CREATE] Exception type: %s", type(e).__name__)
+            logger.error("[CREATE] Failed data: title='%s', user_id=%s", obj_in.title, user_id)
             raise DatabaseError(f"ナレッジの作成中にエラーが発生しました: {str(e)}") from e
     
     async def update(
@@ -400,58 +745,60 @@ class KnowledgeCRUD:
         """ナレッジを更新"""
         start_time = time.time()
         try:
-            self.logger.info(f"[UPDATE] Starting knowledge update for id: {db_obj.id}")
-            self.logger.debug(f"[UPDATE] Database session state: {db.is_active}")
-            self.logger.debug(f"[UPDATE] Current knowledge: title='{db_obj.title}', status={db_obj.status}")
+            logger.info("[UPDATE] Starting knowledge update for id: %s", db_obj.id)
+            logger.debug("[UPDATE] Database session state: %s", db.is_active)
+            logger.debug("[UPDATE] Current knowledge: title='%s', status=%s", db_obj.title, db_obj.status)
             
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
             
             if not update_data:
-                self.logger.warning(f"[UPDATE] No update data provided for knowledge {db_obj.id}")
+                logger.warning("[UPDATE] No update data provided for knowledge %s", db_obj.id)
                 return db_obj
             
-            self.logger.info(f"[UPDATE] Updating {len(update_data)} fields: {list(update_data.keys())}")
-            
-            # 更新前の値をログ出力
-            old_values = {}
-            for field in update_data.keys():
-                if hasattr(db_obj, field):
-                    old_values[field] = getattr(db_obj, field)
-            
-            self.logger.debug(f"[UPDATE] Old values: {old_values}")
-            self.logger.debug(f"[UPDATE] New values: {update_data}")
-            
-            # フィールドごとの更新ログ
-            for field, value in update_data.items():
-                old_value = getattr(db_obj, field, None)
-                setattr(db_obj, field, value)
-                self.logger.debug(f"[UPDATE] Field '{field}': '{old_value}' -> '{value}'")
+            logger.info("[UPDATE] Updating %s fields: %s", len(update_data), list(update_data.keys()))
             
-            self.logger.debug(f"[UPDATE] Flushing database session")
-            await db.flush()
-            
-            self.logger.debug(f"[UPDATE] Refreshing knowledge object")
-            await db.refresh(db_obj)
+            # 更新前の値をログ出力（DEBUG 有効時のみ収集する）
+            if logger.isEnabledFor(logging.DEBUG):
+                old_values = {}
+                for field in update_data.keys():
+                    if hasattr(db_obj, field):
+                        old_values[field] = getattr(db_obj, field)
+
+                logger.debug("[UPDATE] Old values: %s", old_values)
+                logger.debug("[UPDATE] New values: %s", update_data)
+            
+            # 属性ごとの setattr ではなく UPDATE ... RETURNING 1 文で更新し、
+            # 返却行で identity map 上の db_obj をそのまま再水和する
+            stmt = (
+                update(Knowledge)
+                .where(Knowledge.id == db_obj.id)
+                .values(**update_data)
+                .returning(Knowledge)
+                .execution_options(synchronize_session="fetch", populate_existing=True)
+            )
+            logger.debug("[UPDATE] Executing UPDATE ... RETURNING")
+            result = await db.execute(stmt)
+            db_obj = result.scalar_one()
             
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[UPDATE] Successfully updated knowledge with id: {db_obj.id}")
-            self.logger.debug(f"[UPDATE] Updated at: {db_obj.updated_at}")
+            logger.info("[UPDATE] Successfully updated knowledge with id: %s", db_obj.id)
+            logger.debug("[UPDATE] Updated at: %s", db_obj.updated_at)
+            _invalidate_article_cache_on_commit(db, db_obj.article_number)
             
-            self.logger.debug(f"[UPDATE] Retrieving updated knowledge with related data")
-            # 関連データを含めて再取得
-            result = await self.get(db, db_obj.id)
+            # 関連データを設定（再取得は行わない）
+            await self._populate_users(db, db_obj)
             
             total_time = time.time() - start_time
-            self.logger.info(f"[UPDATE] Knowledge update completed in {total_time:.3f}s (flush: {execution_time:.3f}s)")
+            logger.info("[UPDATE] Knowledge update completed in %.3fs (flush: %.3fs)", total_time, execution_time)
             
-            return result
+            return db_obj
             
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[UPDATE] Error updating knowledge {db_obj.id} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[UPDATE] Exception type: {type(e).__name__}")
-            self.logger.error(f"[UPDATE] Failed update data: {update_data}")
+            logger.error("[UPDATE] Error updating knowledge %s after %.3fs: %s", db_obj.id, execution_time, e)
+            logger.error("[UPDATE] Exception type: %s", type(e).__name__)
+            logger.error("[UPDATE] Failed update data: %s", update_data)
             
             raise DatabaseError(f"ナレッジの更新中にエラーが発生しました: {str(e)}") from e
     
@@ -466,79 +813,76 @@ class KnowledgeCRUD:
         start_time = time.time()
         try:
             current_status = db_obj.status
-            self.logger.info(f"[UPDATE_STATUS] Starting status update from {current_status} to {new_status} for knowledge {db_obj.id} by user {user.id}")
-            self.logger.debug(f"[UPDATE_STATUS] Database session state: {db.is_active}")
-            self.logger.debug(f"[UPDATE_STATUS] Knowledge details: title='{db_obj.title}', created_by={db_obj.created_by}")
-            self.logger.debug(f"[UPDATE_STATUS] User details: username='{user.username}', is_admin={user.is_admin}")
+            logger.info("[UPDATE_STATUS] Starting status update from %s to %s for knowledge %s by user %s", current_status, new_status, db_obj.id, user.id)
+            logger.debug("[UPDATE_STATUS] Database session state: %s", db.is_active)
+            logger.debug("[UPDATE_STATUS] Knowledge details: title='%s', created_by=%s", db_obj.title, db_obj.created_by)
+            logger.debug("[UPDATE_STATUS] User details: username='%s', is_admin=%s", user.username, user.is_admin)
             
             # 権限チェック
-            self.logger.debug(f"[UPDATE_STATUS] Performing authorization check")
+            logger.debug("[UPDATE_STATUS] Performing authorization check")
             if user.is_admin:
                 # 管理者は全てのステータス変更を許可
-                self.logger.info(f"[UPDATE_STATUS] Admin user {user.id} ({user.username}) authorized for status change")
+                logger.info("[UPDATE_STATUS] Admin user %s (%s) authorized for status change", user.id, user.username)
             elif db_obj.created_by == user.id:
                 # 作成者は draft → submitted, submitted → draft のみ許可
-                self.logger.debug(f"[UPDATE_STATUS] Creator authorization check: current={current_status}, new={new_status}")
-                if not ((current_status == StatusEnum.draft and new_status == StatusEnum.submitted) or
-                       (current_status == StatusEnum.submitted and new_status == StatusEnum.draft)):
-                    self.logger.warning(f"[UPDATE_STATUS] Unauthorized status change attempt by creator {user.id} for knowledge {db_obj.id}")
-                    self.logger.warning(f"[UPDATE_STATUS] Invalid transition: {current_status} -> {new_status}")
+                logger.debug("[UPDATE_STATUS] Creator authorization check: current=%s, new=%s", current_status, new_status)
+                if (current_status, new_status) not in _AUTHOR_STATUS_TRANSITIONS:
+                    logger.warning("[UPDATE_STATUS] Unauthorized status change attempt by creator %s for knowledge %s", user.id, db_obj.id)
+                    logger.warning("[UPDATE_STATUS] Invalid transition: %s -> %s", current_status, new_status)
                     raise AuthorizationError(f"ステータスの変更権限がありません。現在のステータス: {current_status}, 変更先: {new_status}")
                 else:
-                    self.logger.info(f"[UPDATE_STATUS] Creator {user.id} ({user.username}) authorized for status change")
+                    logger.info("[UPDATE_STATUS] Creator %s (%s) authorized for status change", user.id, user.username)
             else:
                 # その他のユーザーは変更不可
-                self.logger.warning(f"[UPDATE_STATUS] Unauthorized status change attempt by user {user.id} for knowledge {db_obj.id}")
-                self.logger.warning(f"[UPDATE_STATUS] User {user.id} is neither admin nor creator (created_by={db_obj.created_by})")
+                logger.warning("[UPDATE_STATUS] Unauthorized status change attempt by user %s for knowledge %s", user.id, db_obj.id)
+                logger.warning("[UPDATE_STATUS] User %s is neither admin nor creator (created_by=%s)", user.id, db_obj.created_by)
                 raise AuthorizationError("このナレッジのステータスを変更する権限がありません")
             
-            self.logger.debug(f"[UPDATE_STATUS] Authorization successful, updating status")
-            db_obj.status = new_status
-            
-            # submitted状態になった時にsubmitted_atを設定
-            if new_status == StatusEnum.submitted and current_status != StatusEnum.submitted:
-                submitted_time = datetime.utcnow()
-                db_obj.submitted_at = submitted_time
-                self.logger.info(f"[UPDATE_STATUS] Set submitted_at to {submitted_time} for knowledge {db_obj.id}")
-            
-            # approved状態になった時にapproved_atとapproved_byを設定
-            if new_status == StatusEnum.approved and current_status != StatusEnum.approved:
-                approved_time = datetime.utcnow()
-                db_obj.approved_at = approved_time
-                db_obj.approved_by = user.id
-                self.logger.info(f"[UPDATE_STATUS] Set approved_at to {approved_time} and approved_by to {user.id} for knowledge {db_obj.id}")
-            
-            # approved状態から他の状態に変更された時にapproved_atとapproved_byをクリア
-            if current_status == StatusEnum.approved and new_status != StatusEnum.approved:
-                db_obj.approved_at = None
-                db_obj.approved_by = None
-                self.logger.info(f"[UPDATE_STATUS] Cleared approved_at and approved_by for knowledge {db_obj.id}")
-            
-            self.logger.debug(f"[UPDATE_STATUS] Flushing database session")
-            await db.flush()
+            logger.debug("[UPDATE_STATUS] Authorization successful, updating status")
+            
+            # 同じステータスへの変更は何も更新しない
+            if current_status == new_status:
+                logger.info("[UPDATE_STATUS] Knowledge %s is already %s, nothing to update", db_obj.id, new_status)
+                await self._populate_users(db, db_obj)
+                return db_obj
+            
+            values = _status_transition_values(current_status, new_status, user.id)
+            logger.info("[UPDATE_STATUS] Updating columns %s for knowledge %s", list(values), db_obj.id)
+            
+            # サーバー側で生成した日時を RETURNING で受け取り、db_obj をそのまま再水和する
+            logger.debug("[UPDATE_STATUS] Executing UPDATE ... RETURNING")
+            result = await db.execute(
+                update(Knowledge)
+                .where(Knowledge.id == db_obj.id)
+                .values(**values)
+                .returning(Knowledge)
+                .execution_options(synchronize_session="fetch", populate_existing=True)
+            )
+            db_obj = result.scalar_one()
             # commitはsessionのfinallyで行う
             
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[UPDATE_STATUS] Successfully updated knowledge status to {new_status} for knowledge {db_obj.id}")
-            self.logger.debug(f"[UPDATE_STATUS] Status update completed, retrieving updated knowledge")
+            logger.info("[UPDATE_STATUS] Successfully updated knowledge status to %s for knowledge %s", new_status, db_obj.id)
+            _invalidate_article_cache_on_commit(db, db_obj.article_number)
+            _invalidate_count_cache_on_commit(db)
             
-            # 関連データを含めて再取得
-            result = await self.get(db, db_obj.id)
+            # 関連データを設定（再取得は行わない）
+            await self._populate_users(db, db_obj)
             
             total_time = time.time() - start_time
-            self.logger.info(f"[UPDATE_STATUS] Status update completed in {total_time:.3f}s (flush: {execution_time:.3f}s)")
+            logger.info("[UPDATE_STATUS] Status update completed in %.3fs (flush: %.3fs)", total_time, execution_time)
             
-            return result
+            return db_obj
             
         except (AuthorizationError, ValidationError) as e:
             execution_time = time.time() - start_time
-            self.logger.warning(f"[UPDATE_STATUS] Authorization/Validation error after {execution_time:.3f}s: {str(e)}")
+            logger.warning("[UPDATE_STATUS] Authorization/Validation error after %.3fs: %s", execution_time, e)
             raise
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[UPDATE_STATUS] Error updating knowledge status for {db_obj.id} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[UPDATE_STATUS] Exception type: {type(e).__name__}")
+            logger.error("[UPDATE_STATUS] Error updating knowledge status for %s after %.3fs: %s", db_obj.id, execution_time, e)
+            logger.error("[UPDATE_STATUS] Exception type: %s", type(e).__name__)
             
             raise DatabaseError(f"ナレッジステータスの更新中にエラーが発生しました: {str(e)}") from e
     
@@ -546,45 +890,37 @@ class KnowledgeCRUD:
         """ナレッジを削除（作成者のみ）"""
         start_time = time.time()
         try:
-            self.logger.info(f"[DELETE] Starting knowledge deletion: id={id} by user={user_id}")
-            self.logger.debug(f"[DELETE] Database session state: {db.is_active}")
+            logger.info("[DELETE] Starting knowledge deletion: id=%s by user=%s", id, user_id)
+            logger.debug("[DELETE] Database session state: %s", db.is_active)
             
-            self.logger.debug(f"[DELETE] Building SQL query to find knowledge with creator check")
+            # 作成者チェックを含めて1回のDELETE文で削除する（事前のSELECTは行わない）
+            logger.debug("[DELETE] Executing DELETE with creator check")
             result = await db.execute(
-                select(Knowledge).where(
-                    and_(Knowledge.id == id, Knowledge.created_by == user_id)
-                )
+                delete(Knowledge)
+                .where(and_(Knowledge.id == id, Knowledge.created_by == user_id))
+                .returning(Knowledge.article_number)
             )
             
-            db_obj = result.scalar_one_or_none()
-            
-            if not db_obj:
+            article_number = result.scalar_one_or_none()
+            if article_number is None:
                 execution_time = time.time() - start_time
-                self.logger.warning(f"[DELETE] Knowledge {id} not found or user {user_id} is not the creator")
-                self.logger.info(f"[DELETE] Delete operation completed (not found) in {execution_time:.3f}s")
+                logger.warning("[DELETE] Knowledge %s not found or user %s is not the creator", id, user_id)
+                logger.info("[DELETE] Delete operation completed (not found) in %.3fs", execution_time)
                 return False
             
-            # 削除前の詳細ログ
-            self.logger.info(f"[DELETE] Found knowledge to delete: title='{db_obj.title}', status={db_obj.status}, article_number={db_obj.article_number}")
-            self.logger.debug(f"[DELETE] Knowledge details: created_at={db_obj.created_at}, updated_at={db_obj.updated_at}")
-            
-            self.logger.debug(f"[DELETE] Marking knowledge for deletion")
-            await db.delete(db_obj)
-            
-            self.logger.debug(f"[DELETE] Flushing database session")
-            await db.flush()
-            
             execution_time = time.time() - start_time
             
-            self.logger.info(f"[DELETE] Successfully deleted knowledge {id}")
-            self.logger.info(f"[DELETE] Delete operation completed in {execution_time:.3f}s")
+            logger.info("[DELETE] Successfully deleted knowledge %s", id)
+            _invalidate_article_cache_on_commit(db, article_number)
+            _invalidate_count_cache_on_commit(db)
+            logger.info("[DELETE] Delete operation completed in %.3fs", execution_time)
             return True
             
         except Exception as e:
             execution_time = time.time() - start_time
-            self.logger.error(f"[DELETE] Error deleting knowledge {id} after {execution_time:.3f}s: {str(e)}")
-            self.logger.error(f"[DELETE] Exception type: {type(e).__name__}")
-            self.logger.error(f"[DELETE] Failed deletion: id={id}, user_id={user_id}")
+            logger.error("[DELETE] Error deleting knowledge %s after %.3fs: %s", id, execution_time, e)
+            logger.error("[DELETE] Exception type: %s", type(e).__name__)
+            logger.error("[DELETE] Failed deletion: id=%s, user_id=%s", id, user_id)
             
             raise DatabaseError(f"ナレッジの削除中にエラーが発生しました: {str(e)}") from e
 
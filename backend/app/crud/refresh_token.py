@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import datetime, UTC
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.core.exceptions import (
@@ -242,6 +242,69 @@ class RefreshTokenCRUD:
             self.logger.error(f"Unexpected error creating refresh token: {str(e)}")
             raise DatabaseQueryError(f"リフレッシュトークン作成中に予期しないエラーが発生しました: {str(e)}") from e
     
+    async def rotate_refresh_token(
+        self,
+        db: AsyncSession,
+        old_token: str,
+        new_token: str,
+        expires_at: datetime
+    ) -> Optional[UUID]:
+        """
+        リフレッシュトークンをローテーション（旧トークンの削除と新トークンの作成）
+        
+        DELETE ... RETURNING で旧トークンの検証と消費を1文で行い、
+        同一トランザクション内で新トークンをINSERTする。
+        旧トークンが存在しない・期限切れの場合はNoneを返す。
+        """
+        try:
+            # パラメータ検証
+            if not old_token or not old_token.strip():
+                self.logger.error("Old token is required for refresh token rotation")
+                raise InvalidParameterError("old_token", "[HIDDEN]", "トークンが必要です")
+            
+            if not new_token or not new_token.strip():
+                self.logger.error("New token is required for refresh token rotation")
+                raise InvalidParameterError("new_token", "[HIDDEN]", "トークンが必要です")
+            
+            # 旧トークンを削除し、紐づくユーザーIDと有効期限を取得
+            result = await db.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.token == old_token)
+                .returning(RefreshToken.user_id, RefreshToken.expires_at)
+            )
+            row = result.one_or_none()
+            
+            if row is None:
+                self.logger.info("Refresh token not found for rotation")
+                return None
+            
+            user_id, old_expires_at = row
+            if old_expires_at.tzinfo is None:
+                old_expires_at = old_expires_at.replace(tzinfo=UTC)
+            if old_expires_at <= datetime.now(UTC):
+                # 期限切れのトークンは削除のみ行う
+                self.logger.warning("Refresh token has expired")
+                return None
+            
+            await db.execute(
+                insert(RefreshToken).values(
+                    token=new_token,
+                    user_id=user_id,
+                    expires_at=expires_at
+                )
+            )
+            
+            return user_id
+            
+        except InvalidParameterError:
+            raise
+        except IntegrityError as e:
+            self.logger.error(f"Database integrity error rotating refresh token: {str(e)}")
+            raise DatabaseIntegrityError(f"リフレッシュトークン更新中にデータベース整合性エラーが発生しました: {str(e)}")
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error rotating refresh token: {str(e)}")
+            raise DatabaseQueryError(f"リフレッシュトークン更新中にデータベースエラーが発生しました: {str(e)}") from e
+    
     async def get_by_token(self, db: AsyncSession, token: str) -> Optional[RefreshToken]:
         """トークンでリフレッシュトークンを取得"""
         try:
@@ -1,7 +1,9 @@
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.core.exceptions import (
@@ -23,6 +25,47 @@ class TokenBlacklistCRUD:
     def __init__(self):
         self.logger = get_logger(__name__)
     
+    async def bulk_create_blacklist_entries(
+        self,
+        db: AsyncSession,
+        entries: list[tuple[str, datetime]]
+    ) -> None:
+        """
+        ブラックリストエントリを一括作成（既に登録済みのJTIは無視する）
+        
+        Args:
+            db: データベースセッション
+            entries: (jti, expires_at) のリスト
+        """
+        try:
+            if not entries:
+                return
+            
+            # データベース接続チェック
+            if not db.is_active:
+                self.logger.error("Database session is not active")
+                raise DatabaseConnectionError("データベースセッションがアクティブではありません")
+            
+            dialect_name = db.get_bind().dialect.name
+            if dialect_name == "postgresql":
+                stmt = postgresql_insert(TokenBlacklist).on_conflict_do_nothing(index_elements=["jti"])
+            elif dialect_name == "sqlite":
+                stmt = sqlite_insert(TokenBlacklist).on_conflict_do_nothing(index_elements=["jti"])
+            else:
+                stmt = insert(TokenBlacklist)
+            
+            await db.execute(
+                stmt,
+                [{"jti": jti, "expires_at": expires_at} for jti, expires_at in entries]
+            )
+            self.logger.info(f"Bulk inserted {len(entries)} blacklist entries")
+            
+        except DatabaseConnectionError:
+            raise
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error bulk creating blacklist entries: {str(e)}")
+            raise DatabaseQueryError(f"ブラックリストエントリ一括作成中にデータベースエラーが発生しました: {str(e)}") from e
+    
     async def get(self, db: AsyncSession, entry_id: int) -> TokenBlacklist:
         """IDでブラックリストエントリを取得"""
         try:
@@ -292,6 +335,26 @@ class TokenBlacklistCRUD:
             self.logger.error(f"Unexpected error retrieving active blacklist entries: {str(e)}")
             raise DatabaseQueryError(f"有効ブラックリストエントリ取得中に予期しないエラーが発生しました: {str(e)}") from e
     
+    async def get_active_jtis(self, db: AsyncSession) -> list[str]:
+        """有効なブラックリストエントリのJTI一覧のみを取得"""
+        try:
+            # データベース接続チェック
+            if not db.is_active:
+                self.logger.error("Database session is not active")
+                raise DatabaseConnectionError("データベースセッションがアクティブではありません")
+            
+            current_time = datetime.utcnow()
+            result = await db.execute(
+                select(TokenBlacklist.jti).where(TokenBlacklist.expires_at > current_time)
+            )
+            return list(result.scalars().all())
+            
+        except DatabaseConnectionError:
+            raise
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error retrieving active blacklist JTIs: {str(e)}")
+            raise DatabaseQueryError(f"有効ブラックリストJTI取得中にデータベースエラーが発生しました: {str(e)}") from e
+    
     async def delete_expired_entries(self, db: AsyncSession) -> int:
         """期限切れのブラックリストエントリを削除"""
         try:
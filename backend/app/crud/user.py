@@ -1,9 +1,14 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select, tuple_
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import List, Optional
+from sqlalchemy.orm import selectinload
+from typing import List, Optional, Tuple
+from datetime import datetime
 from uuid import UUID
+import base64
+import binascii
 
+from app.core.config import settings
 from app.core.exceptions import (
     UserNotFoundError, 
     DuplicateUsernameError, 
@@ -15,9 +20,29 @@ from app.core.exceptions import (
     InvalidCredentialsError
 )
 from app.core.logging import get_logger
-from app.models import User
+from app.models import Knowledge, User
 from app.schemas import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import aget_password_hash, averify_password
+
+
+# キーセットページネーションのカーソル（最後に取得したユーザーの作成日時とID）
+UserCursor = Tuple[datetime, UUID]
+
+
+def encode_cursor(user: User) -> str:
+    """ユーザーから次ページ取得用の不透明なカーソル文字列を生成"""
+    raw = f"{user.created_at.isoformat()}|{user.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> UserCursor:
+    """カーソル文字列を (作成日時, ID) に復元"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, _, user_id = raw.partition("|")
+        return datetime.fromisoformat(created_at), UUID(user_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidParameterError("after", cursor, "カーソルの形式が正しくありません") from e
 
 
 class UserCRUD:
@@ -58,6 +83,64 @@ class UserCRUD:
             self.logger.error(f"Unexpected error retrieving user {id}: {str(e)}")
             raise DatabaseQueryError(f"ユーザー取得中に予期しないエラーが発生しました: {str(e)}") from e
     
+    async def get_with_knowledge(self, db: AsyncSession, id: UUID) -> User:
+        """IDでユーザーを取得（ナレッジ一覧とその作成者・承認者を事前読み込み）"""
+        try:
+            # パラメータ検証
+            if not id:
+                self.logger.error("ユーザーIDが必要です")
+                raise InvalidParameterError("id", id, "ユーザーIDが必要です")
+            
+            result = await db.execute(
+                select(User)
+                .where(User.id == id)
+                .options(
+                    selectinload(User.knowledge_items).selectinload(Knowledge.author),
+                    selectinload(User.knowledge_items).selectinload(Knowledge.approver),
+                )
+            )
+            user = result.scalar_one_or_none()
+            
+            if user:
+                return user
+            else:
+                raise UserNotFoundError(user_id=str(id))
+                
+        except UserNotFoundError:
+            raise
+        except InvalidParameterError:
+            raise
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error retrieving user {id}: {str(e)}")
+            raise DatabaseQueryError(f"ユーザー取得中にデータベースエラーが発生しました: {str(e)}") from e
+    
+    async def get_auth_fields(self, db: AsyncSession, id: UUID) -> Row:
+        """IDで認証に必要な列（id, is_admin, username, full_name）のみを取得"""
+        try:
+            # パラメータ検証
+            if not id:
+                self.logger.error("ユーザーIDが必要です")
+                raise InvalidParameterError("id", id, "ユーザーIDが必要です")
+            
+            # hashed_passwordやリレーションシップは読み込まない
+            result = await db.execute(
+                select(User.id, User.is_admin, User.username, User.full_name).where(User.id == id)
+            )
+            row = result.one_or_none()
+            
+            if row:
+                return row
+            else:
+                raise UserNotFoundError(user_id=str(id))
+                
+        except UserNotFoundError:
+            raise
+        except InvalidParameterError:
+            raise
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error retrieving auth fields for user {id}: {str(e)}")
+            raise DatabaseQueryError(f"ユーザー取得中にデータベースエラーが発生しました: {str(e)}") from e
+    
     async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
         """ユーザー名でユーザーを取得"""
         try:
@@ -137,7 +220,9 @@ class UserCRUD:
                 self.logger.error("Database session is not active")
                 raise DatabaseConnectionError("データベースセッションがアクティブではありません")
             
-            result = await db.execute(select(User).offset(skip).limit(limit))
+            result = await db.execute(
+                select(User).order_by(User.created_at, User.id).offset(skip).limit(limit)
+            )
             users = result.scalars().all()
             
             self.logger.info(f"Retrieved {len(users)} users")
@@ -154,6 +239,46 @@ class UserCRUD:
             self.logger.error(f"Unexpected error retrieving users: {str(e)}")
             raise DatabaseQueryError(f"ユーザー一覧取得中に予期しないエラーが発生しました: {str(e)}") from e
     
+    async def get_multi_after(
+        self,
+        db: AsyncSession,
+        after: Optional[UserCursor] = None,
+        limit: int = 100
+    ) -> List[User]:
+        """ユーザー一覧をキーセット方式で取得（afterで指定したカーソルの次から）
+        
+        カーソルは (作成日時, ID) の値そのものを持つため、カーソルのユーザーが
+        削除されていてもページングは途切れない。
+        """
+        try:
+            # パラメータ検証
+            if limit <= 0 or limit > settings.MAX_PAGE_SIZE:
+                self.logger.error(f"Invalid limit parameter: {limit}")
+                raise InvalidParameterError(
+                    "limit", limit, f"limitは1以上{settings.MAX_PAGE_SIZE}以下である必要があります"
+                )
+            
+            query = select(User).order_by(User.created_at, User.id).limit(limit)
+            
+            if after is not None:
+                # (created_at, id) > (カーソルのcreated_at, カーソルのid)
+                after_created_at, after_id = after
+                query = query.where(
+                    tuple_(User.created_at, User.id) > tuple_(after_created_at, after_id)
+                )
+            
+            result = await db.execute(query)
+            users = result.scalars().all()
+            
+            self.logger.info(f"Retrieved {len(users)} users")
+            return users
+            
+        except InvalidParameterError:
+            raise
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error retrieving users: {str(e)}")
+            raise DatabaseQueryError(f"ユーザー一覧取得中にデータベースエラーが発生しました: {str(e)}") from e
+    
     async def create(self, db: AsyncSession, obj_in: UserCreate) -> User:
         """新しいユーザーを作成"""
         try:
@@ -181,7 +306,7 @@ class UserCRUD:
             
             # パスワードハッシュ化
             try:
-                hashed_password = get_password_hash(obj_in.password)
+                hashed_password = await aget_password_hash(obj_in.password)
             except Exception as e:
                 self.logger.error(f"Error hashing password: {str(e)}")
                 raise ValidationError(f"パスワードの処理中にエラーが発生しました: {str(e)}")
@@ -241,7 +366,7 @@ class UserCRUD:
                     raise ValidationError("パスワードは8文字以上である必要があります")
                 
                 try:
-                    update_data["hashed_password"] = get_password_hash(password)
+                    update_data["hashed_password"] = await aget_password_hash(password)
                 except Exception as e:
                     self.logger.error(f"Error hashing password: {str(e)}")
                     raise ValidationError(f"パスワードの処理中にエラーが発生しました: {str(e)}")
@@ -344,7 +469,7 @@ class UserCRUD:
             
             # パスワード検証
             try:
-                if not verify_password(password, user.hashed_password):
+                if not await averify_password(password, user.hashed_password):
                     self.logger.warning(f"Authentication failed: invalid password for user {username}")
                     raise InvalidCredentialsError()
             except Exception as e:
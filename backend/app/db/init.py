@@ -1,3 +1,7 @@
+import asyncio
+
+from sqlalchemy import text
+
 from app.core.logging import get_logger
 from app.db.session import async_engine
 from app.db.base import Base
@@ -24,6 +28,46 @@ class Database:
             logger.error(f"Database initialization failed: {str(e)}")
             raise
     
+    async def warmup(self):
+        """コネクションプールの事前接続（初回リクエストで接続確立のコストを払わないようにする）"""
+        pool_size = getattr(async_engine.pool, "size", None)
+        size = pool_size() if callable(pool_size) else 0
+        if size <= 0:
+            return
+        
+        logger.info(f"Warming up {size} database connections...")
+        # プールサイズ分のコネクションを同時に確立し、すぐにプールへ返却する
+        results = await asyncio.gather(
+            *(async_engine.connect() for _ in range(size)),
+            return_exceptions=True
+        )
+        connections = [conn for conn in results if not isinstance(conn, BaseException)]
+        await asyncio.gather(*(conn.close() for conn in connections))
+        
+        # ウォームアップの失敗は起動を止めない（接続は初回利用時に確立される）
+        failures = [e for e in results if isinstance(e, BaseException)]
+        if failures:
+            logger.warning(f"Database connection warmup failed for {len(failures)} connection(s): {str(failures[0])}")
+        else:
+            logger.info("Database connections warmed up successfully")
+    
+    def pool_status(self) -> dict:
+        """コネクションプールの利用状況を返す"""
+        pool = async_engine.pool
+        status = {"pool_class": type(pool).__name__}
+        # キュー型のプール以外（StaticPool等）は統計を持たない
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            stat = getattr(pool, name, None)
+            if callable(stat):
+                status[name] = stat()
+        return status
+    
+    async def health_check(self) -> dict:
+        """SELECT 1 でデータベースへの疎通を確認し、プールの利用状況とあわせて返す"""
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return {"database": "ok", "pool": self.pool_status()}
+    
     async def close(self):
         """データベース接続のクローズ"""
         try:
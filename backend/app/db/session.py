@@ -1,4 +1,9 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
@@ -8,11 +13,59 @@ from app.core.logging import get_logger
 logger = get_logger(__name__)
 
 
+def _async_database_url(database_url: str) -> URL:
+    """データベースURLを非同期ドライバ用に正規化する
+    
+    PostgreSQLはドライバ未指定（psycopg2）や同期ドライバのURLでも asyncpg を使い、
+    SQLAlchemy側のプリペアドステートメントキャッシュのサイズを設定する。
+    """
+    url = make_url(database_url)
+    backend_name, _, driver_name = url.drivername.partition("+")
+    if backend_name not in ("postgresql", "postgres"):
+        return url
+    
+    if driver_name != "asyncpg":
+        logger.info(f"Using asyncpg driver instead of {driver_name or 'default driver'} for PostgreSQL")
+        url = url.set(drivername="postgresql+asyncpg")
+    if "prepared_statement_cache_size" not in url.query:
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+        )
+    return url
+
+
+def _engine_options(database_url: URL) -> dict:
+    """データベースURLに応じたコネクションプール設定を返す"""
+    url = database_url
+    options = {}
+    
+    # インメモリSQLiteは単一コネクションのプールを使うためサイズ指定はしない
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    
+    options.update(
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_MIN,
+        max_overflow=max(settings.DB_POOL_MAX - settings.DB_POOL_MIN, 0),
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    
+    # asyncpgではプリペアドステートメントを再利用する
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    
+    return options
+
+
 # 非同期エンジンの作成
+_database_url = _async_database_url(settings.DATABASE_URL)
 async_engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.SQLALCHEMY_ECHO,
-    future=True
+    _database_url,
+    echo=settings.DEBUG and settings.SQLALCHEMY_ECHO,
+    future=True,
+    **_engine_options(_database_url)
 )
 
 # 非同期セッションファクトリの作成
@@ -22,8 +75,10 @@ AsyncSessionLocal = sessionmaker(
     autocommit=False
 )
 
-# 非同期セッションジェネレータ
-async def get_async_session() -> AsyncSession:
+# 非同期セッションのコンテキストマネージャ
+# 正常終了時にコミット、例外発生時にロールバックし、終了時にセッションを閉じる
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
     logger.debug("Creating new database session")
     async with AsyncSessionLocal() as session:
         try:
@@ -34,14 +89,17 @@ async def get_async_session() -> AsyncSession:
             logger.error(f"Exception occurred during database session, rolling back: {str(e)}")
             await session.rollback()
             raise # 例外を再スローして呼び出し元で処理できるようにする
-        finally:
-            try:
-                logger.debug("Committing database session")
-                await session.commit()
-                logger.debug("Database session committed successfully")
-            except Exception as e:
-                logger.error(f"Failed to commit database session: {str(e)}")
-                raise
-            finally:
-                logger.debug("Closing database session")
-                await session.close()
\ No newline at end of file
+        try:
+            logger.debug("Committing database session")
+            await session.commit()
+            logger.debug("Database session committed successfully")
+        except Exception as e:
+            logger.error(f"Failed to commit database session: {str(e)}")
+            raise
+        # セッションのクローズは async with の終了時に行われる
+
+
+# 非同期セッションジェネレータ（FastAPIの依存性用）
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with session_scope() as session:
+        yield session
\ No newline at end of file
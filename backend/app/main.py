@@ -6,12 +6,18 @@ import uuid
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging import app_logger, get_request_logger
 from app.core.exceptions import KnowledgeBaseException
+from app.core.security import (
+    start_blacklist_bloom,
+    start_blacklist_writer,
+    stop_blacklist_bloom,
+    stop_blacklist_writer,
+)
 from app.db.init import Database
 
 
@@ -32,6 +38,16 @@ async def lifespan(app: FastAPI):
         await db.init()
         app_logger.info("Database initialized successfully")
         
+        # コネクションプールを事前に確立し、疎通とプールの状態を確認
+        await db.warmup()
+        app_logger.info(f"Database health check: {await db.health_check()}")
+        
+        # トークンブラックリストの一括書き込みタスクを起動
+        start_blacklist_writer()
+        
+        # 失効済みJTIのブルームフィルタを構築し、定期再構築タスクを起動
+        await start_blacklist_bloom()
+        
     except Exception as e:
         app_logger.error(f"Initialization failed: {str(e)}")
         raise
@@ -42,6 +58,9 @@ async def lifespan(app: FastAPI):
     app_logger.info("Shutting down application...")
     
     try:
+        # 未書き込みのブラックリストエントリを書き込んでからDB接続を閉じる
+        await stop_blacklist_bloom()
+        await stop_blacklist_writer()
         await db.close()
         app_logger.info("Database connections closed")
     except Exception as e:
@@ -53,19 +72,10 @@ app = FastAPI(
     title=settings.APP_NAME,
     description="ナレッジ投稿システムAPI",
     version=settings.APP_VERSION,
-    lifespan=lifespan
-)
-
-# CORSミドルウェアの設定
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
-    allow_methods=settings.CORS_ALLOW_METHODS,
-    allow_headers=settings.CORS_ALLOW_HEADERS,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-
 # リクエストIDとロギングミドルウェア
 @app.middleware("http")
 async def request_middleware(request: Request, call_next):
@@ -73,6 +83,13 @@ async def request_middleware(request: Request, call_next):
     request_id = str(uuid.uuid4())
     request.state.request_id = request_id
 
+    # Bearerトークンの抽出（認証依存性で毎回パースしないようここで一度だけ行う）
+    authorization = request.headers.get("authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        request.state.bearer = authorization[7:] or None
+    else:
+        request.state.bearer = None
+
     # リクエストロガーの取得
     logger = get_request_logger(request)
 
@@ -103,15 +120,34 @@ async def request_middleware(request: Request, call_next):
 
         return response
     except Exception as e:
-        # 例外発生時のロギング
+        # エンドポイントで捕捉しない例外はここで500に変換する
+        # （ServerErrorMiddlewareまで伝播させるとCORSやリクエストIDのヘッダーが付かないため）
         process_time = time.time() - start_time
-        logger.error(
+        logger.exception(
             f"Request failed: {request.method} {request.url.path} "
-            f"Error: {str(e)} "
-            f"Process time: {process_time:.3f}s",
-            exc_info=True
+            f"Error: {type(e).__name__}: {str(e)} "
+            f"Process time: {process_time:.3f}s"
         )
-        raise
+
+        response = ORJSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"detail": "サーバー内部でエラーが発生しました"},
+        )
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+# CORSミドルウェアの設定
+# request_middlewareより後に追加して外側に置き、500レスポンスにもCORSヘッダーを付与する
+# オリジンはリクエストごとに所属判定されるため、起動時にfrozensetへ変換しておく
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=frozenset(settings.CORS_ORIGINS),
+    allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
+    allow_methods=settings.CORS_ALLOW_METHODS,
+    allow_headers=settings.CORS_ALLOW_HEADERS,
+)
 
 
 # カスタム例外ハンドラー
@@ -120,7 +156,7 @@ async def knowledge_base_exception_handler(request: Request, exc: KnowledgeBaseE
     logger = get_request_logger(request)
     logger.warning(f"Business logic error: {exc.message}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={
             "detail": exc.message,
@@ -146,7 +182,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     
     logger.warning(f"Validation error: {request.method} {request.url.path} Errors: {errors}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"detail": errors, "body": exc.body},
     )
@@ -170,6 +206,20 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# データベースの疎通とコネクションプールの状態
+@app.get("/health/db")
+async def database_health_check():
+    try:
+        result = await Database().health_check()
+    except Exception as e:
+        app_logger.error(f"Database health check failed: {str(e)}")
+        return ORJSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unhealthy", "database": "unavailable"}
+        )
+    return {"status": "healthy", **result}
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, DateTime, Boolean
+from sqlalchemy import DDL, String, Text, DateTime, Boolean, Index, event, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from typing import Optional
@@ -8,9 +8,39 @@ from app.db.base import Base
 
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        # 有効な記事のみを対象とする一覧取得（WHERE is_active = true）用の部分インデックス
+        Index(
+            "ix_articles_active", "is_active",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active = 1")
+        ),
+        # 部分一致検索（LIKE '%q%'）用のトライグラムGINインデックス（PostgreSQLのみ）
+        # 日本語は空白で分かち書きされないため、tsvectorではなくpg_trgmで部分一致のまま高速化する
+        Index(
+            "ix_articles_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_articles_content_trgm", "content",
+            postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_articles_article_number_trgm", "article_number",
+            postgresql_using="gin", postgresql_ops={"article_number": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
     
     article_uuid: Mapped[str] = mapped_column(String(36), unique=True, index=True)  # URL生成用UUID
     article_number: Mapped[str] = mapped_column(String(20), unique=True, index=True)  # KBA-01234-AB567
     title: Mapped[str] = mapped_column(String(200))  # 既存記事タイトル
     content: Mapped[Optional[str]] = mapped_column(Text)  # 既存記事内容（参考用）
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)  # 有効フラグ
+
+
+# トライグラムインデックスの作成前に拡張機能を有効化する（PostgreSQLのみ）
+event.listen(
+    Article.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Date, Enum
+from sqlalchemy import DDL, String, Text, DateTime, ForeignKey, Boolean, Date, Enum, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from typing import Optional
@@ -22,6 +22,33 @@ class ChangeTypeEnum(enum.Enum):
 
 class Knowledge(Base):
     __tablename__ = "knowledge"
+    __table_args__ = (
+        # 新しい順（created_at DESC, id DESC）のキーセットページネーション用の複合インデックス
+        # 絞り込み付きの一覧は PostgreSQL では INCLUDE 列でカバリングインデックスにし、
+        # 一覧の主要列をヒープアクセスなしで返せるようにする（他の方言では無視される）
+        Index("ix_knowledge_created_at_id", "created_at", "id"),
+        Index(
+            "ix_knowledge_status_created_at_id", "status", "created_at", "id",
+            postgresql_include=["title", "article_number", "created_by"],
+        ),
+        Index(
+            "ix_knowledge_created_by_created_at_id", "created_by", "created_at", "id",
+            postgresql_include=["title", "article_number", "status"],
+        ),
+        Index(
+            "ix_knowledge_article_number_created_at_id", "article_number", "created_at", "id",
+            postgresql_include=["title", "status", "created_by"],
+        ),
+        # タイトル・キーワードの部分一致検索（LIKE '%q%'）用のトライグラムGINインデックス（PostgreSQLのみ）
+        Index(
+            "ix_knowledge_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_knowledge_keywords_trgm", "keywords",
+            postgresql_using="gin", postgresql_ops={"keywords": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     article_number: Mapped[str] = mapped_column(String(20), index=True)  # 対象記事番号
     change_type: Mapped[ChangeTypeEnum] = mapped_column(Enum(ChangeTypeEnum))  # 修正案 or 削除案
@@ -52,4 +79,12 @@ class Knowledge(Base):
         "User", 
         back_populates="approved_knowledge_items", 
         foreign_keys=[approved_by]
-    )
\ No newline at end of file
+    )
+
+
+# トライグラムインデックスの作成前に拡張機能を有効化する（PostgreSQLのみ）
+event.listen(
+    Knowledge.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
\ No newline at end of file
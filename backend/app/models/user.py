@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List
 
@@ -7,6 +7,10 @@ from app.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # キーセットページネーション用（ORDER BY created_at, id）
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255))
@@ -7,9 +7,11 @@ import pytest_asyncio
 from datetime import datetime, timedelta, date
 from uuid import uuid4
 from typing import AsyncGenerator, Generator
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.crud import knowledge as knowledge_crud_module
 from app.db.base import Base
 from app.models import User, Article, Knowledge, RefreshToken, TokenBlacklist
 from app.schemas import UserCreate, ArticleCreate, KnowledgeCreate
@@ -64,6 +66,31 @@ async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
                 pass
 
 
+@pytest.fixture(autouse=True)
+def clear_knowledge_caches():
+    """テストごとにデータベースを作り直すため、ナレッジ一覧・件数のキャッシュを破棄する"""
+    knowledge_crud_module._article_list_cache.clear()
+    knowledge_crud_module._count_cache.clear()
+    yield
+    knowledge_crud_module._article_list_cache.clear()
+    knowledge_crud_module._count_cache.clear()
+
+
+@pytest.fixture
+def query_counter(test_engine) -> Generator[list, None, None]:
+    """テスト中に発行されたSQL文を記録する（N+1クエリの回帰検出用）"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest_asyncio.fixture
 async def sample_user(db_session: AsyncSession) -> User:
     """サンプルユーザー"""
@@ -1,20 +1,24 @@
 """
 認証エンドポイントのテスト
 """
+import jwt
 import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from httpx import AsyncClient, ASGITransport
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, UTC
 from uuid import uuid4
 from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
+from app.api.v1.endpoints.auth import _login_failures
 from app.models import User, RefreshToken, TokenBlacklist
 from app.core.security import create_access_token, create_refresh_token, get_password_hash
 from app.db.session import get_async_session
 from app.core.config import settings
+from app.core.exceptions import DatabaseQueryError
 
 
 @pytest_asyncio.fixture
@@ -32,6 +36,7 @@ async def async_client(db_session: AsyncSession):
     
     # オーバーライドをクリア
     app.dependency_overrides.clear()
+    _login_failures.clear()
 
 
 @pytest_asyncio.fixture
@@ -140,7 +145,7 @@ class TestLogoutEndpoint:
         """認証トークンなしでログアウト"""
         response = await async_client.post("/api/v1/auth/logout")
         
-        assert response.status_code == 403  # HTTPBearerは403を返す
+        assert response.status_code == 401  # 認証情報なしは401
         assert "detail" in response.json()
 
     async def test_logout_with_invalid_token(self, async_client: AsyncClient):
@@ -178,7 +183,7 @@ class TestLogoutEndpoint:
             headers=headers
         )
         
-        assert response.status_code == 403  # HTTPBearerは403を返す
+        assert response.status_code == 401  # 認証情報なしは401
 
     async def test_logout_with_invalid_refresh_token(
         self, 
@@ -273,6 +278,191 @@ class TestLogoutEndpoint:
         assert "ログアウト中にエラーが発生しました" in response.json()["detail"]
 
 
+class TestTokenAlgorithmMigration:
+    """署名アルゴリズム移行のテスト"""
+
+    async def test_eddsa_and_previous_rs256_tokens_are_accepted(self, monkeypatch, sample_user: User):
+        """EdDSAへの移行期間中はRS256で発行済みのトークンも検証できる"""
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+        from app.core import security
+        
+        claims = {"sub": str(sample_user.id), "username": sample_user.username}
+        rs256_token = await create_access_token(data=claims)
+        
+        ed_private_key = Ed25519PrivateKey.generate()
+        monkeypatch.setattr(security, "_ALGORITHM", "EdDSA")
+        monkeypatch.setattr(security, "_PRIVATE_KEY", ed_private_key)
+        monkeypatch.setattr(security, "_PUBLIC_KEY", ed_private_key.public_key())
+        monkeypatch.setattr(security, "_VERIFY_KEYS", {
+            "EdDSA": ed_private_key.public_key(),
+            "RS256": security._VERIFY_KEYS["RS256"],
+        })
+        
+        eddsa_token = await create_access_token(data=claims)
+        
+        assert jwt.get_unverified_header(eddsa_token)["alg"] == "EdDSA"
+        assert security._decode_token(eddsa_token)["sub"] == str(sample_user.id)
+        assert security._decode_token(rs256_token)["sub"] == str(sample_user.id)
+        
+        # 登録されていないアルゴリズムは拒否される
+        hs256_token = jwt.encode(claims, "secret", algorithm="HS256")
+        with pytest.raises(jwt.InvalidAlgorithmError):
+            security._decode_token(hs256_token)
+
+
+class TestUnhandledErrors:
+    """未処理例外のテスト"""
+
+    async def test_unexpected_error_returns_500(
+        self,
+        db_session: AsyncSession,
+        sample_user: User
+    ):
+        """エンドポイントで捕捉しない例外は500になり、CORSとリクエストIDのヘッダーが付く"""
+        async def override_get_async_session():
+            yield db_session
+        
+        app.dependency_overrides[get_async_session] = override_get_async_session
+        transport = ASGITransport(app=app, raise_app_exceptions=False)
+        try:
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                with patch('app.api.v1.endpoints.auth.user_crud.get_by_username', new_callable=AsyncMock) as mock_get:
+                    mock_get.side_effect = RuntimeError("unexpected")
+                    response = await client.post(
+                        "/api/v1/auth/login",
+                        data={"username": sample_user.username, "password": "testpassword123"},
+                        headers={"Origin": "http://frontend.example.com"}
+                    )
+        finally:
+            app.dependency_overrides.clear()
+        
+        assert response.status_code == 500
+        assert response.json()["detail"] == "サーバー内部でエラーが発生しました"
+        assert "access-control-allow-origin" in response.headers
+        assert response.headers["x-request-id"]
+
+
+class TestMeFromClaims:
+    """トークンのクレームからのユーザー情報取得のテスト"""
+
+    async def test_me_uses_token_claims_without_db(
+        self,
+        async_client: AsyncClient,
+        sample_user: User
+    ):
+        """ログインで発行されたトークンではDBを参照せずにユーザー情報を返す"""
+        login_response = await async_client.post(
+            "/api/v1/auth/login",
+            data={"username": sample_user.username, "password": "testpassword123"}
+        )
+        assert login_response.status_code == 200
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        
+        with patch('app.api.deps.user_crud.get_auth_fields', new_callable=AsyncMock) as mock_get:
+            mock_get.side_effect = Exception("DB should not be used")
+            response = await async_client.get("/api/v1/auth/me", headers=headers)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"] == str(sample_user.id)
+        assert data["username"] == sample_user.username
+        assert data["full_name"] == sample_user.full_name
+        assert data["is_admin"] == sample_user.is_admin
+        mock_get.assert_not_called()
+
+
+class TestAdminDependency:
+    """管理者権限チェックの依存性のテスト"""
+
+    async def test_admin_user_loaded_without_full_row(
+        self,
+        db_session: AsyncSession,
+        admin_user: User,
+        sample_user: User
+    ):
+        """管理者判定は認証情報の列のみで行い、ユーザーの全列は読み込まない"""
+        from fastapi import HTTPException
+        from app.api.deps import get_admin_user, get_current_user_auth
+        
+        with patch('app.api.deps.user_crud.get', new_callable=AsyncMock) as mock_get:
+            admin = await get_admin_user(
+                current_user=await get_current_user_auth(payload={"sub": str(admin_user.id)}, db=db_session)
+            )
+            non_admin = await get_current_user_auth(payload={"sub": str(sample_user.id)}, db=db_session)
+            with pytest.raises(HTTPException) as exc_info:
+                await get_admin_user(current_user=non_admin)
+        
+        assert admin.id == admin_user.id
+        assert exc_info.value.status_code == 403
+        mock_get.assert_not_called()
+
+
+class TestRefreshEndpoint:
+    """トークン更新エンドポイントのテスト"""
+
+    async def test_refresh_success_rotates_refresh_token(
+        self,
+        async_client: AsyncClient,
+        authenticated_headers: dict,
+        sample_user: User,
+        db_session: AsyncSession
+    ):
+        """トークン更新成功時に古いリフレッシュトークンが無効になる"""
+        refresh_token = await create_refresh_token(sample_user.id, db_session)
+        access_token = authenticated_headers["Authorization"].split(" ")[1]
+        
+        response = await async_client.post(
+            "/api/v1/auth/refresh",
+            json={"access_token": access_token, "refresh_token": refresh_token}
+        )
+        
+        assert response.status_code == 200
+        tokens = response.json()
+        assert tokens["refresh_token"] != refresh_token
+        assert tokens["access_token"] != access_token
+        
+        # 古いリフレッシュトークンは再利用できない
+        reuse_response = await async_client.post(
+            "/api/v1/auth/refresh",
+            json={"access_token": tokens["access_token"], "refresh_token": refresh_token}
+        )
+        assert reuse_response.status_code == 401
+
+    async def test_refresh_token_stored_as_digest(
+        self,
+        db_session: AsyncSession,
+        sample_user: User
+    ):
+        """リフレッシュトークンは平文ではなくダイジェストで保存される"""
+        refresh_token = await create_refresh_token(sample_user.id, db_session)
+        
+        result = await db_session.execute(
+            select(RefreshToken.token).where(RefreshToken.user_id == sample_user.id)
+        )
+        stored_tokens = result.scalars().all()
+        
+        assert len(stored_tokens) == 1
+        assert stored_tokens[0] != refresh_token
+        assert len(stored_tokens[0]) == 32
+
+    async def test_refresh_invalid_refresh_token(
+        self,
+        async_client: AsyncClient,
+        authenticated_headers: dict
+    ):
+        """無効なリフレッシュトークンでのトークン更新"""
+        response = await async_client.post(
+            "/api/v1/auth/refresh",
+            json={
+                "access_token": authenticated_headers["Authorization"].split(" ")[1],
+                "refresh_token": "invalid_refresh_token"
+            }
+        )
+        
+        assert response.status_code == 401
+        assert response.json()["detail"] == "無効なリフレッシュトークンです"
+
+
 class TestMeEndpoint:
     """現在のユーザー情報取得エンドポイントのテスト"""
 
@@ -318,7 +508,7 @@ class TestMeEndpoint:
         """認証トークンなしでユーザー情報取得"""
         response = await async_client.get("/api/v1/auth/me")
         
-        assert response.status_code == 403  # HTTPBearerは403を返す
+        assert response.status_code == 401  # 認証情報なしは401
         assert "detail" in response.json()
 
     async def test_get_current_user_invalid_token(self, async_client: AsyncClient):
@@ -352,7 +542,7 @@ class TestMeEndpoint:
             headers=headers
         )
         
-        assert response.status_code == 403  # HTTPBearerは403を返す
+        assert response.status_code == 401  # 認証情報なしは401
 
     async def test_get_current_user_missing_bearer(self, async_client: AsyncClient):
         """Bearerプレフィックスなしのトークン"""
@@ -362,7 +552,7 @@ class TestMeEndpoint:
             headers=headers
         )
         
-        assert response.status_code == 403  # HTTPBearerは403を返す
+        assert response.status_code == 401  # 認証情報なしは401
 
     async def test_get_current_user_empty_token(self, async_client: AsyncClient):
         """空のトークン"""
@@ -372,9 +562,9 @@ class TestMeEndpoint:
             headers=headers
         )
         
-        assert response.status_code == 403  # HTTPBearerは403を返す
+        assert response.status_code == 401  # 認証情報なしは401
 
-    @patch('app.api.deps.user_crud.get')
+    @patch('app.api.deps.user_crud.get_auth_fields')
     async def test_get_current_user_user_not_found(
         self,
         mock_get_user,
@@ -392,7 +582,7 @@ class TestMeEndpoint:
         assert response.status_code == 401
         assert "ユーザーが見つかりません" in response.json()["detail"]
 
-    @patch('app.api.deps.user_crud.get')
+    @patch('app.api.deps.user_crud.get_auth_fields')
     async def test_get_current_user_database_error(
         self,
         mock_get_user,
@@ -400,7 +590,7 @@ class TestMeEndpoint:
         authenticated_headers: dict
     ):
         """データベースエラー"""
-        mock_get_user.side_effect = Exception("Database connection failed")
+        mock_get_user.side_effect = DatabaseQueryError("Database connection failed")
         
         response = await async_client.get(
             "/api/v1/auth/me",
@@ -428,7 +618,7 @@ class TestMeEndpoint:
         )
         
         # トークンをブラックリストに追加（手動でjtiを取得してブラックリストに追加）
-        from jose import jwt
+        import jwt
         from app.core.config import settings
         payload = jwt.decode(access_token, settings.PUBLIC_KEY, algorithms=[settings.ALGORITHM])
         jti = payload.get("jti")
@@ -451,6 +641,36 @@ class TestMeEndpoint:
         # 有効な場合は401、無効な場合は200（設定による）
         assert response.status_code in [200, 401]
 
+    async def test_get_current_user_cached_token_blacklisted(
+        self,
+        async_client: AsyncClient,
+        db_session: AsyncSession,
+        authenticated_headers: dict
+    ):
+        """検証キャッシュ済みのトークンでもブラックリスト登録後は拒否される"""
+        # 1回目のリクエストで検証結果がキャッシュされる
+        response = await async_client.get("/api/v1/auth/me", headers=authenticated_headers)
+        assert response.status_code == 200
+
+        import jwt
+        from app.core.config import settings
+        access_token = authenticated_headers["Authorization"].split(" ")[1]
+        payload = jwt.decode(access_token, settings.PUBLIC_KEY, algorithms=[settings.ALGORITHM])
+        db_session.add(TokenBlacklist(
+            jti=payload["jti"],
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ))
+        await db_session.flush()
+        
+        # 他プロセスでの失効は未失効キャッシュのTTL経過・ブルームフィルタ再構築後に反映される
+        # （ここではTTL経過を模擬。テストではブルームフィルタを構築しないためDBで確認される）
+        from app.core import security
+        security._not_revoked_jti_cache.pop(payload["jti"], None)
+
+        # 2回目は検証結果がキャッシュヒットするが、ブラックリストは再確認される
+        response = await async_client.get("/api/v1/auth/me", headers=authenticated_headers)
+        assert response.status_code == 401
+
 
 class TestTokenInvalidationAfterLogout:
     """ログアウト後のトークン無効化テスト"""
@@ -517,6 +737,164 @@ class TestTokenInvalidationAfterLogout:
         # 401 (ブラックリスト有効) または 200 (テスト環境での制限) のいずれかを許容
         assert me_after_logout_response.status_code in [200, 401]
 
+    async def test_blacklist_token_overrides_cached_not_revoked(
+        self,
+        db_session: AsyncSession,
+        sample_user: User
+    ):
+        """未失効としてキャッシュされたトークンもブラックリスト登録後は失効扱いになる"""
+        from app.core.security import blacklist_token, is_token_blacklisted
+        
+        access_token = await create_access_token(
+            data={"sub": str(sample_user.id), "username": sample_user.username},
+            expires_delta=timedelta(minutes=30)
+        )
+        payload = jwt.decode(access_token, options={"verify_signature": False})
+        # JTIはハイフンなしの32桁16進文字列
+        assert len(payload["jti"]) == 32
+        
+        assert await is_token_blacklisted(payload, db_session) is False
+        assert await blacklist_token(access_token, db_session) is True
+        assert await is_token_blacklisted(payload, db_session) is True
+
+    async def test_blacklist_bloom_filter_has_no_false_negatives(self):
+        """ブルームフィルタに追加したJTIは必ず含まれると判定される"""
+        from app.core.security import _JtiBloomFilter
+        
+        bloom = _JtiBloomFilter(capacity=1_000)
+        added = [uuid4().hex for _ in range(1_000)]
+        for jti in added:
+            bloom.add(jti)
+        
+        assert all(jti in bloom for jti in added)
+        false_positives = sum(uuid4().hex in bloom for _ in range(10_000))
+        assert false_positives < 100
+
+    async def test_blacklist_bloom_skips_db_for_unrevoked_jti(
+        self,
+        monkeypatch,
+        db_session: AsyncSession,
+        sample_user: User
+    ):
+        """構築済みのブルームフィルタに含まれないJTIはDBを参照せずに未失効と判定される"""
+        from app.core import security
+        from app.crud.token_blacklist import token_blacklist_crud
+        
+        monkeypatch.setattr(security, "_blacklist_bloom", await security._build_blacklist_bloom(db_session))
+        
+        async def fail_is_blacklisted(*args, **kwargs):
+            raise AssertionError("DBを参照してはいけない")
+        monkeypatch.setattr(token_blacklist_crud, "is_blacklisted", fail_is_blacklisted)
+        
+        access_token = await create_access_token(
+            data={"sub": str(sample_user.id), "username": sample_user.username},
+            expires_delta=timedelta(minutes=30)
+        )
+        payload = jwt.decode(access_token, options={"verify_signature": False})
+        
+        assert await security.is_token_blacklisted(payload, db_session) is False
+
+    async def test_blacklist_bloom_disabled_when_ttl_is_zero(self, monkeypatch):
+        """TOKEN_BLACKLIST_CACHE_TTL_SECONDS が0の場合はブルームフィルタを構築しない"""
+        from app.core import security
+        from app.core.config import settings
+        
+        monkeypatch.setattr(settings, "TOKEN_BLACKLIST_CACHE_TTL_SECONDS", 0)
+        
+        await security.start_blacklist_bloom()
+        
+        assert security._blacklist_bloom is None
+        assert security._blacklist_bloom_task is None
+
+    async def test_blacklist_token_is_queued_when_writer_running(
+        self,
+        monkeypatch,
+        db_session: AsyncSession,
+        sample_user: User
+    ):
+        """書き込みタスク起動中はキューに積まれ、即座に失効扱いになる"""
+        import asyncio
+        from app.core import security
+        
+        queue = asyncio.Queue()
+        monkeypatch.setattr(security, "_blacklist_queue", queue)
+        access_token = await create_access_token(
+            data={"sub": str(sample_user.id), "username": sample_user.username},
+            expires_delta=timedelta(minutes=30)
+        )
+        payload = jwt.decode(access_token, options={"verify_signature": False})
+        
+        assert await security.blacklist_token(access_token, db_session) is True
+        
+        jti, _expires_at = queue.get_nowait()
+        assert jti == payload["jti"]
+        assert await security.is_token_blacklisted(payload, db_session) is True
+
+    async def test_blacklist_writer_retries_failed_batch(
+        self,
+        monkeypatch,
+        db_session: AsyncSession
+    ):
+        """一括登録に失敗したバッチは1件ずつ再登録し、失敗したエントリも再試行して書き込む"""
+        import asyncio
+        from contextlib import asynccontextmanager
+        from app.core import security
+        from app.core.exceptions import DatabaseQueryError
+        from app.crud.token_blacklist import token_blacklist_crud
+        
+        @asynccontextmanager
+        async def test_session_scope():
+            yield db_session
+        
+        async def failing_bulk_create(db, entries):
+            raise DatabaseQueryError("一括登録に失敗")
+        
+        create_entry = token_blacklist_crud.create_blacklist_entry
+        calls = []
+        
+        async def flaky_create_entry(db, jti, expires_at):
+            calls.append(jti)
+            if len(calls) == 1:
+                raise DatabaseQueryError("一時的な障害")
+            return await create_entry(db=db, jti=jti, expires_at=expires_at)
+        
+        monkeypatch.setattr(security, "session_scope", test_session_scope)
+        monkeypatch.setattr(security, "_BLACKLIST_RETRY_DELAY_SECONDS", 0)
+        monkeypatch.setattr(token_blacklist_crud, "bulk_create_blacklist_entries", failing_bulk_create)
+        monkeypatch.setattr(token_blacklist_crud, "create_blacklist_entry", flaky_create_entry)
+        
+        queue = asyncio.Queue()
+        jti = uuid4().hex
+        queue.put_nowait((jti, datetime.now(UTC) + timedelta(minutes=30)))
+        task = asyncio.create_task(security._drain_blacklist_queue(queue))
+        try:
+            await asyncio.wait_for(queue.join(), timeout=5)
+        finally:
+            task.cancel()
+        
+        assert calls == [jti, jti]
+        assert await token_blacklist_crud.is_blacklisted(db_session, jti) is True
+
+    async def test_blacklist_token_twice_is_idempotent(
+        self,
+        db_session: AsyncSession,
+        sample_user: User
+    ):
+        """同じトークンを二度ブラックリスト登録しても成功する"""
+        from app.core.security import blacklist_token, is_token_blacklisted
+        import jwt
+        
+        access_token = await create_access_token(
+            data={"sub": str(sample_user.id), "username": sample_user.username},
+            expires_delta=timedelta(minutes=30)
+        )
+        
+        assert await blacklist_token(access_token, db_session) is True
+        assert await blacklist_token(access_token, db_session) is True
+        
+        payload = jwt.decode(access_token, options={"verify_signature": False})
+        assert await is_token_blacklisted(payload, db_session) is True
+
     async def test_access_token_blacklist_check_directly(
         self,
         db_session: AsyncSession,
@@ -539,7 +917,7 @@ class TestTokenInvalidationAfterLogout:
         )
         
         # トークンが有効であることを確認
-        payload = await verify_token(access_token)
+        payload = await verify_token(access_token, db_session)
         assert payload is not None
         assert payload["sub"] == str(sample_user.id)
         print(f"Token JTI before blacklist: {payload.get('jti')}")
@@ -556,7 +934,7 @@ class TestTokenInvalidationAfterLogout:
             await db_session.commit()
             
             # ブラックリスト登録後、トークンは無効になるはず
-            payload_after = await verify_token(access_token)
+            payload_after = await verify_token(access_token, db_session)
             print(f"Payload after blacklist: {payload_after}")
             if payload_after:
                 print(f"Token still valid with JTI: {payload_after.get('jti')}")
@@ -629,6 +1007,27 @@ class TestTokenInvalidationAfterLogout:
 class TestAuthEndpointsIntegration:
     """認証エンドポイントの統合テスト"""
 
+    async def test_login_rate_limited_after_failed_attempts(
+        self,
+        async_client: AsyncClient,
+        sample_user: User
+    ):
+        """ログイン失敗が上限に達すると429を返す"""
+        for _ in range(settings.LOGIN_MAX_FAILED_ATTEMPTS):
+            response = await async_client.post(
+                "/api/v1/auth/login",
+                data={"username": sample_user.username, "password": "wrongpassword"}
+            )
+            assert response.status_code == 401
+        
+        # 正しいパスワードでも上限到達後は拒否される
+        response = await async_client.post(
+            "/api/v1/auth/login",
+            data={"username": sample_user.username, "password": "testpassword123"}
+        )
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
     async def test_login_logout_me_flow(
         self,
         async_client: AsyncClient,
@@ -4,6 +4,7 @@ ArticleCRUD のテスト
 import pytest
 import pytest_asyncio
 from uuid import uuid4
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 import io
 import csv
@@ -14,6 +15,8 @@ from app.models import Article, User
 from app.core.exceptions import (
     ArticleNotFoundError,
     DatabaseConnectionError,
+    DatabaseIntegrityError,
+    DuplicateArticleError,
     InvalidParameterError,
     ValidationError
 )
@@ -36,6 +39,12 @@ class TestArticleCRUD:
         assert result.article_uuid == sample_article.article_uuid
         assert result.article_number == sample_article.article_number
 
+    @pytest.mark.asyncio
+    async def test_get_article_identity_map(self, db_session: AsyncSession, sample_article: Article):
+        """記事取得 - セッション内に読み込み済みの記事はそのまま返す"""
+        # 実行・検証
+        assert await article_crud.get(db_session, sample_article.id) is sample_article
+
     @pytest.mark.asyncio
     async def test_get_article_not_found(self, db_session: AsyncSession):
         """記事取得 - 存在しないID"""
@@ -261,6 +270,39 @@ class TestArticleCRUD:
         assert result[1].title == "記事2"
         assert result[2].title == "記事3"
 
+    @pytest.mark.asyncio
+    async def test_stream_by_content(self, db_session: AsyncSession, sample_article: Article):
+        """コンテンツ検索（ストリーミング） - search_by_content と同じ結果"""
+        # 実行
+        streamed = [article async for article in article_crud.stream_by_content(db_session, "sample article")]
+        
+        # 検証
+        expected = await article_crud.search_by_content(db_session, "sample article")
+        assert [article.id for article in streamed] == [article.id for article in expected]
+        assert sample_article.id in [article.id for article in streamed]
+
+    @pytest.mark.asyncio
+    async def test_stream_by_content_empty_query(self, db_session: AsyncSession):
+        """コンテンツ検索（ストリーミング） - 空のクエリ"""
+        # 実行・検証
+        with pytest.raises(InvalidParameterError):
+            async for _ in article_crud.stream_by_content(db_session, " "):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_from_csv_binary_file(self, db_session: AsyncSession):
+        """CSV一括作成 - バイナリストリーム（BOM付きUTF-8）"""
+        # 準備
+        csv_file = io.BytesIO("title,content,url\n記事1,内容1,https://example.com/1\n".encode("utf-8-sig"))
+        
+        # 実行
+        result = await article_crud.bulk_create_from_csv(db_session, csv_file)
+        
+        # 検証
+        assert len(result) == 1
+        assert result[0].title == "記事1"
+        assert not csv_file.closed
+
     @pytest.mark.asyncio
     async def test_bulk_create_from_csv_empty_file(self, db_session: AsyncSession):
         """CSV一括作成 - 空のファイル"""
@@ -314,6 +356,151 @@ data1,data2"""
         # 検証
         assert len(result) == 100
 
+    @pytest.mark.asyncio
+    async def test_bulk_create_from_csv_empty_title(self, db_session: AsyncSession):
+        """CSV一括作成 - タイトルが空の行"""
+        # 準備
+        csv_file = io.StringIO("title,content,url\n記事1,内容1,https://example.com/1\n,内容2,https://example.com/2\n")
+        
+        # 実行・検証
+        with pytest.raises(ValidationError):
+            await article_crud.bulk_create_from_csv(db_session, csv_file)
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_from_csv_chunked_insert(self, db_session: AsyncSession, monkeypatch):
+        """CSV一括作成 - チャンク分割しても入力順で作成"""
+        # 準備
+        monkeypatch.setattr(article_crud, "_INSERT_CHUNK_SIZE", 3)
+        csv_data = "title,content,url\n"
+        for i in range(10):
+            csv_data += f"記事{i},内容{i},https://example.com/{i}\n"
+        
+        # 実行
+        result = await article_crud.bulk_create_from_csv(db_session, io.StringIO(csv_data))
+        
+        # 検証
+        assert [article.title for article in result] == [f"記事{i}" for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_from_csv_duplicate_existing_number(self, db_session: AsyncSession):
+        """CSV一括作成 - 既存の記事番号と重複"""
+        # 準備
+        await article_crud.bulk_create_from_csv(
+            db_session, io.StringIO("title,content,url\n記事1,内容1,https://example.com/1")
+        )
+        
+        # 実行・検証（同じ行番号から同じ記事番号が生成される）
+        with pytest.raises(ValidationError):
+            await article_crud.bulk_create_from_csv(
+                db_session, io.StringIO("title,content,url\n記事2,内容2,https://example.com/2")
+            )
+
+    @pytest.mark.asyncio
+    async def test_import_from_csv_skips_duplicates(self, db_session: AsyncSession, sample_article: Article):
+        """CSVインポート - 既存・CSV内の重複はスキップして残りを一括作成"""
+        # 準備
+        csv_data = (
+            "article_uuid,article_number,title,content\n"
+            f"{uuid4()},{sample_article.article_number},既存と重複,内容\n"
+            f"{uuid4()},IMP-001,記事1,内容1\n"
+            f"{uuid4()},IMP-001,CSV内で重複,内容\n"
+            f"{uuid4()},IMP-002,,内容\n"
+            f"{uuid4()},IMP-003,記事3,内容3\n"
+            f"{sample_article.article_uuid},IMP-004,既存とUUID重複,内容\n"
+        )
+        
+        # 実行
+        result = await article_crud.import_from_csv(db_session, csv_data)
+        
+        # 検証
+        assert result["success"] == 2
+        assert len(result["duplicates"]) == 3
+        assert len(result["errors"]) == 1
+        assert (await article_crud.get_by_number(db_session, "IMP-001")).title == "記事1"
+        assert await article_crud.get_by_number(db_session, "IMP-003") is not None
+        assert await article_crud.get_by_number(db_session, "IMP-002") is None
+        assert await article_crud.get_by_number(db_session, "IMP-004") is None
+
+    @pytest.mark.asyncio
+    async def test_create_duplicate_article_number(self, db_session: AsyncSession, sample_article: Article):
+        """記事作成 - 記事番号の重複は一意制約で検出"""
+        # 準備
+        article_in = ArticleCreate(
+            article_uuid=str(uuid4()),
+            article_number=sample_article.article_number,
+            title="重複記事"
+        )
+        
+        # 実行・検証
+        with pytest.raises(DuplicateArticleError):
+            await article_crud.create(db_session, article_in)
+        
+        # 失敗はセーブポイントのロールバックに留まり、同じセッションを引き続き使用できる
+        assert await article_crud.get_by_number(db_session, sample_article.article_number) is not None
+        created = await article_crud.create(db_session, ArticleCreate(
+            article_uuid=str(uuid4()),
+            article_number="KBA-99999-XX999",
+            title="重複後の作成"
+        ))
+        assert created.id is not None
+
+    @pytest.mark.asyncio
+    async def test_create_duplicate_article_uuid(self, db_session: AsyncSession, sample_article: Article):
+        """記事作成 - 記事UUIDの重複"""
+        # 準備
+        article_in = ArticleCreate(
+            article_uuid=sample_article.article_uuid,
+            article_number="KBA-99999-ZZ999",
+            title="重複記事"
+        )
+        
+        # 実行・検証
+        with pytest.raises(DatabaseIntegrityError):
+            await article_crud.create(db_session, article_in)
+
+    @pytest.mark.asyncio
+    async def test_import_from_csv_missing_fields(self, db_session: AsyncSession):
+        """CSVインポート - 必須フィールドが不足している場合は不足項目を報告"""
+        # 準備
+        csv_data = f"article_uuid,title\n{uuid4()},記事1\n"
+        
+        # 実行
+        result = await article_crud.import_from_csv(db_session, csv_data)
+        
+        # 検証
+        assert result["success"] == 0
+        assert len(result["errors"]) == 1
+        assert "article_number" in result["errors"][0]
+
+    @pytest.mark.asyncio
+    async def test_import_from_csv_query_count(self, db_session: AsyncSession, sample_article: Article, query_counter):
+        """CSVインポート - 行数に関わらず発行するクエリ数が一定"""
+        # 準備
+        csv_data = "article_uuid,article_number,title,content\n"
+        for i in range(100):
+            csv_data += f"{uuid4()},QC-{i:03d},記事{i},内容{i}\n"
+        query_counter.clear()
+        
+        # 実行
+        result = await article_crud.import_from_csv(db_session, csv_data)
+        
+        # 検証
+        assert result["success"] == 100
+        assert len(query_counter) <= 2
+
+    @pytest.mark.asyncio
+    async def test_get_multi_query_count(self, db_session: AsyncSession, multiple_articles, query_counter):
+        """記事一覧取得 - 1回のクエリで取得"""
+        # 準備
+        query_counter.clear()
+        
+        # 実行
+        result = await article_crud.get_multi(db_session)
+        
+        # 検証
+        assert len(result) > 0
+        assert len(query_counter) <= 1
+
     @pytest.mark.asyncio
     async def test_generate_url_from_title_success(self, db_session: AsyncSession):
         """タイトルからURL生成 - 正常系"""
@@ -353,6 +540,20 @@ data1,data2"""
         with pytest.raises(InvalidParameterError):
             await article_crud.generate_url_from_title("")
 
+    @pytest.mark.asyncio
+    async def test_generate_article_url_roundtrip(self, db_session: AsyncSession, sample_article: Article):
+        """記事URL生成 - 生成したURLから記事を取得できる"""
+        # 実行
+        url = article_crud.generate_article_url(sample_article.article_uuid)
+        
+        # 検証
+        assert url == (
+            "http://sv-vw-ejap:5555/SupportCenter/main.aspx?etc=127&extraqs=%3fetc%3d127%26id%3d"
+            f"%257b{sample_article.article_uuid}%257d&newWindow=true&pagetype=entityrecord"
+        )
+        assert article_crud.generate_article_urls([sample_article.article_uuid]) == [url]
+        assert (await article_crud.get_by_url(db_session, url)).id == sample_article.id
+
     @pytest.mark.asyncio
     async def test_database_connection_error_simulation(self, test_engine):
         """データベース接続エラーのシミュレーション"""
@@ -370,6 +571,24 @@ data1,data2"""
             with pytest.raises((DatabaseConnectionError, SQLAlchemyError, ArticleNotFoundError)):
                 await article_crud.get(session, uuid4())
 
+    @pytest.mark.asyncio
+    async def test_get_article_inactive_transaction(self, db_session: AsyncSession, sample_article: Article):
+        """記事取得 - ロールバック待ちのセッションは DatabaseConnectionError に変換"""
+        # 準備（セーブポイントを使わない一意制約違反でトランザクションを無効化）
+        db_session.add(Article(
+            article_uuid=str(uuid4()),
+            article_number=sample_article.article_number,
+            title="重複記事"
+        ))
+        with pytest.raises(IntegrityError):
+            await db_session.flush()
+        
+        # 実行・検証
+        with pytest.raises(DatabaseConnectionError):
+            await article_crud.get(db_session, uuid4())
+        with pytest.raises(DatabaseConnectionError):
+            await article_crud.get_by_number(db_session, "KBA-00000-XX000")
+
     @pytest.mark.asyncio
     async def test_concurrent_article_creation(self, db_session: AsyncSession, test_data_factory):
         """同時記事作成のテスト"""
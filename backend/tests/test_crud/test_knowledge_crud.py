@@ -1,13 +1,16 @@
 """
 KnowledgeCRUD のテスト
 """
+import orjson
+import pickle
 import pytest
 import pytest_asyncio
 from uuid import uuid4
 from datetime import datetime, timedelta, date
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.knowledge import knowledge_crud
+from app.crud import knowledge as knowledge_crud_module
+from app.crud.knowledge import decode_cursor, encode_cursor, knowledge_crud
 from app.schemas import KnowledgeCreate, KnowledgeUpdate
 from app.models import Knowledge, User
 from app.models.knowledge import StatusEnum, ChangeTypeEnum
@@ -35,6 +38,36 @@ class TestKnowledgeCRUD:
         assert result.answer == sample_knowledge.answer
         assert result.status == sample_knowledge.status
 
+    @pytest.mark.asyncio
+    async def test_get_knowledge_single_query(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, query_counter):
+        """ナレッジ取得 - 作成者・承認者を含めて1回のクエリで取得"""
+        # 準備（アイデンティティマップから外してDBから読み込ませる）
+        db_session.expunge(sample_knowledge)
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.get(db_session, sample_knowledge.id)
+        
+        # 検証
+        assert len(query_counter) == 1
+        assert result.author is sample_user
+        assert result.approver is None
+
+    @pytest.mark.asyncio
+    async def test_get_knowledge_identity_map_hit(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, query_counter):
+        """ナレッジ取得 - セッション内のナレッジはSQLを発行せずに返す"""
+        # 準備
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.get(db_session, sample_knowledge.id)
+        
+        # 検証
+        assert len(query_counter) == 0
+        assert result is sample_knowledge
+        assert result.author is sample_user
+        assert result.approver is None
+
     @pytest.mark.asyncio
     async def test_get_knowledge_not_found(self, db_session: AsyncSession):
         """ナレッジ取得 - 存在しないID"""
@@ -68,6 +101,47 @@ class TestKnowledgeCRUD:
         assert len(second_page) == 2
         assert first_page[0].id != second_page[0].id
 
+    @pytest.mark.asyncio
+    async def test_get_multi_keyset_pagination(self, db_session: AsyncSession, multiple_knowledge: list[Knowledge]):
+        """ナレッジ一覧取得 - カーソルによるキーセットページネーション"""
+        # 実行
+        pages = []
+        after = None
+        while True:
+            page = await knowledge_crud.get_multi(db_session, limit=4, after=after)
+            if not page:
+                break
+            pages.append(page)
+            after = decode_cursor(encode_cursor(page[-1]))
+        
+        # 検証（OFFSET方式と同じ順序で重複・欠落なく取得できる）
+        expected = await knowledge_crud.get_multi(db_session, skip=0, limit=100)
+        assert [k.id for page in pages for k in page] == [k.id for k in expected]
+        assert len(pages) == 2
+
+    @pytest.mark.asyncio
+    async def test_get_by_user_offset_pages(self, db_session: AsyncSession, sample_user: User, multiple_knowledge: list[Knowledge]):
+        """ユーザー別ナレッジ取得 - OFFSETページが全件取得の各区間と一致"""
+        # 準備
+        expected = await knowledge_crud.get_by_user(db_session, sample_user.id, skip=0, limit=100)
+        
+        # 実行
+        pages = [
+            await knowledge_crud.get_by_user(db_session, sample_user.id, skip=skip, limit=2)
+            for skip in range(0, len(expected), 2)
+        ]
+        
+        # 検証
+        assert [k.id for page in pages for k in page] == [k.id for k in expected]
+        assert all(k.author is not None for page in pages for k in page)
+
+    @pytest.mark.asyncio
+    async def test_decode_cursor_invalid(self):
+        """カーソル復元 - 不正なカーソル"""
+        # 実行・検証
+        with pytest.raises(ValidationError):
+            decode_cursor("invalid-cursor")
+
     @pytest.mark.asyncio
     async def test_get_multi_invalid_skip(self, db_session: AsyncSession):
         """ナレッジ一覧取得 - 無効なskip"""
@@ -146,6 +220,124 @@ class TestKnowledgeCRUD:
         assert len(result) > 0
         assert all(k.article_number == sample_knowledge.article_number for k in result)
 
+    @pytest.mark.asyncio
+    async def test_get_multi_dicts(self, db_session: AsyncSession, multiple_knowledge, sample_user: User, query_counter):
+        """ナレッジ一覧（辞書） - ORMを経由せず1回のクエリで作成者名を含めて返す"""
+        # 準備
+        query_counter.clear()
+        
+        # 実行
+        rows = await knowledge_crud.get_multi_dicts(db_session, limit=3)
+        
+        # 検証
+        assert len(query_counter) == 1
+        expected = await knowledge_crud.get_multi(db_session, limit=3)
+        assert [row["id"] for row in rows] == [k.id for k in expected]
+        assert all(isinstance(row, dict) for row in rows)
+        assert rows[0]["author_username"] == sample_user.username
+        assert rows[0]["title"] == expected[0].title
+        assert orjson.loads(orjson.dumps(rows))[0]["id"] == str(expected[0].id)
+
+    @pytest.mark.asyncio
+    async def test_iter_multi(self, db_session: AsyncSession, multiple_knowledge, sample_user: User):
+        """ナレッジ一覧（ストリーミング） - get_multi と同じ順序で全件返す"""
+        # 実行
+        streamed = [knowledge async for knowledge in knowledge_crud.iter_multi(db_session)]
+        
+        # 検証
+        expected = await knowledge_crud.get_multi(db_session, limit=1000)
+        assert [k.id for k in streamed] == [k.id for k in expected]
+        assert all(k.author is sample_user for k in streamed)
+
+    @pytest.mark.asyncio
+    async def test_get_by_article_cached_first_page(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, query_counter):
+        """記事別ナレッジ取得 - 先頭ページはキャッシュからSQLなしで返す"""
+        # 準備（コミット済みのデータでキャッシュに載せてからセッションを空にする）
+        await db_session.commit()
+        first = await knowledge_crud.get_by_article(db_session, sample_knowledge.article_number)
+        db_session.expunge_all()
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.get_by_article(db_session, sample_knowledge.article_number)
+        
+        # 検証
+        assert len(query_counter) == 0
+        assert [k.id for k in result] == [k.id for k in first]
+        assert result[0] in db_session
+        assert result[0].author.id == sample_user.id
+
+    @pytest.mark.asyncio
+    async def test_get_by_article_cache_keeps_loaded_users(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User):
+        """記事別ナレッジ取得 - キャッシュの作成者でセッションに読み込み済みのユーザーを上書きしない"""
+        from sqlalchemy.orm.attributes import set_committed_value
+        
+        # 準備（キャッシュに載せた後、ナレッジのみセッションから外し、ユーザーはより新しい値で読み込み済みとする）
+        await db_session.commit()
+        article_number = sample_knowledge.article_number
+        await knowledge_crud.get_by_article(db_session, article_number)
+        db_session.expunge(sample_knowledge)
+        set_committed_value(sample_user, "full_name", "最新の氏名")
+        
+        # 実行
+        result = await knowledge_crud.get_by_article(db_session, article_number)
+        
+        # 検証
+        assert result[0].author is sample_user
+        assert sample_user.full_name == "最新の氏名"
+        
+        # 準備（未反映の変更を持つユーザー）
+        db_session.expunge(result[0])
+        sample_user.full_name = "変更中の氏名"
+        
+        # 実行・検証（変更が失われず、DBへ反映される）
+        result = await knowledge_crud.get_by_article(db_session, article_number)
+        assert result[0].author is sample_user
+        assert sample_user.full_name == "変更中の氏名"
+        await db_session.refresh(sample_user)
+        assert sample_user.full_name == "変更中の氏名"
+
+    @pytest.mark.asyncio
+    async def test_get_by_article_cache_invalidated_on_create(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, test_data_factory):
+        """記事別ナレッジ取得 - 作成したセッションは自身の変更を読み、キャッシュはコミット後に破棄"""
+        # 準備
+        await db_session.commit()
+        await knowledge_crud.get_by_article(db_session, sample_knowledge.article_number)
+        knowledge_data = test_data_factory.create_knowledge_data(article_number=sample_knowledge.article_number)
+        created = await knowledge_crud.create(db_session, knowledge_data, sample_user.id)
+        
+        # 実行・検証（コミット前は他のセッション向けのキャッシュを残したまま、自身の変更を返す）
+        result = await knowledge_crud.get_by_article(db_session, sample_knowledge.article_number)
+        assert created.id in {k.id for k in result}
+        assert created.id not in {
+            k.id for k in pickle.loads(knowledge_crud_module._article_list_cache[(sample_knowledge.article_number, 100)])
+        }
+        
+        # 実行・検証（コミットで破棄され、次の取得で作成分を含めて格納される）
+        await db_session.commit()
+        assert not knowledge_crud_module._article_list_cache
+        result = await knowledge_crud.get_by_article(db_session, sample_knowledge.article_number)
+        assert created.id in {k.id for k in result}
+
+    @pytest.mark.asyncio
+    async def test_get_by_article_cache_excludes_rolled_back_rows(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, test_data_factory):
+        """記事別ナレッジ取得 - 未コミットの行はキャッシュに格納せず、ロールバック後に返さない"""
+        # 準備
+        await db_session.commit()
+        article_number, knowledge_id = sample_knowledge.article_number, sample_knowledge.id
+        knowledge_data = test_data_factory.create_knowledge_data(article_number=article_number)
+        created = await knowledge_crud.create(db_session, knowledge_data, sample_user.id)
+        created_id = created.id
+        await knowledge_crud.get_by_article(db_session, article_number)
+        
+        # 実行
+        await db_session.rollback()
+        result = await knowledge_crud.get_by_article(db_session, article_number)
+        
+        # 検証
+        assert created_id not in {k.id for k in result}
+        assert [k.id for k in result] == [knowledge_id]
+
     @pytest.mark.asyncio
     async def test_get_by_article_no_results(self, db_session: AsyncSession):
         """記事別ナレッジ取得 - 該当なし"""
@@ -155,6 +347,79 @@ class TestKnowledgeCRUD:
         # 検証
         assert len(result) == 0
 
+    @pytest.mark.asyncio
+    async def test_count_cached_and_invalidated(self, db_session: AsyncSession, multiple_knowledge, sample_user: User, test_data_factory, query_counter):
+        """ナレッジ件数 - キャッシュし、作成・ステータス更新のコミットで破棄する"""
+        # 準備（コミット済みの件数をキャッシュに載せる）
+        await db_session.commit()
+        total = await knowledge_crud.count(db_session)
+        drafts = await knowledge_crud.count_by_status(db_session, StatusEnum.draft)
+        mine = await knowledge_crud.count_by_user(db_session, sample_user.id)
+        query_counter.clear()
+        
+        # 実行・検証（キャッシュから返す）
+        assert await knowledge_crud.count(db_session) == total == len(multiple_knowledge)
+        assert await knowledge_crud.count_by_status(db_session, StatusEnum.draft) == drafts
+        assert await knowledge_crud.count_by_user(db_session, sample_user.id) == mine
+        assert len(query_counter) == 0
+        
+        # 実行・検証（作成したセッションは自身の変更を数え、キャッシュはコミットまで残す）
+        created = await knowledge_crud.create(db_session, test_data_factory.create_knowledge_data(), sample_user.id)
+        assert await knowledge_crud.count(db_session) == total + 1
+        assert await knowledge_crud.count_by_status(db_session, StatusEnum.draft) == drafts + 1
+        assert knowledge_crud_module._count_cache[("all", None)] == total
+        
+        # 実行・検証（コミットで破棄される）
+        await db_session.commit()
+        assert not knowledge_crud_module._count_cache
+        assert await knowledge_crud.count(db_session) == total + 1
+        
+        # 実行・検証（ステータス更新のコミットで破棄される）
+        assert await knowledge_crud.count_by_status(db_session, StatusEnum.draft) == drafts + 1
+        await knowledge_crud.update_status(db_session, created, StatusEnum.submitted, sample_user)
+        await db_session.commit()
+        assert await knowledge_crud.count_by_status(db_session, StatusEnum.draft) == drafts
+
+    @pytest.mark.asyncio
+    async def test_count_cache_excludes_rolled_back_rows(self, db_session: AsyncSession, sample_user: User, test_data_factory):
+        """ナレッジ件数 - 未コミットの件数はキャッシュに格納せず、ロールバック後に返さない"""
+        # 準備
+        await db_session.commit()
+        user_id = sample_user.id
+        await knowledge_crud.create(db_session, test_data_factory.create_knowledge_data(), user_id)
+        assert await knowledge_crud.count(db_session) == 1
+        assert await knowledge_crud.count_by_user(db_session, user_id) == 1
+        
+        # 実行
+        await db_session.rollback()
+        
+        # 検証
+        assert not knowledge_crud_module._count_cache
+        assert await knowledge_crud.count(db_session) == 0
+        assert await knowledge_crud.count_by_user(db_session, user_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_search_by_title_and_keywords(self, db_session: AsyncSession, sample_user: User, test_data_factory):
+        """ナレッジ検索 - タイトル・キーワードの部分一致"""
+        # 準備
+        by_title = await knowledge_crud.create(db_session, test_data_factory.create_knowledge_data(title="プリンター設定の手順"), sample_user.id)
+        by_keywords = await knowledge_crud.create(db_session, test_data_factory.create_knowledge_data(keywords="印刷,プリンター"), sample_user.id)
+        await knowledge_crud.create(db_session, test_data_factory.create_knowledge_data(title="無関係"), sample_user.id)
+        
+        # 実行
+        result = await knowledge_crud.search(db_session, "プリンター")
+        
+        # 検証
+        assert {k.id for k in result} == {by_title.id, by_keywords.id}
+        assert (await knowledge_crud.search(db_session, "プリンター", limit=1))[0].id == result[0].id
+
+    @pytest.mark.asyncio
+    async def test_search_empty_query(self, db_session: AsyncSession):
+        """ナレッジ検索 - 空のクエリ"""
+        # 実行・検証
+        with pytest.raises(ValidationError):
+            await knowledge_crud.search(db_session, " ")
+
     @pytest.mark.asyncio
     async def test_get_by_article_empty_article_number(self, db_session: AsyncSession):
         """記事別ナレッジ取得 - 空の記事番号"""
@@ -239,6 +504,25 @@ class TestKnowledgeCRUD:
         assert result.answer == "更新された回答"
         assert result.id == sample_knowledge.id
 
+    @pytest.mark.asyncio
+    async def test_update_knowledge_single_statement(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, query_counter):
+        """ナレッジ更新 - UPDATE ... RETURNING 1 文で更新し同じオブジェクトを返す"""
+        # 準備
+        original_updated_at = sample_knowledge.updated_at
+        update_data = KnowledgeUpdate(title="一括更新タイトル")
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.update(db_session, sample_knowledge, update_data)
+        
+        # 検証
+        assert len(query_counter) == 1
+        assert query_counter[0].lstrip().upper().startswith("UPDATE")
+        assert result is sample_knowledge
+        assert result.title == "一括更新タイトル"
+        assert result.updated_at >= original_updated_at
+        assert result.author is sample_user
+
     @pytest.mark.asyncio
     async def test_update_knowledge_no_data(self, db_session: AsyncSession, sample_knowledge: Knowledge):
         """ナレッジ更新 - 更新データなし"""
@@ -252,6 +536,24 @@ class TestKnowledgeCRUD:
         assert result.id == sample_knowledge.id
         assert result.title == sample_knowledge.title
 
+    @pytest.mark.asyncio
+    async def test_create_knowledge_without_reload(self, db_session: AsyncSession, sample_user: User, test_data_factory, query_counter):
+        """ナレッジ作成 - 作成後に再取得のSELECTを発行しない"""
+        # 準備
+        knowledge_data = test_data_factory.create_knowledge_data()
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.create(db_session, knowledge_data, sample_user.id)
+        
+        # 検証（INSERT ... RETURNING のみ）
+        assert len(query_counter) == 1
+        assert "RETURNING" in query_counter[0]
+        assert result in db_session
+        assert result.status == StatusEnum.draft
+        assert result.author is sample_user
+        assert result.approver is None
+
     @pytest.mark.asyncio
     async def test_update_knowledge_partial_update(self, db_session: AsyncSession, sample_knowledge: Knowledge):
         """ナレッジ更新 - 部分更新"""
@@ -281,6 +583,58 @@ class TestKnowledgeCRUD:
         assert result.status == StatusEnum.submitted
         assert result.submitted_at is not None
 
+    @pytest.mark.asyncio
+    async def test_update_status_same_status_is_noop(self, db_session: AsyncSession, sample_knowledge: Knowledge, admin_user: User, query_counter):
+        """ステータス更新 - 同じステータスへの変更はSQLを発行しない"""
+        # 準備
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.update_status(db_session, sample_knowledge, StatusEnum.draft, admin_user)
+        
+        # 検証
+        assert len(query_counter) == 0
+        assert result is sample_knowledge
+        assert result.status == StatusEnum.draft
+
+    @pytest.mark.asyncio
+    async def test_update_status_from_approved_clears_approval(self, db_session: AsyncSession, sample_knowledge: Knowledge, admin_user: User):
+        """ステータス更新 - 承認済みから戻すと承認情報をクリア"""
+        # 準備
+        knowledge = await knowledge_crud.update_status(db_session, sample_knowledge, StatusEnum.approved, admin_user)
+        assert knowledge.approver is admin_user
+        
+        # 実行
+        result = await knowledge_crud.update_status(db_session, knowledge, StatusEnum.submitted, admin_user)
+        
+        # 検証
+        assert result.status == StatusEnum.submitted
+        assert result.approved_at is None
+        assert result.approved_by is None
+        assert result.approver is None
+        assert result.submitted_at is not None
+
+    @pytest.mark.asyncio
+    async def test_update_status_uses_server_timestamp(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, query_counter):
+        """ステータス更新 - 提出日時はDB側で生成しUPDATE 1文で受け取る"""
+        # 準備
+        query_counter.clear()
+        
+        # 実行
+        result = await knowledge_crud.update_status(
+            db_session,
+            sample_knowledge,
+            StatusEnum.submitted,
+            sample_user
+        )
+        
+        # 検証
+        assert len(query_counter) == 1
+        assert "CURRENT_TIMESTAMP" in query_counter[0]
+        assert result is sample_knowledge
+        assert isinstance(result.submitted_at, datetime)
+        assert result.author is sample_user
+
     @pytest.mark.asyncio
     async def test_update_status_submitted_to_approved_by_admin(self, db_session: AsyncSession, sample_knowledge: Knowledge, admin_user: User):
         """ステータス更新 - 管理者が提出から承認へ"""
@@ -300,6 +654,7 @@ class TestKnowledgeCRUD:
         assert result.status == StatusEnum.approved
         assert result.approved_at is not None
         assert result.approved_by == admin_user.id
+        assert result.approver is admin_user
 
     @pytest.mark.asyncio
     async def test_update_status_unauthorized_user(self, db_session: AsyncSession, sample_knowledge: Knowledge):
@@ -337,13 +692,18 @@ class TestKnowledgeCRUD:
             )
 
     @pytest.mark.asyncio
-    async def test_delete_knowledge_success_by_creator(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User):
+    async def test_delete_knowledge_success_by_creator(self, db_session: AsyncSession, sample_knowledge: Knowledge, sample_user: User, query_counter):
         """ナレッジ削除 - 作成者による削除"""
+        # 準備
+        query_counter.clear()
+        
         # 実行
         result = await knowledge_crud.delete(db_session, sample_knowledge.id, sample_user.id)
         
-        # 検証
+        # 検証（DELETE文のみ・セッションからも除外される）
         assert result == True
+        assert len(query_counter) == 1
+        assert sample_knowledge not in db_session
         
         # 削除されたことを確認
         deleted_knowledge = await knowledge_crud.get(db_session, sample_knowledge.id)
@@ -177,6 +177,34 @@ class TestRefreshTokenCRUD:
         with pytest.raises(ValidationError):
             await refresh_token_crud.create(db_session, token_data)
 
+    @pytest.mark.asyncio
+    async def test_rotate_refresh_token_success(self, db_session: AsyncSession, sample_user: User, sample_refresh_token: RefreshToken):
+        """リフレッシュトークンのローテーション - 正常系"""
+        old_token = sample_refresh_token.token
+        
+        # 実行
+        user_id = await refresh_token_crud.rotate_refresh_token(
+            db_session, old_token, "rotated_token_value", datetime.utcnow() + timedelta(days=7)
+        )
+        
+        # 検証
+        assert user_id == sample_user.id
+        assert await refresh_token_crud.get_by_token(db_session, "rotated_token_value") is not None
+        db_session.expunge_all()
+        assert await refresh_token_crud.get_by_token(db_session, old_token) is None
+
+    @pytest.mark.asyncio
+    async def test_rotate_refresh_token_not_found(self, db_session: AsyncSession):
+        """リフレッシュトークンのローテーション - 存在しないトークン"""
+        # 実行
+        user_id = await refresh_token_crud.rotate_refresh_token(
+            db_session, "nonexistent_token", "rotated_token_value", datetime.utcnow() + timedelta(days=7)
+        )
+        
+        # 検証
+        assert user_id is None
+        assert await refresh_token_crud.get_by_token(db_session, "rotated_token_value") is None
+
     @pytest.mark.asyncio
     async def test_delete_refresh_token_success(self, db_session: AsyncSession, sample_refresh_token: RefreshToken):
         """リフレッシュトークン削除 - 正常系"""
@@ -298,6 +298,39 @@ class TestTokenBlacklistCRUD:
         expired_jtis = [entry.jti for entry in result]
         assert expired_entry.jti not in expired_jtis
 
+    @pytest.mark.asyncio
+    async def test_get_active_jtis(self, db_session: AsyncSession, sample_blacklist_entry: TokenBlacklist, test_data_factory):
+        """有効なエントリのJTI一覧取得"""
+        # 準備 - 期限切れエントリを作成
+        expired_data = test_data_factory.create_token_blacklist_data(
+            jti="expired_for_jti_list_test",
+            expires_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        db_session.add(TokenBlacklist(**expired_data.dict()))
+        await db_session.commit()
+        
+        # 実行
+        result = await token_blacklist_crud.get_active_jtis(db_session)
+        
+        # 検証
+        assert sample_blacklist_entry.jti in result
+        assert "expired_for_jti_list_test" not in result
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_blacklist_entries(self, db_session: AsyncSession, sample_blacklist_entry: TokenBlacklist):
+        """ブラックリストエントリの一括作成（登録済みのJTIは無視される）"""
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        entries = [(f"bulk_jti_{i}", expires_at) for i in range(3)]
+        entries.append((sample_blacklist_entry.jti, expires_at))
+        
+        # 実行
+        await token_blacklist_crud.bulk_create_blacklist_entries(db_session, entries)
+        
+        # 検証
+        result = await token_blacklist_crud.get_active_jtis(db_session)
+        assert {"bulk_jti_0", "bulk_jti_1", "bulk_jti_2", sample_blacklist_entry.jti} <= set(result)
+        assert len(result) == len(set(result))
+
     @pytest.mark.asyncio
     async def test_database_connection_error_simulation(self, db_session: AsyncSession):
         """データベース接続エラーのシミュレーション"""
@@ -6,9 +6,9 @@ import pytest_asyncio
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.user import user_crud
-from app.schemas import UserCreate, UserUpdate
-from app.models import User
+from app.crud.user import decode_cursor, encode_cursor, user_crud
+from app.schemas import UserCreate, UserUpdate, UserWithKnowledge
+from app.models import Knowledge, User
 from app.core.exceptions import (
     UserNotFoundError,
     DuplicateUsernameError,
@@ -55,6 +55,48 @@ class TestUserCRUD:
         
         assert "id" in str(exc_info.value)
 
+    @pytest.mark.asyncio
+    async def test_get_with_knowledge_success(self, db_session: AsyncSession, sample_user: User, sample_knowledge: Knowledge):
+        """ナレッジ付きユーザー取得 - 正常系"""
+        user_id = sample_user.id
+        db_session.expunge_all()
+        
+        # 実行
+        result = await user_crud.get_with_knowledge(db_session, user_id)
+        
+        # 検証（遅延読み込みなしでシリアライズできること）
+        data = UserWithKnowledge.model_validate(result)
+        assert data.id == user_id
+        assert len(data.knowledge_items) == 1
+        assert data.knowledge_items[0].id == sample_knowledge.id
+        assert data.knowledge_items[0].author.id == user_id
+
+    @pytest.mark.asyncio
+    async def test_get_with_knowledge_not_found(self, db_session: AsyncSession):
+        """ナレッジ付きユーザー取得 - 存在しないID"""
+        # 実行・検証
+        with pytest.raises(UserNotFoundError):
+            await user_crud.get_with_knowledge(db_session, uuid4())
+
+    @pytest.mark.asyncio
+    async def test_get_auth_fields_success(self, db_session: AsyncSession, sample_user: User):
+        """認証用フィールド取得 - 正常系"""
+        # 実行
+        result = await user_crud.get_auth_fields(db_session, sample_user.id)
+        
+        # 検証
+        assert result.id == sample_user.id
+        assert result.username == sample_user.username
+        assert result.is_admin == sample_user.is_admin
+        assert "hashed_password" not in result._fields
+
+    @pytest.mark.asyncio
+    async def test_get_auth_fields_not_found(self, db_session: AsyncSession):
+        """認証用フィールド取得 - 存在しないID"""
+        # 実行・検証
+        with pytest.raises(UserNotFoundError):
+            await user_crud.get_auth_fields(db_session, uuid4())
+
     @pytest.mark.asyncio
     async def test_get_by_username_success(self, db_session: AsyncSession, sample_user: User):
         """ユーザー名でユーザー取得 - 正常系"""
@@ -135,6 +177,56 @@ class TestUserCRUD:
         assert len(second_page) == 2
         assert first_page[0].id != second_page[0].id
 
+    @pytest.mark.asyncio
+    async def test_get_multi_after_pagination(self, db_session: AsyncSession, multiple_users: list[User]):
+        """ユーザー一覧取得 - キーセットページネーション"""
+        # 実行
+        first_page = await user_crud.get_multi_after(db_session, limit=2)
+        second_page = await user_crud.get_multi_after(
+            db_session, after=decode_cursor(encode_cursor(first_page[-1])), limit=2
+        )
+        all_users = await user_crud.get_multi(db_session, skip=0, limit=10)
+        
+        # 検証
+        assert len(first_page) == 2
+        assert len(second_page) == 2
+        assert [u.id for u in first_page + second_page] == [u.id for u in all_users[:4]]
+
+    @pytest.mark.asyncio
+    async def test_get_multi_after_deleted_cursor_user(self, db_session: AsyncSession, multiple_users: list[User]):
+        """ユーザー一覧取得 - カーソルのユーザーが削除されていても続きから取得"""
+        # 準備
+        first_page = await user_crud.get_multi_after(db_session, limit=2)
+        cursor = encode_cursor(first_page[-1])
+        all_users = await user_crud.get_multi(db_session, skip=0, limit=10)
+        await db_session.delete(first_page[-1])
+        await db_session.flush()
+        
+        # 実行
+        second_page = await user_crud.get_multi_after(db_session, after=decode_cursor(cursor), limit=2)
+        
+        # 検証
+        assert [u.id for u in second_page] == [u.id for u in all_users[2:4]]
+
+    @pytest.mark.asyncio
+    async def test_get_multi_after_limit_capped(self, db_session: AsyncSession, monkeypatch):
+        """ユーザー一覧取得 - limitはMAX_PAGE_SIZEまで"""
+        from app.core.config import settings
+        
+        monkeypatch.setattr(settings, "MAX_PAGE_SIZE", 2)
+        
+        # 実行・検証
+        assert await user_crud.get_multi_after(db_session, limit=2) is not None
+        with pytest.raises(InvalidParameterError):
+            await user_crud.get_multi_after(db_session, limit=3)
+
+    @pytest.mark.asyncio
+    async def test_get_multi_after_invalid_cursor(self):
+        """ユーザー一覧取得 - 不正なカーソル"""
+        # 実行・検証
+        with pytest.raises(InvalidParameterError):
+            decode_cursor("not-a-cursor")
+
     @pytest.mark.asyncio
     async def test_get_multi_invalid_skip(self, db_session: AsyncSession):
         """ユーザー一覧取得 - 無効なskip"""
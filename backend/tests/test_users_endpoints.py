@@ -0,0 +1,69 @@
+"""
+ユーザー一覧エンドポイントのテスト
+"""
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.models import User
+from app.db.session import get_async_session
+
+
+@pytest_asyncio.fixture
+async def async_client(db_session: AsyncSession):
+    """非同期テストクライアント"""
+    # データベースセッションをオーバーライド
+    async def override_get_async_session():
+        yield db_session
+
+    app.dependency_overrides[get_async_session] = override_get_async_session
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+    # オーバーライドをクリア
+    app.dependency_overrides.clear()
+
+
+class TestReadUsersEndpoint:
+    """ユーザー一覧取得エンドポイントのテスト"""
+
+    async def test_keyset_pagination_follows_next_cursor(self, async_client: AsyncClient, multiple_users: list[User]):
+        """先頭ページのX-Next-Cursorを辿ると全件を重複なく取得できる"""
+        first = await async_client.get("/api/v1/users/", params={"limit": 3})
+        second = await async_client.get(
+            "/api/v1/users/", params={"limit": 3, "after": first.headers["X-Next-Cursor"]}
+        )
+        offset_page = await async_client.get("/api/v1/users/", params={"limit": 6})
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert [u["id"] for u in first.json() + second.json()] == [u["id"] for u in offset_page.json()]
+
+    async def test_offset_page_has_no_next_cursor(self, async_client: AsyncClient, multiple_users: list[User]):
+        """OFFSET方式の途中のページではX-Next-Cursorを返さない"""
+        response = await async_client.get("/api/v1/users/", params={"skip": 1, "limit": 2})
+
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        assert "X-Next-Cursor" not in response.headers
+
+    async def test_after_with_skip_rejected(self, async_client: AsyncClient, multiple_users: list[User]):
+        """afterとskipの同時指定は400"""
+        first = await async_client.get("/api/v1/users/", params={"limit": 2})
+
+        response = await async_client.get(
+            "/api/v1/users/", params={"skip": 2, "limit": 2, "after": first.headers["X-Next-Cursor"]}
+        )
+
+        assert response.status_code == 400
+        assert response.json()["error_code"] == "INVALID_PARAMETER"
+
+    async def test_invalid_cursor_rejected(self, async_client: AsyncClient):
+        """不正なカーソルは400"""
+        response = await async_client.get("/api/v1/users/", params={"after": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert response.json()["error_code"] == "INVALID_PARAMETER"